@@ -54,24 +54,44 @@ class Settings:
     smtp_password: str
     email_from: str
     email_to: str
+    email_inline_css: bool
+    email_minify_html: bool
+    email_outbox: bool
+    daily_shared_lesson: bool
+    outbox_max_attempts: int
+    outbox_drain_seconds: int
+    smtp_connections: int
+    smtp_max_messages_per_connection: int
 
     imap_host: str
     imap_port: int
     imap_user: str
     imap_password: str
     imap_feedback_mailboxes: List[str]
+    imap_feedback_since_days: int
+    imap_parallel_mailboxes: int
+    imap_idle_mailbox: str
 
     feedback_email: str
     feedback_subject_prefix: str
     feedback_token: str
+    feedback_http_url: str
+    feedback_http_host: str
+    feedback_http_port: int
     feedback_allowed_senders: List[str]
     feedback_strict_sender: bool
     feedback_ingest_strict: bool
+    feedback_dedup_max_keys: int
 
     tts_provider: str
     edge_tts_voice: str
+    edge_tts_connect_timeout: int
+    edge_tts_receive_timeout: int
+    edge_tts_timeout: int
     tts_strict: bool
     audio_public_base_url: str
+    audio_attach_max_bytes: int
+    audio_cache_max_bytes: int
 
     de_rss_urls: List[str]
     fr_rss_urls: List[str]
@@ -79,6 +99,18 @@ class Settings:
 
     dry_run: bool
 
+    @property
+    def jinja_cache_dir(self) -> Path:
+        return self.data_dir / "cache" / "jinja"
+
+    @property
+    def audio_cache_dir(self) -> Path:
+        return self.data_dir / "audio" / "cache"
+
+    @property
+    def outbox_dir(self) -> Path:
+        return self.data_dir / "outbox"
+
 
 def load_settings() -> Settings:
     project_root = Path(os.getenv("PROJECT_ROOT", Path(__file__).resolve().parents[1]))
@@ -126,6 +158,14 @@ def load_settings() -> Settings:
         smtp_password=smtp_password,
         email_from=email_from,
         email_to=email_to,
+        email_inline_css=_env_bool("EMAIL_INLINE_CSS", False),
+        email_minify_html=_env_bool("EMAIL_MINIFY_HTML", True),
+        email_outbox=_env_bool("EMAIL_OUTBOX", True),
+        daily_shared_lesson=_env_bool("DAILY_SHARED_LESSON", False),
+        outbox_max_attempts=_env_int("OUTBOX_MAX_ATTEMPTS", 8),
+        outbox_drain_seconds=_env_int("OUTBOX_DRAIN_SECONDS", 120),
+        smtp_connections=_env_int("SMTP_CONNECTIONS", 1),
+        smtp_max_messages_per_connection=_env_int("SMTP_MAX_MESSAGES_PER_CONNECTION", 100),
         imap_host=_env_str("IMAP_HOST", "imap.gmail.com"),
         imap_port=_env_int("IMAP_PORT", 993),
         imap_user=imap_user,
@@ -134,16 +174,28 @@ def load_settings() -> Settings:
             "IMAP_FEEDBACK_MAILBOXES",
             ["INBOX", "[Gmail]/All Mail", "[Gmail]/Sent Mail", "Sent", "Sent Messages"],
         ),
+        imap_feedback_since_days=_env_int("IMAP_FEEDBACK_SINCE_DAYS", 30),
+        imap_parallel_mailboxes=max(1, _env_int("IMAP_PARALLEL_MAILBOXES", 1)),
+        imap_idle_mailbox=_env_str("IMAP_IDLE_MAILBOX", "INBOX"),
         feedback_email=_env_str("FEEDBACK_EMAIL", gmail_address or imap_user or email_from),
         feedback_subject_prefix=_env_str("FEEDBACK_SUBJECT_PREFIX", "[LLDN]"),
         feedback_token=_env_str("FEEDBACK_TOKEN", ""),
+        feedback_http_url=_env_str("FEEDBACK_HTTP_URL", ""),
+        feedback_http_host=_env_str("FEEDBACK_HTTP_HOST", "127.0.0.1"),
+        feedback_http_port=_env_int("FEEDBACK_HTTP_PORT", 8787),
         feedback_allowed_senders=allowed_senders,
         feedback_strict_sender=strict_sender,
         feedback_ingest_strict=_env_bool("FEEDBACK_INGEST_STRICT", False),
+        feedback_dedup_max_keys=_env_int("FEEDBACK_DEDUP_MAX_KEYS", 5000),
         tts_provider=_env_str("TTS_PROVIDER", "edge").lower(),
         edge_tts_voice=_env_str("EDGE_TTS_VOICE", "de-DE-KatjaNeural"),
+        edge_tts_connect_timeout=_env_int("EDGE_TTS_CONNECT_TIMEOUT", 10),
+        edge_tts_receive_timeout=_env_int("EDGE_TTS_RECEIVE_TIMEOUT", 60),
+        edge_tts_timeout=_env_int("EDGE_TTS_TIMEOUT", 180),
         tts_strict=_env_bool("TTS_STRICT", False),
         audio_public_base_url=_env_str("AUDIO_PUBLIC_BASE_URL", ""),
+        audio_attach_max_bytes=_env_int("AUDIO_ATTACH_MAX_BYTES", 0),
+        audio_cache_max_bytes=_env_int("AUDIO_CACHE_MAX_BYTES", 200 * 1024 * 1024),
         de_rss_urls=_env_list(
             "DE_RSS_URLS",
             [
@@ -3,11 +3,19 @@ from __future__ import annotations
 import argparse
 import os
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-from app.config import load_settings
+from app.config import Settings, load_settings
+from app.models.schemas import DailyLesson
 from app.pipeline.daily_job import DailyJob
+from app.pipeline.feedback_daemon import FeedbackDaemon
 from app.pipeline.feedback_job import FeedbackJob
+from app.pipeline.mail import build_smtp_sender, record_delivery
+from app.pipeline.progress_report_job import ProgressReportJob
 from app.pipeline.weekly_report_job import WeeklyReportJob
+from app.services.email.outbox import Outbox, OutboxWorker
+from app.services.feedback.http_receiver import FeedbackHTTPReceiver
+from app.services.state.learners import LearnerProfile, LearnerRegistry, learner_registry_path
 
 
 def _load_dotenv(project_root: Path) -> None:
@@ -27,13 +35,63 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run daily language-learning email jobs")
     parser.add_argument("--dry-run", action="store_true", help="Generate lesson/report HTML, do not send email")
     parser.add_argument("--feedback-only", action="store_true", help="Only ingest feedback emails")
+    parser.add_argument(
+        "--feedback-daemon",
+        action="store_true",
+        help="Keep an IMAP IDLE session open and ingest feedback as it arrives",
+    )
+    parser.add_argument(
+        "--feedback-http",
+        action="store_true",
+        help="Serve the HTTP feedback receiver on FEEDBACK_HTTP_HOST:FEEDBACK_HTTP_PORT",
+    )
+    parser.add_argument(
+        "--deliver",
+        action="store_true",
+        help="Only deliver emails waiting in the outbox (data/outbox), then exit",
+    )
     parser.add_argument("--weekly-report-only", action="store_true", help="Only send weekly report email")
     parser.add_argument(
         "--ingest-feedback",
         action="store_true",
         help="Ingest feedback first, then run requested email job",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--progress-report-only",
+        choices=["monthly", "all"],
+        help="Only send the learning-curve report for the last 30 days or all history",
+    )
+    parser.add_argument(
+        "--report-range",
+        help="Report period for --weekly-report-only: '30d', 'YYYY-MM-DD' or 'YYYY-MM-DD:YYYY-MM-DD'",
+    )
+    learner_group = parser.add_mutually_exclusive_group()
+    learner_group.add_argument("--learner", help="Run the email job for one learner from data/learners/registry.json")
+    learner_group.add_argument("--all-learners", action="store_true", help="Run the email job for every active learner")
+    args = parser.parse_args()
+    # --progress-report-only takes precedence over --weekly-report-only, which would drop the range too.
+    if args.report_range and (not args.weekly_report_only or args.progress_report_only):
+        parser.error("--report-range only applies to --weekly-report-only")
+    return args
+
+
+def _resolve_learners(args: argparse.Namespace, settings: Settings) -> List[Optional[LearnerProfile]]:
+    if not args.learner and not args.all_learners:
+        # Single-learner deployment configured through EMAIL_TO / CEFR_LEVEL / TARGET_LANGUAGE.
+        return [None]
+
+    registry = LearnerRegistry.load(learner_registry_path(settings.data_dir))
+    if args.learner:
+        return [registry.require(args.learner)]
+    return list(registry.active_learners())
+
+
+def _outbox(settings: Settings) -> Outbox:
+    return Outbox(
+        root=settings.outbox_dir,
+        max_attempts=settings.outbox_max_attempts,
+        on_delivered=record_delivery(settings.data_dir),
+    )
 
 
 def main() -> None:
@@ -43,6 +101,27 @@ def main() -> None:
     args = parse_args()
     settings = load_settings()
 
+    if args.feedback_daemon:
+        FeedbackDaemon(settings=settings).run()
+        return
+
+    if args.feedback_http:
+        FeedbackHTTPReceiver(
+            data_dir=settings.data_dir,
+            feedback_token=settings.feedback_token,
+            feedback_dedup_max_keys=settings.feedback_dedup_max_keys,
+            host=settings.feedback_http_host,
+            port=settings.feedback_http_port,
+        ).serve_forever()
+        return
+
+    if args.deliver:
+        remaining = _outbox(settings).drain(build_smtp_sender(settings), timeout=settings.outbox_drain_seconds)
+        if remaining:
+            raise RuntimeError(f"{remaining} email(s) still queued in the outbox")
+        print("Outbox delivered")
+        return
+
     if args.feedback_only:
         feedback_job = FeedbackJob(settings=settings)
         feedback_job.run()
@@ -58,14 +137,52 @@ def main() -> None:
             print(f"[WARN] Feedback ingest failed, continue sending lesson email: {exc}")
 
     dry_run = args.dry_run or settings.dry_run
-
-    if args.weekly_report_only:
-        weekly_job = WeeklyReportJob(settings=settings)
-        weekly_job.run(dry_run=dry_run)
-        return
-
-    job = DailyJob(settings=settings)
-    job.run(dry_run=dry_run)
+    learners = _resolve_learners(args, settings)
+    failures: List[str] = []
+
+    # Jobs spool their emails and move on; the worker delivers them in the background.
+    outbox: Optional[Outbox] = None
+    worker: Optional[OutboxWorker] = None
+    if settings.email_outbox and not dry_run:
+        outbox = _outbox(settings)
+        worker = OutboxWorker(outbox=outbox, sender=build_smtp_sender(settings))
+        worker.start()
+
+    # Learners in one run share a lesson per language and level when DAILY_SHARED_LESSON is set.
+    shared_lessons: Optional[Dict[Tuple[str, str], DailyLesson]] = {} if settings.daily_shared_lesson else None
+
+    try:
+        for learner in learners:
+            try:
+                if args.progress_report_only:
+                    ProgressReportJob(settings=settings, outbox=outbox).run(
+                        dry_run=dry_run,
+                        learner=learner,
+                        period=args.progress_report_only,
+                    )
+                elif args.weekly_report_only:
+                    WeeklyReportJob(settings=settings, outbox=outbox).run(
+                        dry_run=dry_run,
+                        learner=learner,
+                        report_range=args.report_range,
+                    )
+                else:
+                    DailyJob(settings=settings, outbox=outbox, shared_lessons=shared_lessons).run(
+                        dry_run=dry_run, learner=learner
+                    )
+            except Exception as exc:
+                if learner is None:
+                    raise
+                print(f"[WARN] Job failed for learner {learner.learner_id}: {exc}")
+                failures.append(learner.learner_id)
+    finally:
+        remaining = worker.stop(drain_timeout=settings.outbox_drain_seconds) if worker is not None else 0
+
+    if failures:
+        raise RuntimeError(f"Job failed for learners: {', '.join(failures)}")
+    if remaining:
+        # Nothing is lost: the next run (or --deliver) sends them without regenerating.
+        raise RuntimeError(f"{remaining} email(s) still queued in the outbox; rerun or use --deliver")
 
 
 if __name__ == "__main__":
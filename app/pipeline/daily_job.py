@@ -1,96 +1,145 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from app.config import Settings
 from app.language_packs import get_language_pack
+from app.language_packs.base import LanguagePack
+from app.pipeline.mail import send_or_enqueue
+from app.services.email.optimizer import EmailOptimizer
+from app.services.email.outbox import Outbox
 from app.services.email.renderer import EmailRenderer
-from app.services.email.smtp_sender import SMTPSender
+from app.services.email.smtp_sender import OutgoingEmail
+from app.models.schemas import DailyLesson
 from app.services.learning.content_builder import LessonBuilder
 from app.services.llm.gemini_client import GeminiClient
 from app.services.news.rss_client import RSSNewsClient
-from app.services.state.repository import StateRepository
+from app.services.state.learners import LearnerProfile
+from app.services.state.repository import StateRepository, sent_log_entry
+from app.services.tts.cache import AudioCache
 from app.services.tts.factory import build_tts_provider
 
 
 @dataclass
 class DailyJob:
     settings: Settings
-
-    def run(self, dry_run: bool = False) -> None:
-        language_pack = get_language_pack(self.settings.target_language)
-        rss_urls = self._resolve_rss_urls(language_pack.code)
-        if not rss_urls:
-            raise RuntimeError(f"No RSS URLs configured for language: {language_pack.code}")
-
-        news_client = RSSNewsClient(max_articles=self.settings.max_articles_to_scan)
-        articles = news_client.fetch_latest(rss_urls)
-        if not articles:
-            raise RuntimeError("No articles fetched from configured RSS feeds")
-
-        article = articles[0]
-        state_repo = StateRepository(data_dir=self.settings.data_dir)
-        study_profile = state_repo.build_study_profile(base_level=self.settings.cefr_level)
-        effective_level = str(study_profile.get("effective_level", self.settings.cefr_level))
-
-        gemini = GeminiClient(
-            api_key=self.settings.gemini_api_key,
-            model=self.settings.gemini_model,
-            fallback_models=self.settings.gemini_fallback_models,
-        )
-        builder = LessonBuilder(gemini=gemini, language_pack=language_pack)
-        lesson = builder.build(
-            article=article,
-            cefr_level=effective_level,
-            study_profile=study_profile,
-        )
+    # When set, the email is spooled for the outbox worker instead of sent inline.
+    outbox: Optional[Outbox] = None
+    # DAILY_SHARED_LESSON: one lesson per (language, CEFR level) for every learner in this run,
+    # so the renderer's cached skeleton is reused and only the feedback section is per learner.
+    shared_lessons: Optional[Dict[Tuple[str, str], DailyLesson]] = None
+
+    def run(self, dry_run: bool = False, learner: Optional[LearnerProfile] = None) -> None:
+        target_language = learner.language if learner else self.settings.target_language
+        cefr_level = learner.cefr_level if learner else self.settings.cefr_level
+        email_to = learner.email if learner else self.settings.email_to
+
+        # One lesson per learner and day: a retried run delivers the queued email instead of regenerating it.
+        learner_key = learner.learner_id if learner else "default"
+        outbox_key = f"daily:{learner_key}:{target_language}:{datetime.utcnow().strftime('%Y-%m-%d')}"
+        if self.outbox is not None and not dry_run and self.outbox.contains(outbox_key):
+            print(f"[OUTBOX] Today's lesson for {email_to} is already queued or sent, skipping generation")
+            return
+
+        language_pack = get_language_pack(target_language)
+        state_repo = StateRepository.for_learner(self.settings.data_dir, learner)
+        if self.shared_lessons is None:
+            study_profile = state_repo.build_study_profile(base_level=cefr_level)
+            effective_level = str(study_profile.get("effective_level", cefr_level))
+            lesson = self._build_lesson(language_pack, effective_level, study_profile, state_repo)
+        else:
+            effective_level = cefr_level
+            shared_key = (language_pack.code, cefr_level)
+            if shared_key not in self.shared_lessons:
+                # Built without any one learner's word lists; statuses are applied per learner below.
+                self.shared_lessons[shared_key] = self._build_lesson(
+                    language_pack, cefr_level, {"base_level": cefr_level, "effective_level": cefr_level}
+                )
+            lesson = copy.deepcopy(self.shared_lessons[shared_key])
 
         state_repo.apply_existing_progress(lesson)
 
-        audio_file = self._generate_audio(lesson.audio_text, language_pack.default_voice())
-        audio_attached = bool(audio_file and audio_file.exists())
+        # A shared lesson has one audio file (and URL) per group, which keeps the skeleton shared too.
+        audio_tag = state_repo.learner_id if self.shared_lessons is None else f"shared-{cefr_level.lower()}"
+        audio_file = self._generate_audio(lesson.audio_text, language_pack.default_voice(), target_language, audio_tag)
         audio_url = self._build_audio_url(audio_file)
+        audio_attached = self._should_attach_audio(audio_file, audio_url)
 
         renderer = EmailRenderer(
             template_dir=self.settings.template_dir,
             feedback_email=self.settings.feedback_email,
             feedback_subject_prefix=self.settings.feedback_subject_prefix,
             feedback_token=self.settings.feedback_token,
+            learner_id=state_repo.learner_id,
+            feedback_http_url=self.settings.feedback_http_url,
+            cache_dir=self.settings.jinja_cache_dir,
         )
         html = renderer.render_daily_lesson(
             lesson=lesson,
             audio_url=audio_url,
             has_audio_attachment=audio_attached,
         )
+        html = EmailOptimizer(inline_css=self.settings.email_inline_css, minify=self.settings.email_minify_html).optimize(html)
 
         if dry_run:
-            output = self.settings.data_dir / "logs" / "latest_email_preview.html"
+            suffix = f"-{state_repo.learner_id}" if state_repo.learner_id else ""
+            output = self.settings.data_dir / "logs" / f"latest_email_preview{suffix}.html"
             output.parent.mkdir(parents=True, exist_ok=True)
             output.write_text(html, encoding="utf-8")
             print(f"[DRY-RUN] Email HTML saved to: {output}")
             print(f"[DRY-RUN] Audio file: {audio_file if audio_attached else 'none'}")
             print(f"[DRY-RUN] Effective level: {effective_level}")
+            state_repo.record_sent_lesson(lesson)
         else:
-            sender = SMTPSender(
-                host=self.settings.smtp_host,
-                port=self.settings.smtp_port,
-                username=self.settings.smtp_user,
-                password=self.settings.smtp_password,
-                sender=self.settings.email_from,
-            )
             subject = f"[{language_pack.display_name} {lesson.cefr_level}] {lesson.title}"
-            sender.send_html(
-                to_address=self.settings.email_to,
-                subject=subject,
-                html_body=html,
-                audio_attachment=audio_file if audio_attached else None,
+            status = send_or_enqueue(
+                self.settings,
+                self.outbox,
+                key=outbox_key,
+                email=OutgoingEmail(
+                    to_address=email_to,
+                    subject=subject,
+                    html_body=html,
+                    audio_attachment=audio_file if audio_attached else None,
+                ),
+                # A spooled lesson is logged by the outbox's delivery hook once it is actually sent.
+                meta={"learner_id": state_repo.learner_id, "sent_lesson": sent_log_entry(lesson)},
             )
-            print(f"Email sent to {self.settings.email_to}")
+            print(f"Email {status} for {email_to}")
+            if status == "sent":
+                state_repo.record_sent_lesson(lesson)
+
+    def _build_lesson(
+        self,
+        language_pack: LanguagePack,
+        cefr_level: str,
+        study_profile: Dict[str, object],
+        state_repo: Optional[StateRepository] = None,
+    ) -> DailyLesson:
+        rss_urls = self._resolve_rss_urls(language_pack.code)
+        if not rss_urls:
+            raise RuntimeError(f"No RSS URLs configured for language: {language_pack.code}")
 
-        state_repo.record_sent_lesson(lesson)
+        news_client = RSSNewsClient(max_articles=self.settings.max_articles_to_scan)
+        articles = news_client.fetch_latest(rss_urls)
+        if not articles:
+            raise RuntimeError("No articles fetched from configured RSS feeds")
+
+        gemini = GeminiClient(
+            api_key=self.settings.gemini_api_key,
+            model=self.settings.gemini_model,
+            fallback_models=self.settings.gemini_fallback_models,
+        )
+        builder = LessonBuilder(
+            gemini=gemini,
+            language_pack=language_pack,
+            word_status=state_repo.word_status if state_repo else None,
+        )
+        return builder.build(article=articles[0], cefr_level=cefr_level, study_profile=study_profile)
 
     def _resolve_rss_urls(self, lang_code: str) -> list[str]:
         if lang_code == "de":
@@ -101,10 +150,22 @@ class DailyJob:
             return self.settings.ja_rss_urls
         return []
 
-    def _generate_audio(self, text: str, fallback_voice: str) -> Optional[Path]:
-        provider = build_tts_provider(self.settings.tts_provider)
-        voice = self.settings.edge_tts_voice or fallback_voice
-        output = self.settings.data_dir / "audio" / f"{datetime.utcnow().strftime('%Y%m%d')}-{self.settings.target_language}.mp3"
+    def _generate_audio(self, text: str, fallback_voice: str, language: str, tag: str = "") -> Optional[Path]:
+        cache = None
+        if self.settings.audio_cache_max_bytes > 0:
+            cache = AudioCache(root=self.settings.audio_cache_dir, max_bytes=self.settings.audio_cache_max_bytes)
+        provider = build_tts_provider(
+            self.settings.tts_provider,
+            cache=cache,
+            connect_timeout=self.settings.edge_tts_connect_timeout,
+            receive_timeout=self.settings.edge_tts_receive_timeout,
+            timeout=self.settings.edge_tts_timeout,
+        )
+        voice = self.settings.edge_tts_voice if language == self.settings.target_language else ""
+        voice = voice or fallback_voice
+        # Learners sharing a language must not overwrite each other's file (and public URL).
+        suffix = f"-{tag}" if tag else ""
+        output = self.settings.data_dir / "audio" / f"{datetime.utcnow().strftime('%Y%m%d')}{suffix}-{language}.mp3"
 
         try:
             provider.synthesize(text=text, voice=voice, output_path=output)
@@ -122,6 +183,17 @@ class DailyJob:
 
         return output
 
+    def _should_attach_audio(self, audio_file: Optional[Path], audio_url: Optional[str]) -> bool:
+        if not audio_file or not audio_file.exists():
+            return False
+        limit = self.settings.audio_attach_max_bytes
+        size = audio_file.stat().st_size
+        # Large audio goes out as a link when there is somewhere to link to; otherwise attach anyway.
+        if limit and audio_url and size > limit:
+            print(f"[AUDIO] {audio_file.name} is {size / 1024:.0f} KB (> {limit / 1024:.0f} KB), sending a link instead of attaching")
+            return False
+        return True
+
     def _build_audio_url(self, audio_file: Optional[Path]) -> Optional[str]:
         if not audio_file or not self.settings.audio_public_base_url:
             return None
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import imaplib
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from app.config import Settings
+from app.pipeline.feedback_job import FeedbackJob
+
+# RFC 2177: clients should re-issue IDLE at least every 29 minutes.
+IDLE_TIMEOUT_SECONDS = 25 * 60
+MAX_BACKOFF_SECONDS = 300.0
+
+
+@dataclass
+class FeedbackDaemon:
+    """Long-running feedback ingest driven by IMAP IDLE instead of scheduled polling.
+
+    Each wake-up runs the regular incremental ingest, so only messages past the
+    UID checkpoint are fetched. Connection failures reconnect with exponential
+    backoff; state is reloaded per ingest, so memory stays flat over long uptimes.
+    """
+
+    settings: Settings
+    idle_timeout: float = IDLE_TIMEOUT_SECONDS
+    max_backoff: float = MAX_BACKOFF_SECONDS
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+    job: Optional[FeedbackJob] = None
+
+    def run(self, *, max_cycles: Optional[int] = None) -> None:
+        job = self.job or FeedbackJob(settings=self.settings)
+        if not job.is_configured():
+            print("Feedback daemon skipped: IMAP config missing")
+            return
+
+        mailbox = self.settings.imap_idle_mailbox
+        backoff = 1.0
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            try:
+                with job.build_client() as client:
+                    # Catch up on anything that arrived while disconnected.
+                    job.ingest(client)
+                    backoff = 1.0
+                    print(f"[IDLE] Waiting for feedback in {mailbox}")
+                    while max_cycles is None or cycles < max_cycles:
+                        cycles += 1
+                        if client.idle(mailbox, timeout=self.idle_timeout):
+                            job.ingest(client)
+            except (imaplib.IMAP4.error, OSError) as exc:
+                cycles += 1
+                print(f"[IDLE] Connection error: {exc}; reconnecting in {backoff:.0f}s")
+                self.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
@@ -3,9 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from app.config import Settings
+from app.services.feedback.applier import FeedbackApplier
 from app.services.feedback.imap_client import IMAPFeedbackClient
-from app.services.feedback.parser import parse_feedback_commands
-from app.services.state.repository import StateRepository
 
 
 @dataclass
@@ -13,12 +12,19 @@ class FeedbackJob:
     settings: Settings
 
     def run(self) -> int:
-        if not all([self.settings.imap_host, self.settings.imap_user, self.settings.imap_password]):
+        if not self.is_configured():
             print("Feedback ingest skipped: IMAP config missing")
             return 0
 
+        with self.build_client() as client:
+            return self.ingest(client)
+
+    def is_configured(self) -> bool:
+        return all([self.settings.imap_host, self.settings.imap_user, self.settings.imap_password])
+
+    def build_client(self) -> IMAPFeedbackClient:
         allowed_senders = self.settings.feedback_allowed_senders if self.settings.feedback_strict_sender else []
-        client = IMAPFeedbackClient(
+        return IMAPFeedbackClient(
             host=self.settings.imap_host,
             port=self.settings.imap_port,
             username=self.settings.imap_user,
@@ -26,73 +32,48 @@ class FeedbackJob:
             subject_prefix=self.settings.feedback_subject_prefix,
             allowed_senders=allowed_senders,
             mailboxes=self.settings.imap_feedback_mailboxes,
+            since_days=self.settings.imap_feedback_since_days,
+            parallel_mailboxes=self.settings.imap_parallel_mailboxes,
+        )
+
+    def ingest(self, client: IMAPFeedbackClient) -> int:
+        """Fetch new feedback over the client's session and apply it.
+
+        State is loaded fresh on every call so a long-running caller (the IDLE daemon)
+        sees changes written by other jobs and does not accumulate caches.
+        """
+        applier = FeedbackApplier(
+            data_dir=self.settings.data_dir,
+            feedback_token=self.settings.feedback_token,
+            feedback_dedup_max_keys=self.settings.feedback_dedup_max_keys,
         )
-        state_repo = StateRepository(data_dir=self.settings.data_dir)
+        client.checkpoints = applier.state_repo.get_imap_checkpoints()
+        client.timings.clear()
+        client.mailbox_timings.clear()
 
-        processed_keys = state_repo.get_processed_feedback_message_keys()
         items = client.fetch_recent_items(limit=240)
         processed_marks: list[tuple[str, bytes]] = []
         applied = 0
 
-        for item in items:
-            if item.message_key in processed_keys:
-                continue
-
-            commands = parse_feedback_commands(item.body, token=self.settings.feedback_token)
-            if not commands:
-                state_repo.record_feedback_event(
-                    {
-                        "type": "skip",
-                        "reason": "no_valid_commands_or_token_mismatch",
-                        "subject": item.subject,
-                        "sender": item.sender,
-                        "mailbox": item.mailbox,
-                        "message_key": item.message_key,
-                        "body_preview": item.body[:240],
-                    }
+        with applier.batch():
+            for item in items:
+                count = applier.apply(
+                    body=item.body,
+                    message_key=item.message_key,
+                    sender=item.sender,
+                    mailbox=item.mailbox,
+                    subject=item.subject,
                 )
-                state_repo.mark_feedback_message_processed(item.message_key)
-                processed_keys.add(item.message_key)
+                if count is None:
+                    continue
+                applied += count
                 processed_marks.append((item.mailbox, item.msg_id))
-                continue
-
-            for command in commands:
-                if command.command_type == "word":
-                    state_repo.upsert_word_status(command.word, command.word_status)
-                    state_repo.record_feedback_event(
-                        {
-                            "type": "word",
-                            "lesson_id": command.lesson_id,
-                            "language": command.language,
-                            "word": command.word,
-                            "status": command.word_status,
-                            "sender": item.sender,
-                            "mailbox": item.mailbox,
-                            "message_key": item.message_key,
-                        }
-                    )
-                    applied += 1
-
-                elif command.command_type == "grammar":
-                    state_repo.set_grammar_status(command.topic, command.grammar_status)
-                    state_repo.record_feedback_event(
-                        {
-                            "type": "grammar",
-                            "lesson_id": command.lesson_id,
-                            "language": command.language,
-                            "topic": command.topic,
-                            "status": command.grammar_status,
-                            "sender": item.sender,
-                            "mailbox": item.mailbox,
-                            "message_key": item.message_key,
-                        }
-                    )
-                    applied += 1
-
-            state_repo.mark_feedback_message_processed(item.message_key)
-            processed_keys.add(item.message_key)
-            processed_marks.append((item.mailbox, item.msg_id))
 
         client.mark_seen(processed_marks)
+        applier.state_repo.save_imap_checkpoints(client.checkpoints)
+
+        print(f"[IMAP] {client.timing_summary()}")
+        for mailbox, seconds in client.mailbox_timings.items():
+            print(f"[IMAP] mailbox {mailbox}: {seconds:.2f}s")
         print(f"Feedback processed: {applied}/{len(items)}")
         return applied
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.config import Settings
+from app.services.email.outbox import Outbox, OutboxEntry
+from app.services.email.smtp_sender import OutgoingEmail, SMTPSender
+from app.services.state.repository import StateRepository
+
+
+def build_smtp_sender(settings: Settings) -> SMTPSender:
+    return SMTPSender(
+        host=settings.smtp_host,
+        port=settings.smtp_port,
+        username=settings.smtp_user,
+        password=settings.smtp_password,
+        sender=settings.email_from,
+        connections=settings.smtp_connections,
+        max_messages_per_connection=settings.smtp_max_messages_per_connection,
+    )
+
+
+def send_or_enqueue(
+    settings: Settings,
+    outbox: Optional[Outbox],
+    *,
+    key: str,
+    email: OutgoingEmail,
+    meta: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Send now, or spool for the outbox worker when one is running; returns what happened.
+
+    ``meta`` travels with a spooled email to the outbox's delivery hook (see ``record_delivery``).
+    """
+    sender = build_smtp_sender(settings)
+    if outbox is None:
+        sender.send_html(
+            to_address=email.to_address,
+            subject=email.subject,
+            html_body=email.html_body,
+            audio_attachment=email.audio_attachment,
+        )
+        return "sent"
+    if not email.to_address:
+        raise ValueError("SMTP config is incomplete")
+    if not outbox.enqueue(key, sender.serialize(email), label=email.subject, meta=meta):
+        return "already queued"
+    return "queued"
+
+
+def record_delivery(data_dir: Path) -> Callable[[OutboxEntry], None]:
+    """Outbox hook logging a spooled lesson as sent only once SMTP accepted it."""
+
+    def record(entry: OutboxEntry) -> None:
+        lesson = entry.meta.get("sent_lesson")
+        if not lesson:
+            return
+        repo = StateRepository(data_dir=data_dir, learner_id=entry.meta.get("learner_id", ""))
+        with repo.batched_writes():
+            repo.record_sent_entry(lesson)
+
+    return record
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.config import Settings
+from app.pipeline.mail import send_or_enqueue
+from app.services.email.optimizer import EmailOptimizer
+from app.services.email.outbox import Outbox
+from app.services.email.renderer import EmailRenderer
+from app.services.email.smtp_sender import OutgoingEmail
+from app.services.reporting.analytics import EventColumns, build_progress_report
+from app.services.state.learners import LearnerProfile
+from app.services.state.repository import StateRepository
+
+
+@dataclass
+class ProgressReportJob:
+    settings: Settings
+    # When set, the email is spooled for the outbox worker instead of sent inline.
+    outbox: Optional[Outbox] = None
+
+    def run(self, dry_run: bool = False, learner: Optional[LearnerProfile] = None, period: str = "monthly") -> None:
+        email_to = learner.email if learner else self.settings.email_to
+        state_repo = StateRepository.for_learner(self.settings.data_dir, learner)
+
+        sent_log = state_repo.load_json(state_repo.sent_log_path, {"lessons": []})
+        feedback_log = state_repo.load_json(state_repo.feedback_log_path, {"events": []})
+        columns = EventColumns.from_logs(
+            {state_repo.learner_id: feedback_log.get("events", [])},
+            {state_repo.learner_id: sent_log.get("lessons", [])},
+        )
+        report = build_progress_report(columns, period=period, now=datetime.utcnow())
+
+        renderer = EmailRenderer(template_dir=self.settings.template_dir, cache_dir=self.settings.jinja_cache_dir)
+        html = renderer.render_progress_report(report=report)
+        html = EmailOptimizer(inline_css=self.settings.email_inline_css, minify=self.settings.email_minify_html).optimize(html)
+
+        if dry_run:
+            suffix = f"-{state_repo.learner_id}" if state_repo.learner_id else ""
+            output = self.settings.data_dir / "logs" / f"latest_progress_report_preview{suffix}.html"
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(html, encoding="utf-8")
+            print(f"[DRY-RUN] Progress report HTML saved to: {output}")
+            return
+
+        status = send_or_enqueue(
+            self.settings,
+            self.outbox,
+            key=f"progress:{state_repo.learner_id or 'default'}:{period}:{report['range_label']}",
+            email=OutgoingEmail(to_address=email_to, subject=f"[LLDN Progress] {report['range_label']}", html_body=html),
+        )
+        print(f"Progress report {status} for {email_to}")
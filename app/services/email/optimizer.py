@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+_STYLE_BLOCK = re.compile(r"<style\b[^>]*>(.*?)</style>\s*", re.IGNORECASE | re.DOTALL)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_COMPOUND = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>")
+_CLASS_ATTR = re.compile(r"""\sclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_STYLE_ATTR = re.compile(r"""\sstyle\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_RAW_TEXT_TAGS = ("script", "style", "textarea")
+_RAW_BLOCK = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_LINE_BREAK = re.compile(r"[ \t\r\f\v]*\n\s*")
+_SPACE_RUN = re.compile(r"[ \t]{2,}")
+_VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+)
+
+# (tag or None, classes) for one simple selector step, e.g. ``a.button`` or ``.row``.
+_Compound = Tuple[Optional[str], FrozenSet[str]]
+_Element = Tuple[str, FrozenSet[str]]
+
+
+@dataclass
+class _Rule:
+    compounds: List[_Compound]
+    declarations: List[Tuple[str, str]]
+    specificity: Tuple[int, int, int]
+
+    def matches(self, path: Tuple[_Element, ...]) -> bool:
+        if not _compound_matches(self.compounds[-1], path[-1]):
+            return False
+        depth = len(path) - 1
+        for compound in reversed(self.compounds[:-1]):
+            depth -= 1
+            while depth >= 0 and not _compound_matches(compound, path[depth]):
+                depth -= 1
+            if depth < 0:
+                return False
+        return True
+
+
+def _compound_matches(compound: _Compound, element: _Element) -> bool:
+    tag, classes = compound
+    return (tag is None or tag == element[0]) and classes <= element[1]
+
+
+@dataclass
+class _Stylesheet:
+    """Parsed ``<style>`` rules plus a memo of computed styles per element path.
+
+    Built once per distinct stylesheet text (i.e. per template version) and reused
+    for every message rendered from that template.
+    """
+
+    rules: List[_Rule]
+    residual_css: str
+    _computed: Dict[Tuple[_Element, ...], str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def parse(cls, css: str) -> "_Stylesheet":
+        rules: List[_Rule] = []
+        residual: List[str] = []
+        for order, (selector_text, body) in enumerate(_css_blocks(_CSS_COMMENT.sub("", css))):
+            if selector_text.startswith("@"):
+                residual.append(f"{selector_text}{{{body}}}")
+                continue
+            declarations = _parse_declarations(body)
+            kept: List[str] = []
+            for selector in selector_text.split(","):
+                compounds = _parse_selector(selector)
+                if compounds is None:
+                    kept.append(selector.strip())
+                    continue
+                tags = sum(1 for tag, _ in compounds if tag)
+                classes = sum(len(names) for _, names in compounds)
+                rules.append(_Rule(compounds, declarations, (classes, tags, order)))
+            if kept:
+                residual.append(f"{','.join(kept)}{{{body}}}")
+        rules.sort(key=lambda rule: rule.specificity)
+        return cls(rules=rules, residual_css=_minify_css("".join(residual)))
+
+    def style_for(self, path: Tuple[_Element, ...]) -> str:
+        style = self._computed.get(path)
+        if style is None:
+            merged: Dict[str, str] = {}
+            for rule in self.rules:
+                if rule.matches(path):
+                    merged.update(rule.declarations)
+            style = ";".join(f"{name}:{value}" for name, value in merged.items())
+            self._computed[path] = style
+        return style
+
+
+def _css_blocks(css: str) -> List[Tuple[str, str]]:
+    """Top-level ``selector { body }`` pairs; at-rule bodies are kept whole."""
+    blocks: List[Tuple[str, str]] = []
+    depth = 0
+    start = 0
+    selector = ""
+    for idx, char in enumerate(css):
+        if char == "{":
+            if depth == 0:
+                selector = css[start:idx].strip()
+                start = idx + 1
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append((selector, css[start:idx].strip()))
+                start = idx + 1
+    return blocks
+
+
+def _parse_selector(selector: str) -> Optional[List[_Compound]]:
+    compounds: List[_Compound] = []
+    for part in selector.split():
+        match = _COMPOUND.match(part)
+        if match is None or not part:
+            return None
+        tag, classes = match.groups()
+        compounds.append((tag.lower() if tag else None, frozenset(filter(None, classes.split(".")))))
+    return compounds or None
+
+
+def _parse_declarations(body: str) -> List[Tuple[str, str]]:
+    declarations: List[Tuple[str, str]] = []
+    for item in body.split(";"):
+        name, sep, value = item.partition(":")
+        if sep and name.strip() and value.strip():
+            declarations.append((name.strip().lower(), " ".join(value.split())))
+    return declarations
+
+
+def _minify_css(css: str) -> str:
+    css = " ".join(css.split())
+    return re.sub(r"\s*([{};:,])\s*", r"\1", css).replace(";}", "}")
+
+
+_STYLESHEETS: Dict[str, _Stylesheet] = {}
+_STYLESHEETS_LOCK = threading.Lock()
+
+
+def _stylesheet(css: str) -> _Stylesheet:
+    key = hashlib.sha256(css.encode("utf-8")).hexdigest()
+    with _STYLESHEETS_LOCK:
+        sheet = _STYLESHEETS.get(key)
+        if sheet is None:
+            sheet = _Stylesheet.parse(css)
+            _STYLESHEETS[key] = sheet
+        return sheet
+
+
+def inline_css(html: str) -> str:
+    """Move ``<style>`` rules onto the matching elements' ``style`` attributes.
+
+    Only tag/class selectors with descendant combinators are inlined, which is
+    all the bundled templates use; anything else (pseudo classes, ``@media``)
+    stays in a minified ``<style>`` block. Existing ``style`` attributes win.
+    """
+    blocks = _STYLE_BLOCK.findall(html)
+    if not blocks:
+        return html
+    sheet = _stylesheet("\n".join(blocks))
+
+    first = _STYLE_BLOCK.search(html)
+    assert first is not None
+    residual = f"<style>{sheet.residual_css}</style>" if sheet.residual_css else ""
+    html = html[: first.start()] + residual + _STYLE_BLOCK.sub("", html[first.start() :])
+
+    out: List[str] = []
+    stack: List[_Element] = []
+    position = 0
+    raw_until = ""
+    for match in _TAG.finditer(html):
+        closing, tag, attrs = match.group(1), match.group(2).lower(), match.group(3)
+        if raw_until:
+            if closing and tag == raw_until:
+                raw_until = ""
+            continue
+        if closing:
+            for depth in range(len(stack) - 1, -1, -1):
+                if stack[depth][0] == tag:
+                    del stack[depth:]
+                    break
+            continue
+
+        class_match = _CLASS_ATTR.search(attrs)
+        classes = frozenset((class_match.group(1) or class_match.group(2) or "").split()) if class_match else frozenset()
+        element = (tag, classes)
+        path = (*stack, element)
+        if tag not in _VOID_TAGS and not attrs.rstrip().endswith("/"):
+            stack.append(element)
+        if tag in _RAW_TEXT_TAGS:
+            raw_until = tag
+
+        style = sheet.style_for(path)
+        if not style:
+            continue
+        style_match = _STYLE_ATTR.search(attrs)
+        if style_match:
+            own = style_match.group(1) if style_match.group(1) is not None else style_match.group(2)
+            merged = dict(_parse_declarations(style))
+            merged.update(_parse_declarations(own))
+            value = ";".join(f"{name}:{val}" for name, val in merged.items())
+            attrs = f'{attrs[: style_match.start()]} style="{_attr(value)}"{attrs[style_match.end() :]}'
+        else:
+            stripped = attrs.rstrip()
+            if stripped.endswith("/"):
+                attrs = f'{stripped[:-1].rstrip()} style="{_attr(style)}" /'
+            else:
+                attrs = f'{attrs.rstrip()} style="{_attr(style)}"'
+        out.append(html[position : match.start()])
+        out.append(f"<{match.group(2)}{attrs}>")
+        position = match.end()
+
+    out.append(html[position:])
+    return "".join(out)
+
+
+def _attr(value: str) -> str:
+    return value.replace("&", "&amp;").replace('"', "&quot;")
+
+
+def minify_html(html: str) -> str:
+    """Drop comments and indentation without changing how the email renders.
+
+    Whitespace runs that contain a line break collapse to a single newline (so
+    ``white-space: pre-line`` text keeps its lines); ``pre``/``textarea``/
+    ``script``/``style`` contents are left alone. Conditional comments stay.
+    """
+    parts = _RAW_BLOCK.split(html)
+    out: List[str] = []
+    # split() yields text, whole raw block, tag name, text, ...
+    for idx in range(0, len(parts), 3):
+        text = _HTML_COMMENT.sub("", parts[idx])
+        text = _SPACE_RUN.sub(" ", _LINE_BREAK.sub("\n", text))
+        out.append(text)
+        if idx + 1 < len(parts):
+            out.append(parts[idx + 1])
+    return "".join(out).strip()
+
+
+@dataclass
+class EmailOptimizer:
+    """Post-render stage applied to every outgoing HTML email."""
+
+    inline_css: bool = True
+    minify: bool = True
+
+    def optimize(self, html: str) -> str:
+        if self.inline_css:
+            html = inline_css(html)
+        if self.minify:
+            html = minify_html(html)
+        return html
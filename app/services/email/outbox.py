@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.services.email.smtp_sender import Envelope, SMTPSender
+
+MAX_ATTEMPTS = 8
+BASE_BACKOFF_SECONDS = 30.0
+MAX_BACKOFF_SECONDS = 3600.0
+# Sent markers only exist to reject duplicate enqueues (workflow retries, reruns).
+SENT_RETENTION_SECONDS = 14 * 24 * 3600
+
+
+@dataclass
+class OutboxEntry:
+    key: str
+    to_address: str
+    label: str
+    created_at: str
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    last_error: str = ""
+    # Passed to Outbox.on_delivered once the message is sent, e.g. which lesson to log.
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+def _entry_id(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+@dataclass
+class Outbox:
+    """On-disk spool of serialized emails between rendering and SMTP delivery.
+
+    Layout under ``root``: ``pending/<id>.eml`` holds the MIME bytes and
+    ``pending/<id>.json`` the entry; the JSON is written last, so an entry is
+    only visible once its payload is complete. Delivered entries leave a small
+    marker in ``sent/``, entries that ran out of attempts move to ``failed/``
+    for inspection; enqueueing the same key again replaces a failed entry.
+    Delivery is at-least-once: a crash between the SMTP reply and the marker
+    write sends that message again on the next run.
+    """
+
+    root: Path
+    max_attempts: int = MAX_ATTEMPTS
+    base_backoff: float = BASE_BACKOFF_SECONDS
+    max_backoff: float = MAX_BACKOFF_SECONDS
+    # Called with each entry right after its delivery; errors are logged, the entry stays sent.
+    on_delivered: Optional[Callable[[OutboxEntry], None]] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self.pending_dir = self.root / "pending"
+        self.sent_dir = self.root / "sent"
+        self.failed_dir = self.root / "failed"
+        for directory in (self.pending_dir, self.sent_dir, self.failed_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        # Set on every enqueue so an in-process worker wakes up immediately.
+        self.enqueued = threading.Event()
+
+    def contains(self, key: str) -> bool:
+        """True when ``key`` is queued or was delivered recently; failed keys may be enqueued again."""
+        name = f"{_entry_id(key)}.json"
+        return any((directory / name).exists() for directory in (self.pending_dir, self.sent_dir))
+
+    def enqueue(
+        self, key: str, envelope: Envelope, *, label: str = "", meta: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Spool a message under an idempotency key; False if the key was already seen."""
+        if self.contains(key):
+            print(f"[OUTBOX] Skipped duplicate {key}")
+            return False
+        entry = OutboxEntry(
+            key=key,
+            to_address=envelope.to_address,
+            label=label,
+            created_at=datetime.utcnow().isoformat(timespec="seconds"),
+            meta=dict(meta or {}),
+        )
+        entry_id = _entry_id(key)
+        _write_atomic(self.pending_dir / f"{entry_id}.eml", envelope.payload)
+        self._save(self.pending_dir, entry)
+        # A rerun retries what an earlier run gave up on.
+        for name in (f"{entry_id}.json", f"{entry_id}.eml"):
+            (self.failed_dir / name).unlink(missing_ok=True)
+        self.enqueued.set()
+        return True
+
+    def pending(self) -> List[OutboxEntry]:
+        entries = []
+        for path in self.pending_dir.glob("*.json"):
+            try:
+                entries.append(OutboxEntry(**json.loads(path.read_text(encoding="utf-8"))))
+            except (OSError, ValueError, TypeError):
+                continue
+        return sorted(entries, key=lambda entry: entry.created_at)
+
+    def deliver_due(self, sender: SMTPSender, now: Optional[float] = None) -> int:
+        """Send every entry whose retry time has come; returns the number delivered."""
+        with self._locked() as locked:
+            if not locked:
+                return 0
+            now = time.time() if now is None else now
+            due = [entry for entry in self.pending() if entry.next_attempt_at <= now]
+            envelopes = []
+            for entry in list(due):
+                payload_path = self.pending_dir / f"{_entry_id(entry.key)}.eml"
+                try:
+                    envelopes.append(Envelope(to_address=entry.to_address, payload=payload_path.read_bytes()))
+                except OSError as exc:
+                    due.remove(entry)
+                    entry.last_error = f"payload unreadable: {exc}"
+                    self._move(entry, self.failed_dir)
+            if not envelopes:
+                self._prune_sent(now)
+                return 0
+
+            delivered = 0
+            for entry, result in zip(due, sender.deliver(envelopes)):
+                entry.attempts += 1
+                if result.ok:
+                    entry.last_error = ""
+                    self._move(entry, self.sent_dir)
+                    delivered += 1
+                    self._notify_delivered(entry)
+                    continue
+                entry.last_error = result.error
+                if result.permanent or entry.attempts >= self.max_attempts:
+                    print(f"[OUTBOX] Giving up on {entry.key} after {entry.attempts} attempt(s): {result.error}")
+                    self._move(entry, self.failed_dir)
+                    continue
+                entry.next_attempt_at = now + min(self.base_backoff * 2 ** (entry.attempts - 1), self.max_backoff)
+                self._save(self.pending_dir, entry)
+            self._prune_sent(now)
+            return delivered
+
+    def drain(
+        self,
+        sender: SMTPSender,
+        *,
+        timeout: float,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.time,
+    ) -> int:
+        """Deliver until the spool is empty or ``timeout`` seconds passed; returns entries left."""
+        deadline = clock() + timeout
+        while True:
+            self.deliver_due(sender, now=clock())
+            entries = self.pending()
+            if not entries:
+                return 0
+            wait = min(entry.next_attempt_at for entry in entries) - clock()
+            if clock() + max(wait, 0.0) > deadline:
+                return len(entries)
+            sleep(max(wait, 1.0))
+
+    def _notify_delivered(self, entry: OutboxEntry) -> None:
+        if self.on_delivered is None:
+            return
+        try:
+            self.on_delivered(entry)
+        except Exception as exc:
+            print(f"[WARN] Post-delivery hook failed for {entry.key}: {exc}")
+
+    def _save(self, directory: Path, entry: OutboxEntry) -> None:
+        payload = json.dumps(asdict(entry), ensure_ascii=False, indent=2).encode("utf-8")
+        _write_atomic(directory / f"{_entry_id(entry.key)}.json", payload)
+
+    def _move(self, entry: OutboxEntry, directory: Path) -> None:
+        entry_id = _entry_id(entry.key)
+        self._save(directory, entry)
+        eml = self.pending_dir / f"{entry_id}.eml"
+        if directory == self.failed_dir and eml.exists():
+            os.replace(eml, directory / eml.name)
+        (self.pending_dir / f"{entry_id}.json").unlink(missing_ok=True)
+        eml.unlink(missing_ok=True)
+
+    def _prune_sent(self, now: float) -> None:
+        for path in self.sent_dir.glob("*.json"):
+            try:
+                if now - path.stat().st_mtime > SENT_RETENTION_SECONDS:
+                    path.unlink()
+            except OSError:
+                continue
+
+    @contextmanager
+    def _locked(self) -> Iterator[bool]:
+        # Keeps an in-process worker and a separate --deliver run from sending the same entry.
+        with (self.root / ".lock").open("a") as fh:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+@dataclass
+class OutboxWorker:
+    """Background thread delivering the outbox while the jobs keep generating.
+
+    ``stop`` keeps delivering for up to ``drain_timeout`` seconds and returns the
+    number of entries still queued; those stay on disk for ``--deliver`` or the next run.
+    """
+
+    outbox: Outbox
+    sender: SMTPSender
+    poll_seconds: float = 5.0
+
+    def __post_init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="outbox-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain_timeout: float) -> int:
+        if self._thread is not None:
+            self._stop.set()
+            self.outbox.enqueued.set()
+            self._thread.join()
+            self._thread = None
+        return self.outbox.drain(self.sender, timeout=drain_timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.outbox.enqueued.wait(self.poll_seconds)
+            self.outbox.enqueued.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.outbox.deliver_due(self.sender)
+            except Exception as exc:
+                print(f"[WARN] Outbox delivery failed: {exc}")
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote, urlencode
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from jinja2.environment import TemplateModule
+from markupsafe import Markup, escape
 
 from app.models.schemas import DailyLesson
+from app.services.feedback.parser import learner_token
 
 
 WORD_STATUS_LABELS: Dict[str, str] = {
@@ -24,12 +32,94 @@ GRAMMAR_STATUS_LABELS: Dict[str, str] = {
 }
 
 
+# One environment per (template_dir, cache_dir): compiled templates stay in the
+# environment's template cache across renders and renderer instances, and the
+# bytecode cache lets a fresh process skip compiling unchanged templates.
+_ENVIRONMENTS: Dict[Tuple[str, str], Environment] = {}
+_ENVIRONMENTS_LOCK = threading.Lock()
+
+
+def get_environment(template_dir: Path, cache_dir: Optional[Path] = None) -> Environment:
+    key = (str(template_dir), str(cache_dir or ""))
+    with _ENVIRONMENTS_LOCK:
+        env = _ENVIRONMENTS.get(key)
+        if env is None:
+            bytecode_cache = None
+            if cache_dir is not None:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+            env = Environment(
+                loader=FileSystemLoader(str(template_dir)),
+                autoescape=select_autoescape(["html", "xml"]),
+                trim_blocks=True,
+                lstrip_blocks=True,
+                bytecode_cache=bytecode_cache,
+            )
+            _ENVIRONMENTS[key] = env
+        return env
+
+
+# Per-recipient values in daily_email.html.j2. The skeleton is rendered with a
+# marker in each slot and split on the markers; recipients only fill the slots.
+SKELETON_SLOTS = ("feedback_section", "grammar_status_label")
+_SLOT_MARKER = "<!--lldn-slot:{}-->"
+_SLOT_PATTERN = re.compile(r"<!--lldn-slot:(\w+)-->")
+SKELETON_CACHE_SIZE = 16
+
+
+@dataclass
+class LessonSkeleton:
+    """Lesson-wide HTML split around the per-recipient slots.
+
+    ``word_rows``/``grammar_rows`` hold the feedback form rows pre-rendered for every
+    status, so a recipient only picks rows instead of rendering them.
+    """
+
+    lesson: DailyLesson
+    chunks: List[str]
+    slots: List[str]
+    word_rows: List[Dict[str, str]]
+    grammar_rows: Dict[str, str]
+
+    def assemble(self, fragments: Dict[str, str]) -> str:
+        parts = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            parts.append(fragments[slot])
+            parts.append(chunk)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def _quote_line(line: str) -> str:
+    return quote(line, safe="")
+
+
+_SKELETONS: "OrderedDict[Tuple[str, str, str], LessonSkeleton]" = OrderedDict()
+_SKELETONS_LOCK = threading.Lock()
+
+
+def _lesson_fingerprint(lesson: DailyLesson, *parts: object) -> str:
+    # The dataclass repr covers every field and is several times cheaper than to_dict() + json.
+    # Word and grammar statuses are per recipient (they only feed the slots), so they are left out.
+    shared = replace(
+        lesson,
+        keywords=[replace(item, mastery_level="") for item in lesson.keywords],
+        grammar_point=replace(lesson.grammar_point, status=""),
+    )
+    return hashlib.sha256(repr((shared, *parts)).encode("utf-8")).hexdigest()
+
+
 @dataclass
 class EmailRenderer:
     template_dir: Path
     feedback_email: str = ""
     feedback_subject_prefix: str = "[LLDN]"
     feedback_token: str = ""
+    learner_id: str = ""
+    # When set, the feedback form posts straight to the HTTP receiver instead of mailto.
+    feedback_http_url: str = ""
+    # Jinja bytecode cache directory, normally data/cache/jinja.
+    cache_dir: Optional[Path] = None
 
     def render_daily_lesson(
         self,
@@ -38,74 +128,160 @@ class EmailRenderer:
         audio_url: Optional[str],
         has_audio_attachment: bool,
     ) -> str:
-        env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=select_autoescape(["html", "xml"]),
-            trim_blocks=True,
-            lstrip_blocks=True,
+        skeleton = self.render_lesson_skeleton(lesson=lesson, audio_url=audio_url, has_audio_attachment=has_audio_attachment)
+        # The cached skeleton may come from another learner's copy of the lesson; the statuses are this one's.
+        return self.render_for_recipient(
+            skeleton,
+            word_statuses={item.word: item.mastery_level for item in lesson.keywords},
+            grammar_status=lesson.grammar_point.status,
         )
 
-        word_cards = []
-        for idx, item in enumerate(lesson.keywords, start=1):
-            status = item.mastery_level if item.mastery_level in WORD_STATUS_LABELS else "unknown"
-            word_cards.append(
-                {
-                    "idx": idx,
-                    "word": item,
-                    "status": status,
-                    "status_label": WORD_STATUS_LABELS.get(status, "未标记"),
-                }
-            )
+    def render_lesson_skeleton(
+        self,
+        *,
+        lesson: DailyLesson,
+        audio_url: Optional[str],
+        has_audio_attachment: bool,
+    ) -> LessonSkeleton:
+        """Render the lesson-wide part of the daily email once; cached per lesson content and day.
 
-        grammar_status = lesson.grammar_point.status if lesson.grammar_point.status in GRAMMAR_STATUS_LABELS else "unknown"
+        Sending the same lesson to many learners then costs one skeleton render
+        plus a small ``render_for_recipient`` per learner.
+        """
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        key = (
+            str(self.template_dir),
+            str(self.cache_dir or ""),
+            _lesson_fingerprint(lesson, audio_url, has_audio_attachment, today),
+        )
+        with _SKELETONS_LOCK:
+            skeleton = _SKELETONS.get(key)
+            if skeleton is not None:
+                _SKELETONS.move_to_end(key)
+                return skeleton
 
-        template = env.get_template("daily_email.html.j2")
-        return template.render(
+        template = self._environment().get_template("daily_email.html.j2")
+        html = template.render(
             lesson=lesson,
             sentence_pairs=lesson.sentence_pairs,
-            word_cards=word_cards,
-            grammar_status=grammar_status,
-            grammar_status_label=GRAMMAR_STATUS_LABELS.get(grammar_status, "未标记"),
-            feedback_form_action=self._feedback_form_action(lesson.lesson_id),
-            feedback_fallback_link=self._feedback_fallback_link(lesson),
-            feedback_token=self.feedback_token,
+            word_cards=[{"idx": idx, "word": item} for idx, item in enumerate(lesson.keywords, start=1)],
             audio_url=audio_url,
             has_audio_attachment=has_audio_attachment,
-            today=datetime.utcnow().strftime("%Y-%m-%d"),
+            today=today,
+            **{slot: Markup(_SLOT_MARKER.format(slot)) for slot in SKELETON_SLOTS},
+        )
+        pieces = _SLOT_PATTERN.split(html)
+        feedback = self._feedback_macros()
+        skeleton = LessonSkeleton(
+            lesson=lesson,
+            chunks=pieces[0::2],
+            slots=pieces[1::2],
+            word_rows=[
+                {status: str(feedback.word_row(idx, item, status)) for status in WORD_STATUS_LABELS}
+                for idx, item in enumerate(lesson.keywords, start=1)
+            ],
+            grammar_rows={status: str(feedback.grammar_row(lesson, status)) for status in GRAMMAR_STATUS_LABELS},
         )
 
-    def render_weekly_report(self, report: Dict[str, object]) -> str:
-        env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=select_autoescape(["html", "xml"]),
-            trim_blocks=True,
-            lstrip_blocks=True,
+        with _SKELETONS_LOCK:
+            _SKELETONS[key] = skeleton
+            while len(_SKELETONS) > SKELETON_CACHE_SIZE:
+                _SKELETONS.popitem(last=False)
+        return skeleton
+
+    def render_for_recipient(
+        self,
+        skeleton: LessonSkeleton,
+        *,
+        word_statuses: Optional[Dict[str, str]] = None,
+        grammar_status: Optional[str] = None,
+    ) -> str:
+        """Fill a skeleton with this renderer's learner, token and the learner's current statuses.
+
+        Statuses default to the ones stored on the lesson (the learner it was built for).
+        """
+        lesson = skeleton.lesson
+        statuses = self._word_statuses(lesson, word_statuses)
+        if grammar_status is None:
+            grammar_status = lesson.grammar_point.status
+        if grammar_status not in GRAMMAR_STATUS_LABELS:
+            grammar_status = "unknown"
+
+        feedback = self._feedback_macros()
+        feedback_section = "".join(
+            [
+                str(feedback.form_open(self._feedback_form_action(lesson.lesson_id), self._form_token(), lesson, self.learner_id)),
+                *(rows[status] for rows, status in zip(skeleton.word_rows, statuses)),
+                skeleton.grammar_rows[grammar_status],
+                str(feedback.form_close(self._feedback_fallback_link(lesson, statuses))),
+            ]
+        )
+        return skeleton.assemble(
+            {
+                "feedback_section": feedback_section,
+                "grammar_status_label": str(escape(GRAMMAR_STATUS_LABELS.get(grammar_status, "未标记"))),
+            }
         )
+
+    def render_weekly_report(self, report: Dict[str, object]) -> str:
+        env = self._environment()
         template = env.get_template("weekly_report.html.j2")
         return template.render(
             report=report,
             today=datetime.utcnow().strftime("%Y-%m-%d"),
         )
 
+    def render_progress_report(self, report: Dict[str, object]) -> str:
+        env = self._environment()
+        template = env.get_template("progress_report.html.j2")
+        return template.render(
+            report=report,
+            today=datetime.utcnow().strftime("%Y-%m-%d"),
+        )
+
+    def _environment(self) -> Environment:
+        return get_environment(self.template_dir, self.cache_dir)
+
+    def _feedback_macros(self) -> TemplateModule:
+        return self._environment().get_template("daily_email_feedback.html.j2").module
+
+    def _form_token(self) -> str:
+        return learner_token(self.feedback_token, self.learner_id)
+
     def _feedback_form_action(self, lesson_id: str) -> str:
+        if self.feedback_http_url:
+            return self.feedback_http_url
         if not self.feedback_email:
             return "#"
         subject = f"{self.feedback_subject_prefix} batch feedback {lesson_id}"
         query = urlencode({"subject": subject}, quote_via=quote)
         return f"mailto:{self.feedback_email}?{query}"
 
-    def _feedback_fallback_link(self, lesson: DailyLesson) -> str:
+    @staticmethod
+    def _word_statuses(lesson: DailyLesson, overrides: Optional[Dict[str, str]]) -> List[str]:
+        statuses = []
+        for item in lesson.keywords:
+            status = item.mastery_level
+            if overrides is not None:
+                status = overrides.get(item.word, status)
+            statuses.append(status if status in WORD_STATUS_LABELS else "unknown")
+        return statuses
+
+    def _feedback_fallback_link(self, lesson: DailyLesson, statuses: List[str]) -> str:
+        if not self.feedback_email:
+            return "#"
         body_lines = [
             "LLDN_FEEDBACK",
-            f"token={self.feedback_token}",
+            f"token={self._form_token()}",
             "type=batch",
             "lln_feedback=1",
             f"lesson_id={lesson.lesson_id}",
             f"language={lesson.language}",
         ]
+        if self.learner_id:
+            body_lines.append(f"learner_id={self.learner_id}")
 
-        for idx, item in enumerate(lesson.keywords, start=1):
-            current = item.mastery_level if item.mastery_level in WORD_STATUS_LABELS else "unknown"
+        for idx, (item, current) in enumerate(zip(lesson.keywords, statuses), start=1):
             body_lines.append(f"word_{idx}_text={item.word}")
             body_lines.append(f"word_{idx}_status={current}")
 
@@ -113,5 +289,7 @@ class EmailRenderer:
         body_lines.append("grammar_status=review")
 
         subject = f"{self.feedback_subject_prefix} batch feedback {lesson.lesson_id}"
-        query = urlencode({"subject": subject, "body": "\n".join(body_lines)}, quote_via=quote)
-        return f"mailto:{self.feedback_email}?{query}" if self.feedback_email else "#"
+        # Same as urlencode(..., quote_via=quote), quoting line by line so the lesson-wide
+        # lines are quoted once and reused across recipients.
+        body = "%0A".join(_quote_line(line) for line in body_lines)
+        return f"mailto:{self.feedback_email}?subject={_quote_line(subject)}&body={body}"
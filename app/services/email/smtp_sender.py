@@ -1,11 +1,76 @@
 from __future__ import annotations
 
 import mimetypes
+import queue
 import smtplib
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 from email.message import EmailMessage
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
+
+# Gmail hides everything after the first ~102 KB of HTML behind "[Message clipped]".
+GMAIL_CLIP_BYTES = 102 * 1024
+# A message is retried once on a fresh connection when the session itself failed.
+MAX_ATTEMPTS = 2
+
+
+def _is_permanent(exc: BaseException) -> bool:
+    """Rejections of the message or recipient, which a new connection would not fix."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)) and exc.smtp_code >= 500
+
+
+@dataclass
+class OutgoingEmail:
+    to_address: str
+    subject: str
+    html_body: str
+    audio_attachment: Optional[Path] = None
+
+
+@dataclass
+class Envelope:
+    """A serialized message ready for submission."""
+
+    to_address: str
+    payload: bytes
+
+
+@dataclass
+class SendResult:
+    to_address: str
+    ok: bool
+    size: int
+    # Seconds spent on this message, including (re)connecting when that was needed for it.
+    latency: float
+    attempts: int
+    error: str = ""
+    # The server rejected the message or recipient; sending it again will not help.
+    permanent: bool = False
+    exception: Optional[BaseException] = field(default=None, repr=False)
+
+
+class _Session:
+    """One authenticated SMTP connection and the number of messages sent over it."""
+
+    def __init__(self, sender: "SMTPSender") -> None:
+        self.smtp = smtplib.SMTP(sender.host, sender.port, timeout=sender.timeout)
+        try:
+            self.smtp.starttls()
+            self.smtp.login(sender.username, sender.password)
+        except Exception:
+            self.close()
+            raise
+        self.sent = 0
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
 
 
 @dataclass
@@ -15,6 +80,11 @@ class SMTPSender:
     username: str
     password: str
     sender: str
+    # Parallel sessions used by send_batch/deliver; one session handles messages in order.
+    connections: int = 1
+    # Start a fresh session after this many messages (providers cap messages per connection).
+    max_messages_per_connection: int = 100
+    timeout: float = 30.0
 
     def send_html(
         self,
@@ -23,10 +93,40 @@ class SMTPSender:
         subject: str,
         html_body: str,
         audio_attachment: Optional[Path] = None,
-    ) -> None:
-        if not all([self.host, self.port, self.username, self.password, self.sender, to_address]):
+    ) -> int:
+        """Send one HTML email and return the size in bytes of the submitted MIME message."""
+        if not to_address:
             raise ValueError("SMTP config is incomplete")
+        email = OutgoingEmail(to_address=to_address, subject=subject, html_body=html_body, audio_attachment=audio_attachment)
+        result = self.send_batch([email])[0]
+        if not result.ok:
+            raise result.exception or smtplib.SMTPException(result.error)
+        return result.size
+
+    def send_batch(self, emails: Sequence[OutgoingEmail]) -> List[SendResult]:
+        """Send many emails over ``connections`` reused sessions; one result per email, in order."""
+        return self.deliver([self.serialize(email) for email in emails])
 
+    def serialize(self, email: OutgoingEmail) -> Envelope:
+        msg = self.build_message(
+            to_address=email.to_address,
+            subject=email.subject,
+            html_body=email.html_body,
+            audio_attachment=email.audio_attachment,
+        )
+        # Serialize once: the same bytes are measured and submitted.
+        payload = msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+        self._report_size(email.html_body, payload, email.audio_attachment)
+        return Envelope(to_address=email.to_address, payload=payload)
+
+    def build_message(
+        self,
+        *,
+        to_address: str,
+        subject: str,
+        html_body: str,
+        audio_attachment: Optional[Path] = None,
+    ) -> EmailMessage:
         msg = EmailMessage()
         msg["Subject"] = subject
         msg["From"] = self.sender
@@ -37,15 +137,145 @@ class SMTPSender:
         if audio_attachment and audio_attachment.exists():
             ctype, _ = mimetypes.guess_type(str(audio_attachment))
             maintype, subtype = (ctype or "audio/mpeg").split("/", 1)
-            with audio_attachment.open("rb") as fh:
-                msg.add_attachment(
-                    fh.read(),
-                    maintype=maintype,
-                    subtype=subtype,
-                    filename=audio_attachment.name,
+            msg.add_attachment(
+                audio_attachment.read_bytes(),
+                maintype=maintype,
+                subtype=subtype,
+                filename=audio_attachment.name,
+            )
+        return msg
+
+    def deliver(self, envelopes: Sequence[Envelope]) -> List[SendResult]:
+        """Submit serialized messages, reconnecting on session failures."""
+        if not all([self.host, self.port, self.username, self.password, self.sender]):
+            raise ValueError("SMTP config is incomplete")
+        if not envelopes:
+            return []
+
+        pending: "queue.Queue[Tuple[int, Envelope]]" = queue.Queue()
+        for item in enumerate(envelopes):
+            pending.put(item)
+        results: List[Optional[SendResult]] = [None] * len(envelopes)
+        logins = [0]
+        crashes: List[BaseException] = []
+        # A rejected login fails the rest of the batch; retrying it per message can lock the account.
+        auth_errors: List[smtplib.SMTPAuthenticationError] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            session: Optional[_Session] = None
+            try:
+                while True:
+                    try:
+                        idx, envelope = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    if auth_errors:
+                        results[idx] = self._failed(envelope, auth_errors[0], started=time.perf_counter(), attempts=0)
+                        continue
+                    session, result, opened = self._deliver_one(session, envelope)
+                    results[idx] = result
+                    with lock:
+                        logins[0] += opened
+                        if isinstance(result.exception, smtplib.SMTPAuthenticationError):
+                            auth_errors.append(result.exception)
+            except BaseException as exc:
+                crashes.append(exc)
+            finally:
+                if session is not None:
+                    session.close()
+
+        workers = max(1, min(self.connections, len(envelopes)))
+        if workers == 1:
+            worker()
+        else:
+            threads = [threading.Thread(target=worker, name=f"smtp-{n}", daemon=True) for n in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if crashes:
+            raise crashes[0]
+
+        done = [result for result in results if result is not None]
+        self._report_batch(done, workers, logins[0])
+        return done
+
+    def _deliver_one(
+        self, session: Optional[_Session], envelope: Envelope
+    ) -> Tuple[Optional[_Session], SendResult, int]:
+        started = time.perf_counter()
+        opened = 0
+        error: Optional[BaseException] = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                if session is not None and session.sent >= self.max_messages_per_connection:
+                    session.close()
+                    session = None
+                if session is None:
+                    session = _Session(self)
+                    opened += 1
+                session.smtp.sendmail(self.sender, [envelope.to_address], envelope.payload)
+                session.sent += 1
+                result = SendResult(
+                    to_address=envelope.to_address,
+                    ok=True,
+                    size=len(envelope.payload),
+                    latency=time.perf_counter() - started,
+                    attempts=attempt,
                 )
+                print(f"[SMTP] Sent to {envelope.to_address} in {result.latency:.2f}s")
+                return session, result, opened
+            except (smtplib.SMTPException, OSError) as exc:
+                error = exc
+                if _is_permanent(exc):
+                    # The session is still usable; smtplib has already reset the transaction.
+                    break
+                if isinstance(exc, smtplib.SMTPAuthenticationError):
+                    # Bad credentials do not get better on a fresh connection.
+                    print(f"[WARN] SMTP login failed: {exc}")
+                    break
+                if session is not None:
+                    session.close()
+                    session = None
+                print(f"[WARN] SMTP attempt {attempt} for {envelope.to_address} failed: {exc}")
+
+        return session, self._failed(envelope, error, started=started, attempts=attempt), opened
+
+    @staticmethod
+    def _failed(
+        envelope: Envelope, error: Optional[BaseException], *, started: float, attempts: int
+    ) -> SendResult:
+        print(f"[WARN] SMTP delivery to {envelope.to_address} failed: {error}")
+        return SendResult(
+            to_address=envelope.to_address,
+            ok=False,
+            size=len(envelope.payload),
+            latency=time.perf_counter() - started,
+            attempts=attempts,
+            error=str(error),
+            permanent=error is not None and _is_permanent(error),
+            exception=error,
+        )
+
+    @staticmethod
+    def _report_size(html_body: str, payload: bytes, audio_attachment: Optional[Path]) -> None:
+        html_bytes = len(html_body.encode("utf-8"))
+        attachment = ""
+        if audio_attachment and audio_attachment.exists():
+            attachment = f", attachment {audio_attachment.stat().st_size / 1024:.1f} KB"
+        print(f"[SMTP] MIME size {len(payload) / 1024:.1f} KB (html {html_bytes / 1024:.1f} KB{attachment})")
+        if html_bytes > GMAIL_CLIP_BYTES:
+            print(f"[WARN] HTML body is {html_bytes / 1024:.0f} KB; Gmail clips messages above 102 KB")
 
-        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
-            smtp.starttls()
-            smtp.login(self.username, self.password)
-            smtp.send_message(msg)
+    @staticmethod
+    def _report_batch(results: List[SendResult], workers: int, logins: int) -> None:
+        if len(results) < 2:
+            return
+        sent = sum(1 for result in results if result.ok)
+        latencies = sorted(result.latency for result in results)
+        median = latencies[len(latencies) // 2]
+        print(
+            f"[SMTP] Batch: {sent}/{len(results)} sent over {workers} connection(s), {logins} login(s), "
+            f"median {median:.2f}s, max {latencies[-1]:.2f}s"
+        )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from app.services.feedback.parser import parse_feedback_commands
+from app.services.state.learners import LearnerRegistry, learner_registry_path
+from app.services.state.repository import StateRepository
+
+
+@dataclass
+class FeedbackApplier:
+    """Parse one feedback message and apply its commands to the right learner's state.
+
+    Shared by every feedback transport (IMAP polling, IDLE daemon, HTTP receiver).
+    Dedup keys and skip events always go to the default repository; word and grammar
+    updates go to the learner named in the message.
+    """
+
+    data_dir: Path
+    feedback_token: str
+    feedback_dedup_max_keys: int = 5000
+    state_repo: StateRepository = field(init=False)
+    _registry: LearnerRegistry = field(init=False, repr=False)
+    _learner_repos: Dict[str, StateRepository] = field(default_factory=dict, init=False, repr=False)
+    _batch: Optional[ExitStack] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.state_repo = StateRepository(data_dir=self.data_dir, feedback_dedup_max_keys=self.feedback_dedup_max_keys)
+        self._registry = LearnerRegistry.load(learner_registry_path(self.data_dir))
+        self._learner_repos = {"": self.state_repo}
+
+    @contextmanager
+    def batch(self) -> Iterator["FeedbackApplier"]:
+        """Apply several messages with one write per state file (see StateRepository.batched_writes)."""
+        if self._batch is not None:
+            yield self
+            return
+        with ExitStack() as stack:
+            self._batch = stack
+            try:
+                for repo in self._learner_repos.values():
+                    stack.enter_context(repo.batched_writes())
+                yield self
+            finally:
+                self._batch = None
+
+    def is_processed(self, message_key: str) -> bool:
+        return self.state_repo.is_feedback_message_processed(message_key)
+
+    def apply(self, *, body: str, message_key: str, sender: str, mailbox: str, subject: str = "") -> Optional[int]:
+        """Number of commands applied, or None when the message was already processed."""
+        if self.is_processed(message_key):
+            return None
+
+        commands = parse_feedback_commands(body, token=self.feedback_token)
+        learner_repo = self._learner_repository(commands[0].learner_id) if commands else None
+        if learner_repo is None:
+            reason = "unknown_learner" if commands else "no_valid_commands_or_token_mismatch"
+            self.state_repo.record_feedback_event(
+                {
+                    "type": "skip",
+                    "reason": reason,
+                    "subject": subject,
+                    "sender": sender,
+                    "mailbox": mailbox,
+                    "message_key": message_key,
+                    "body_preview": body[:240],
+                }
+            )
+            self.state_repo.mark_feedback_message_processed(message_key)
+            return 0
+
+        applied = 0
+        for command in commands:
+            if command.command_type == "word":
+                learner_repo.upsert_word_status(command.word, command.word_status)
+                learner_repo.record_feedback_event(
+                    {
+                        "type": "word",
+                        "lesson_id": command.lesson_id,
+                        "language": command.language,
+                        "word": command.word,
+                        "status": command.word_status,
+                        "sender": sender,
+                        "mailbox": mailbox,
+                        "message_key": message_key,
+                    }
+                )
+                applied += 1
+
+            elif command.command_type == "grammar":
+                learner_repo.set_grammar_status(command.topic, command.grammar_status)
+                learner_repo.record_feedback_event(
+                    {
+                        "type": "grammar",
+                        "lesson_id": command.lesson_id,
+                        "language": command.language,
+                        "topic": command.topic,
+                        "status": command.grammar_status,
+                        "sender": sender,
+                        "mailbox": mailbox,
+                        "message_key": message_key,
+                    }
+                )
+                applied += 1
+
+        self.state_repo.mark_feedback_message_processed(message_key)
+        return applied
+
+    def _learner_repository(self, learner_id: str) -> Optional[StateRepository]:
+        if learner_id in self._learner_repos:
+            return self._learner_repos[learner_id]
+        learner = self._registry.get(learner_id)
+        if learner is None:
+            return None
+        repo = StateRepository.for_learner(self.data_dir, learner)
+        if self._batch is not None:
+            self._batch.enter_context(repo.batched_writes())
+        self._learner_repos[learner_id] = repo
+        return repo
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import List
+
+from app.services.feedback.parser import has_feedback_marker
+
+# Tags whose start or end begins a new line of text.
+_BLOCK_TAGS = frozenset(
+    {"br", "p", "div", "tr", "li", "ul", "ol", "table", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "hr", "section"}
+)
+_SKIP_TAGS = frozenset({"script", "style", "head", "title"})
+_SPACES = re.compile(r"[ \t\f\v\xa0]+")
+FEED_CHUNK = 16 * 1024
+
+
+class _TextCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self._line: List[str] = []
+        self._skip_depth = 0
+        # Set as lines complete, so quote checks do not rescan everything collected so far.
+        self._marker_seen = False
+        self.stopped = False
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "blockquote" or (tag == "div" and ("class", "gmail_quote") in attrs):
+            # Quoted history of a reply: nothing after it matters once the feedback fields are in.
+            self.break_line()
+            self.stopped = self._marker_seen
+        if tag in _BLOCK_TAGS or tag == "blockquote":
+            self.break_line()
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        if tag in _BLOCK_TAGS:
+            self.break_line()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS or tag == "blockquote":
+            self.break_line()
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth or self.stopped:
+            return
+        pieces = data.replace("\r", "\n").split("\n")
+        self._line.append(pieces[0])
+        for piece in pieces[1:]:
+            self.break_line()
+            self._line.append(piece)
+
+    def break_line(self) -> None:
+        line = _SPACES.sub(" ", "".join(self._line)).strip()
+        self._line = []
+        if line:
+            self.lines.append(line)
+            if not self._marker_seen:
+                self._marker_seen = has_feedback_marker(line)
+
+
+def html_to_text(value: str) -> str:
+    """HTML to plain text lines in one streaming parse.
+
+    Block tags become line breaks (so ``key=value`` fields stay on their own
+    lines), script/style content is dropped and entities are decoded by the
+    parser. Once the feedback fields have been seen, parsing stops at the
+    start of quoted reply history instead of walking the rest of the thread.
+    """
+    if not value:
+        return ""
+
+    collector = _TextCollector()
+    for start in range(0, len(value), FEED_CHUNK):
+        collector.feed(value[start : start + FEED_CHUNK])
+        if collector.stopped:
+            break
+    else:
+        collector.close()
+    collector.break_line()
+    return "\n".join(collector.lines)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from app.services.feedback.applier import FeedbackApplier
+from app.services.feedback.parser import parse_feedback_commands
+
+MAX_BODY_BYTES = 64 * 1024
+WRITE_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class _Submission:
+    body: str
+    message_key: str
+    sender: str
+    done: threading.Event = field(default_factory=threading.Event)
+    applied: Optional[int] = None
+    error: str = ""
+
+
+def submission_key(body: str, now: datetime) -> str:
+    # Same form re-posted on the same day (double click, retry) is applied once;
+    # the same statuses sent again on a later day still count as a new review.
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+    return f"http:{now.strftime('%Y-%m-%d')}:{digest}"
+
+
+@dataclass
+class FeedbackHTTPReceiver:
+    """Small HTTP endpoint accepting the daily email's feedback form directly.
+
+    Request threads only validate the token and queue the submission. A single
+    writer thread drains the queue and applies each burst inside one
+    ``FeedbackApplier.batch()``, so concurrent submissions cost one write per
+    state file rather than several per submission. The batch's shard lock keeps
+    a concurrent ``--ingest-feedback`` run from overwriting those writes.
+    """
+
+    data_dir: Path
+    feedback_token: str
+    feedback_dedup_max_keys: int = 5000
+    host: str = "127.0.0.1"
+    port: int = 8787
+    path: str = "/feedback"
+    max_batch: int = 50
+    _queue: "queue.Queue[Optional[_Submission]]" = field(default_factory=queue.Queue, init=False, repr=False)
+    _server: Optional[ThreadingHTTPServer] = field(default=None, init=False, repr=False)
+    _writer: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+
+    def start(self) -> ThreadingHTTPServer:
+        # Without a token any POST could rewrite learner state.
+        if not self.feedback_token:
+            raise ValueError("FEEDBACK_TOKEN must be set to run the HTTP feedback receiver")
+        self._server = ThreadingHTTPServer((self.host, self.port), _FeedbackRequestHandler)
+        self._server.daemon_threads = True
+        self._server.receiver = self  # type: ignore[attr-defined]
+        self._writer = threading.Thread(target=self._drain, name="feedback-writer", daemon=True)
+        self._writer.start()
+        return self._server
+
+    def serve_forever(self) -> None:
+        server = self.start()
+        host, port = server.server_address[:2]
+        print(f"[HTTP] Feedback receiver listening on http://{host}:{port}{self.path}")
+        try:
+            server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def submit(self, body: str, sender: str) -> Optional[_Submission]:
+        """Queue a submission for the writer; None when the token/commands are invalid."""
+        if not self.feedback_token or not parse_feedback_commands(body, token=self.feedback_token):
+            return None
+        submission = _Submission(body=body, message_key=submission_key(body, datetime.utcnow()), sender=sender)
+        self._queue.put(submission)
+        return submission
+
+    def _drain(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch: List[_Submission] = [first]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._apply(batch)
+            if stop:
+                return
+
+    def _apply(self, batch: List[_Submission]) -> None:
+        try:
+            # Fresh state per burst so writes from other jobs are picked up.
+            applier = FeedbackApplier(
+                data_dir=self.data_dir,
+                feedback_token=self.feedback_token,
+                feedback_dedup_max_keys=self.feedback_dedup_max_keys,
+            )
+            with applier.batch():
+                for item in batch:
+                    item.applied = applier.apply(
+                        body=item.body,
+                        message_key=item.message_key,
+                        sender=item.sender,
+                        mailbox="http",
+                    )
+        except Exception as exc:
+            print(f"[WARN] Feedback HTTP batch failed: {exc}")
+            for item in batch:
+                item.error = str(exc)
+        finally:
+            for item in batch:
+                item.done.set()
+
+
+class _FeedbackRequestHandler(BaseHTTPRequestHandler):
+    server_version = "LLDNFeedback/1.0"
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/healthz":
+            self._reply(200, "ok")
+            return
+        self._reply(404, "not found")
+
+    def do_POST(self) -> None:
+        receiver: FeedbackHTTPReceiver = self.server.receiver  # type: ignore[attr-defined]
+        if urlsplit(self.path).path != receiver.path:
+            self._reply(404, "not found")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            self._reply(413, "request too large")
+            return
+
+        # text/plain form posts and urlencoded bodies are both understood by the feedback parser.
+        body = self.rfile.read(length).decode("utf-8", errors="replace")
+        submission = receiver.submit(body, sender=self.client_address[0])
+        if submission is None:
+            self._reply(403, "invalid feedback token or empty feedback")
+            return
+        if not submission.done.wait(WRITE_TIMEOUT_SECONDS) or submission.error:
+            self._reply(503, "feedback could not be saved, please retry")
+            return
+        if submission.applied is None:
+            self._reply(200, "feedback already received")
+            return
+        self._reply(200, f"feedback saved ({submission.applied} updates)")
+
+    def _reply(self, status: int, message: str) -> None:
+        payload = f"<!doctype html><meta charset='utf-8'><p>{message}</p>".encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        print(f"[HTTP] {self.address_string()} {format % args}")
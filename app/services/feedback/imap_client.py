@@ -2,12 +2,38 @@ from __future__ import annotations
 
 import email
 import imaplib
+import queue
 import re
-from dataclasses import dataclass
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from email.message import Message
+from email.parser import BytesHeaderParser
 from email.utils import parseaddr
-from html import unescape
-from typing import List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from app.services.feedback.html_text import html_to_text
+from app.services.feedback.imap_fetch import (
+    FetchedMessage,
+    TextPart,
+    chunked,
+    decode_part,
+    find_item,
+    group_fetch_response,
+    header_fields_item,
+    message_set,
+    parse_bodystructure,
+    select_text_parts,
+)
+from app.services.feedback.parser import has_feedback_marker
+
+HEADER_FIELDS = ("SUBJECT", "FROM", "MESSAGE-ID")
+FETCH_BATCH_SIZE = 100
+_IDLE_NEW_MAIL = re.compile(rb"\* \d+ (EXISTS|RECENT)\b", re.IGNORECASE)
 
 
 @dataclass
@@ -20,6 +46,87 @@ class InboxItem:
     message_key: str
 
 
+@dataclass
+class _Candidate:
+    msg_id: bytes
+    subject: str
+    sender: str
+    message_id_header: str
+    text_parts: List[TextPart]
+    gm_msgid: str = ""
+
+
+@dataclass
+class _MailboxScan:
+    mailbox: str
+    candidates: List[_Candidate]
+    uidvalidity: int = 0
+    # Checkpoint the scan started from and the UIDs it looked at (ascending).
+    last_uid: int = 0
+    uids: List[bytes] = field(default_factory=list)
+    # UIDs whose FETCH failed; the checkpoint stops before the first of them.
+    failed: set[bytes] = field(default_factory=set)
+
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+class _ConnectionPool:
+    """At most ``size`` authenticated connections, each used by one worker at a time.
+
+    The caller's own session is lent to the pool as its first connection; the
+    extra connections are opened on demand and logged out on exit.
+    """
+
+    def __init__(self, connect: Callable[[], imaplib.IMAP4_SSL], *, size: int, seed: imaplib.IMAP4_SSL) -> None:
+        self._connect = connect
+        self._size = size
+        self._idle: "queue.Queue[imaplib.IMAP4_SSL]" = queue.Queue()
+        self._idle.put(seed)
+        self._opened: List[imaplib.IMAP4_SSL] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "_ConnectionPool":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        for conn in self._opened:
+            try:
+                conn.logout()
+            except (imaplib.IMAP4.error, OSError):
+                pass
+        self._opened.clear()
+
+    def map(self, fn: Callable[[imaplib.IMAP4_SSL, _T], _R], items: Sequence[_T]) -> List[_R]:
+        with ThreadPoolExecutor(max_workers=self._size) as executor:
+            return list(executor.map(lambda item: self._run(fn, item), items))
+
+    def _run(self, fn: Callable[[imaplib.IMAP4_SSL, _T], _R], item: _T) -> _R:
+        conn = self._acquire()
+        try:
+            return fn(conn, item)
+        finally:
+            self._idle.put(conn)
+
+    def _acquire(self) -> imaplib.IMAP4_SSL:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._opened) + 1 < self._size:
+                conn = self._connect()
+                self._opened.append(conn)
+                return conn
+        return self._idle.get()
+
+
+def _fetched_uid(fetched: FetchedMessage) -> bytes:
+    uid = find_item(fetched.meta, "UID")
+    return uid.encode("ascii") if uid else fetched.seq
+
+
 @dataclass
 class IMAPFeedbackClient:
     host: str
@@ -29,74 +136,486 @@ class IMAPFeedbackClient:
     subject_prefix: str
     allowed_senders: List[str]
     mailboxes: List[str]
-
-    def fetch_recent_items(self, *, limit: int = 200) -> List[InboxItem]:
+    since_days: int = 30
+    # Connections used to scan mailboxes concurrently; 1 keeps the serial single-session scan.
+    parallel_mailboxes: int = 1
+    # mailbox -> {"uidvalidity": int, "last_uid": int}; advanced by fetch_recent_items up to
+    # the last UID it fetched completely, persisted by the caller once the items are applied.
+    checkpoints: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # Cumulative seconds per IMAP phase (connect/search/headers/bodies/store).
+    timings: Dict[str, float] = field(default_factory=dict, init=False)
+    mailbox_timings: Dict[str, float] = field(default_factory=dict, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _client: Optional[imaplib.IMAP4_SSL] = field(default=None, init=False, repr=False)
+    _selected: str = field(default="", init=False, repr=False)
+    # UIDVALIDITY reported when _selected was selected; imaplib hands the response out only once.
+    _selected_uidvalidity: int = field(default=0, init=False, repr=False)
+    _idle_tags: int = field(default=0, init=False, repr=False)
+
+    def __enter__(self) -> "IMAPFeedbackClient":
+        self.open()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def open(self) -> imaplib.IMAP4_SSL:
+        """Open (or reuse) the authenticated session shared by fetch and mark_seen."""
+        if self._client is not None:
+            return self._client
+        self._client = self._connect()
+        self._selected = ""
+        self._selected_uidvalidity = 0
+        return self._client
+
+    def _connect(self) -> imaplib.IMAP4_SSL:
         if not all([self.host, self.port, self.username, self.password]):
             raise ValueError("IMAP config is incomplete")
 
+        started = time.perf_counter()
+        client = imaplib.IMAP4_SSL(self.host, self.port)
+        client.login(self.username, self.password)
+        self._add_timing("connect", started)
+        return client
+
+    def close(self) -> None:
+        if self._client is None:
+            return
+        try:
+            self._client.logout()
+        except (imaplib.IMAP4.error, OSError):
+            pass
+        self._client = None
+        self._selected = ""
+        self._selected_uidvalidity = 0
+
+    def timing_summary(self) -> str:
+        return " ".join(f"{phase}={seconds:.2f}s" for phase, seconds in self.timings.items())
+
+    def idle(self, mailbox: str, *, timeout: float) -> bool:
+        """Wait in IMAP IDLE (RFC 2177) on the open session.
+
+        Returns True as soon as the server reports new messages, False when
+        ``timeout`` seconds pass without any. Connection problems surface as
+        ``imaplib.IMAP4.abort`` / ``OSError`` so the caller can reconnect.
+        """
+        client = self.open()
+        if not self._select_mailbox(client, mailbox):
+            raise imaplib.IMAP4.error(f"Cannot select mailbox for IDLE: {mailbox}")
+
+        self._idle_tags += 1
+        tag = f"LLDN{self._idle_tags}".encode("ascii")
+        client.send(tag + b" IDLE\r\n")
+        line = self._read_line(client)
+        if not line.startswith(b"+"):
+            raise imaplib.IMAP4.error(f"IDLE rejected: {line!r}")
+
+        changed = False
+        deadline = time.monotonic() + timeout
+        while not changed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._wait_readable(client, remaining):
+                break
+            changed = _IDLE_NEW_MAIL.match(self._read_line(client)) is not None
+
+        client.send(b"DONE\r\n")
+        while True:
+            line = self._read_line(client)
+            if line.startswith(tag + b" "):
+                break
+            changed = changed or _IDLE_NEW_MAIL.match(line) is not None
+        if not line.startswith(tag + b" OK"):
+            raise imaplib.IMAP4.error(f"IDLE failed: {line!r}")
+        return changed
+
+    def _read_line(self, client: imaplib.IMAP4_SSL) -> bytes:
+        line = client.readline()
+        if not line:
+            raise imaplib.IMAP4.abort("IMAP connection closed")
+        return line
+
+    def _wait_readable(self, client: imaplib.IMAP4_SSL, timeout: float) -> bool:
+        sock = client.socket()
+        if self._buffered(client, sock):
+            return True
+        pending = getattr(sock, "pending", None)
+        if pending is not None and pending():
+            return True
+        readable, _, _ = select.select([sock], [], [], timeout)
+        return bool(readable)
+
+    def _buffered(self, client: imaplib.IMAP4_SSL, sock: Any) -> bool:
+        # readline() reads ahead into client.file: "+ idling" and "* N EXISTS" arriving
+        # in one TLS record leave the second line there, invisible to select() and pending().
+        peek = getattr(getattr(client, "file", None), "peek", None)
+        if peek is None:
+            return False
+        timeout = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            # Returns the buffered bytes; with an empty buffer it tries one read that cannot block now.
+            return bool(peek(1))
+        except OSError:
+            return False
+        finally:
+            sock.settimeout(timeout)
+
+    def fetch_recent_items(self, *, limit: int = 200) -> List[InboxItem]:
         items: List[InboxItem] = []
         seen_keys: set[str] = set()
         normalized_allowed = {self._normalize_email(sender) for sender in self.allowed_senders if sender.strip()}
 
-        with imaplib.IMAP4_SSL(self.host, self.port) as client:
-            client.login(self.username, self.password)
+        with self._session() as client:
+            since = datetime.utcnow() - timedelta(days=self.since_days) if self.since_days > 0 else None
+            gmail = self._is_gmail(client)
+            mailboxes = self._order_mailboxes(client, self._resolve_mailboxes())
+
+            def scan(conn: imaplib.IMAP4_SSL, mailbox: str) -> Optional[_MailboxScan]:
+                return self._scan_mailbox(conn, mailbox, since=since, limit=limit, gmail=gmail, allowed=normalized_allowed)
+
+            workers = min(self.parallel_mailboxes, len(mailboxes))
+            if workers > 1:
+                # Headers for all mailboxes in parallel, dedup centrally in mailbox order so the
+                # result does not depend on which connection finished first, then bodies in parallel.
+                with _ConnectionPool(self._connect, size=workers, seed=client) as pool:
+                    scans = [item for item in pool.map(scan, mailboxes) if item is not None]
+                    fresh = [self._take_fresh(item, seen_keys) for item in scans]
+                    bodies = pool.map(
+                        lambda conn, pair: self._fetch_mailbox_bodies(conn, pair[0], pair[1]),
+                        list(zip(scans, fresh)),
+                    )
+                for item, taken, mailbox_bodies in zip(scans, fresh, bodies):
+                    items.extend(self._inbox_items(item, taken, mailbox_bodies))
+                    self._advance_checkpoint(item)
+            else:
+                for mailbox in mailboxes:
+                    item = scan(client, mailbox)
+                    if item is None:
+                        continue
+                    taken = self._take_fresh(item, seen_keys)
+                    mailbox_bodies = self._fetch_mailbox_bodies(client, item, taken)
+                    items.extend(self._inbox_items(item, taken, mailbox_bodies))
+                    self._advance_checkpoint(item)
+
+        return items
 
-            for mailbox in self._resolve_mailboxes():
-                if not self._select_mailbox(client, mailbox):
+    def _scan_mailbox(
+        self,
+        client: imaplib.IMAP4_SSL,
+        mailbox: str,
+        *,
+        since: Optional[datetime],
+        limit: int,
+        gmail: bool,
+        allowed: set[str],
+    ) -> Optional[_MailboxScan]:
+        started = time.perf_counter()
+        if not self._select_mailbox(client, mailbox):
+            return None
+
+        uidvalidity = self._uid_validity(client)
+        checkpoint = self.checkpoints.get(mailbox, {})
+        last_uid = 0
+        if uidvalidity and checkpoint.get("uidvalidity") == uidvalidity:
+            last_uid = int(checkpoint.get("last_uid", 0))
+        elif checkpoint:
+            print(f"[IMAP] UIDVALIDITY changed for {mailbox}; rescanning")
+
+        search_started = time.perf_counter()
+        msg_ids = self._search_candidates(client, since=since, after_uid=last_uid)
+        self._add_timing("search", search_started)
+
+        scan = _MailboxScan(mailbox=mailbox, candidates=[], uidvalidity=uidvalidity, last_uid=last_uid)
+        # With a checkpoint the oldest UIDs go first and the rest follow on the next run;
+        # without one nothing is resumed, so the newest messages are the useful ones.
+        scan.uids = msg_ids[:limit] if uidvalidity else msg_ids[-limit:]
+        if len(msg_ids) > limit and uidvalidity:
+            print(f"[IMAP] {mailbox}: {len(msg_ids)} new messages, fetching {limit} now and the rest next run")
+        if scan.uids:
+            headers_started = time.perf_counter()
+            scan.candidates = self._fetch_candidate_headers(client, scan.uids, allowed, gmail=gmail, failed=scan.failed)
+            self._add_timing("headers", headers_started)
+
+        self._add_mailbox_timing(mailbox, started)
+        return scan
+
+    def _advance_checkpoint(self, scan: _MailboxScan) -> None:
+        if not scan.uidvalidity:
+            return
+        last_uid = scan.last_uid
+        if scan.failed:
+            last_uid = max(last_uid, min(int(uid) for uid in scan.failed) - 1)
+        elif scan.uids:
+            last_uid = max(last_uid, max(int(uid) for uid in scan.uids))
+        with self._lock:
+            self.checkpoints[scan.mailbox] = {"uidvalidity": scan.uidvalidity, "last_uid": last_uid}
+
+    def _take_fresh(self, scan: _MailboxScan, seen_keys: set[str]) -> List[Tuple[_Candidate, str]]:
+        # Gmail lists one message under several labels (INBOX, All Mail, Sent Mail);
+        # drop copies already taken from an earlier mailbox before any body is fetched.
+        fresh: List[Tuple[_Candidate, str]] = []
+        for candidate in scan.candidates:
+            fallback_key = f"{scan.mailbox}:imap-{candidate.msg_id.decode(errors='ignore')}"
+            message_key = candidate.message_id_header or fallback_key
+            dedup_keys = {message_key}
+            if candidate.gm_msgid:
+                dedup_keys.add(f"x-gm-msgid:{candidate.gm_msgid}")
+            if dedup_keys & seen_keys:
+                continue
+            seen_keys.update(dedup_keys)
+            fresh.append((candidate, message_key))
+        return fresh
+
+    def _fetch_mailbox_bodies(
+        self,
+        client: imaplib.IMAP4_SSL,
+        scan: _MailboxScan,
+        fresh: List[Tuple[_Candidate, str]],
+    ) -> Dict[bytes, str]:
+        if not fresh:
+            return {}
+        started = time.perf_counter()
+        if not self._select_mailbox(client, scan.mailbox):
+            scan.failed.update(candidate.msg_id for candidate, _ in fresh)
+            return {}
+        bodies = self._fetch_text_bodies(client, [candidate for candidate, _ in fresh], failed=scan.failed)
+        self._add_timing("bodies", started)
+        self._add_mailbox_timing(scan.mailbox, started)
+        return bodies
+
+    def _inbox_items(
+        self,
+        scan: _MailboxScan,
+        fresh: List[Tuple[_Candidate, str]],
+        bodies: Dict[bytes, str],
+    ) -> List[InboxItem]:
+        # A message whose body could not be fetched is left for the next run instead of
+        # being applied (and marked processed) with an empty body.
+        return [
+            InboxItem(
+                msg_id=candidate.msg_id,
+                mailbox=scan.mailbox,
+                subject=candidate.subject,
+                sender=candidate.sender,
+                body=bodies.get(candidate.msg_id, ""),
+                message_key=message_key,
+            )
+            for candidate, message_key in fresh
+            if candidate.msg_id not in scan.failed
+        ]
+
+    def _fetch_candidate_headers(
+        self,
+        client: imaplib.IMAP4_SSL,
+        msg_ids: List[bytes],
+        normalized_allowed: set[str],
+        *,
+        gmail: bool = False,
+        failed: Optional[set[bytes]] = None,
+    ) -> List[_Candidate]:
+        # Phase 1: one batched header + BODYSTRUCTURE fetch; nothing else is downloaded
+        # for messages that fail the subject/sender checks.
+        gm_item = " X-GM-MSGID" if gmail else ""
+        items = f"({header_fields_item(HEADER_FIELDS)} BODYSTRUCTURE{gm_item})"
+        candidates: List[_Candidate] = []
+
+        for batch in chunked(msg_ids, FETCH_BATCH_SIZE):
+            try:
+                typ, data = client.uid("FETCH", message_set(batch), items)
+            except imaplib.IMAP4.error:
+                typ, data = "NO", []
+            if typ != "OK":
+                if failed is not None:
+                    failed.update(batch)
+                continue
+            if not data:
+                continue
+
+            for fetched in group_fetch_response(data):
+                header_bytes = next((value for key, value in fetched.sections.items() if key.startswith("HEADER")), b"")
+                headers = BytesHeaderParser().parsebytes(header_bytes)
+                subject = self._decode_header_value(str(headers.get("Subject", "")))
+                sender = parseaddr(str(headers.get("From", "")))[1].lower().strip()
+
+                if self.subject_prefix and self.subject_prefix not in subject:
+                    continue
+                if normalized_allowed and self._normalize_email(sender) not in normalized_allowed:
                     continue
 
+                structure = parse_bodystructure(fetched.meta)
+                uid = find_item(fetched.meta, "UID")
+                if uid is None:
+                    continue
+                candidates.append(
+                    _Candidate(
+                        msg_id=uid.encode("ascii"),
+                        subject=subject,
+                        sender=sender,
+                        message_id_header=str(headers.get("Message-ID", "")).strip(),
+                        text_parts=select_text_parts(structure) if structure else [],
+                        gm_msgid=find_item(fetched.meta, "X-GM-MSGID") or "",
+                    )
+                )
+
+        candidates.sort(key=lambda item: int(item.msg_id))
+        return candidates
+
+    def _fetch_text_bodies(
+        self,
+        client: imaplib.IMAP4_SSL,
+        candidates: List[_Candidate],
+        *,
+        failed: Optional[set[bytes]] = None,
+    ) -> Dict[bytes, str]:
+        # Phase 2: batched fetch of only the text parts, grouped by identical part layout
+        # so each group is a single FETCH. Anything unresolved falls back to the full message.
+        bodies: Dict[bytes, str] = {}
+        groups: Dict[Tuple[str, ...], List[_Candidate]] = {}
+        for candidate in candidates:
+            if candidate.text_parts:
+                groups.setdefault(tuple(part.section for part in candidate.text_parts), []).append(candidate)
+
+        for sections, group in groups.items():
+            items = "(" + " ".join(f"BODY.PEEK[{section}]" for section in sections) + ")"
+            by_id = {candidate.msg_id: candidate for candidate in group}
+            for batch in chunked([candidate.msg_id for candidate in group], FETCH_BATCH_SIZE):
                 try:
-                    typ, data = client.search(None, "ALL")
+                    typ, data = client.uid("FETCH", message_set(batch), items)
                 except imaplib.IMAP4.error:
                     continue
-
-                if typ != "OK" or not data or not data[0]:
+                if typ != "OK" or not data:
                     continue
-
-                msg_ids = data[0].split()
-                msg_ids = msg_ids[-limit:]
-
-                for msg_id in msg_ids:
-                    try:
-                        typ, msg_data = client.fetch(msg_id, "(RFC822)")
-                    except imaplib.IMAP4.error:
-                        continue
-
-                    if typ != "OK" or not msg_data:
-                        continue
-
-                    raw_bytes = msg_data[0][1]
-                    msg = email.message_from_bytes(raw_bytes)
-                    subject = self._decode_header_value(msg.get("Subject", ""))
-                    sender = parseaddr(msg.get("From", ""))[1].lower().strip()
-                    sender_norm = self._normalize_email(sender)
-
-                    if self.subject_prefix and self.subject_prefix not in subject:
+                for fetched in group_fetch_response(data):
+                    candidate = by_id.get(_fetched_uid(fetched))
+                    if candidate is None:
                         continue
-                    if normalized_allowed and sender_norm not in normalized_allowed:
+                    texts = [(part, decode_part(fetched.sections.get(part.section, b""), part)) for part in candidate.text_parts]
+                    texts = [(part, text) for part, text in texts if text.strip()]
+                    if not texts:
                         continue
+                    part, text = next((item for item in texts if has_feedback_marker(item[1])), texts[0])
+                    bodies[candidate.msg_id] = html_to_text(text) if part.subtype == "html" else text
 
-                    body = self._extract_text_body(msg)
-                    message_id_header = str(msg.get("Message-ID", "")).strip()
-                    fallback_key = f"{mailbox}:imap-{msg_id.decode(errors='ignore')}"
-                    message_key = message_id_header or fallback_key
-
-                    if message_key in seen_keys:
-                        continue
+        missing = [candidate.msg_id for candidate in candidates if candidate.msg_id not in bodies]
+        for batch in chunked(missing, FETCH_BATCH_SIZE):
+            try:
+                typ, data = client.uid("FETCH", message_set(batch), "(BODY.PEEK[])")
+            except imaplib.IMAP4.error:
+                typ, data = "NO", []
+            if typ != "OK":
+                if failed is not None:
+                    failed.update(batch)
+                continue
+            if not data:
+                continue
+            for fetched in group_fetch_response(data):
+                raw_bytes = fetched.sections.get("")
+                if raw_bytes:
+                    bodies[_fetched_uid(fetched)] = self._extract_text_body(email.message_from_bytes(raw_bytes))
+
+        return bodies
+
+    def _search_candidates(
+        self,
+        client: imaplib.IMAP4_SSL,
+        *,
+        since: Optional[datetime],
+        after_uid: int = 0,
+    ) -> List[bytes]:
+        # Narrow the search on the server so only likely feedback messages are transferred;
+        # the exact subject/sender checks still run on the fetched headers.
+        # Results are UIDs; with a checkpoint only messages newer than after_uid are returned.
+        uid_range = ["UID", f"{after_uid + 1}:*"] if after_uid else []
+        attempts: List[List[str]] = []
+        if self._is_gmail(client):
+            attempts.append(uid_range + ["X-GM-RAW", self._imap_quote(self._gmail_raw_query(since))])
+        attempts.append(uid_range + self._search_criteria(since))
+        attempts.append(uid_range or ["ALL"])
+
+        for criteria in attempts:
+            try:
+                typ, data = client.uid("SEARCH", *criteria)
+            except imaplib.IMAP4.error:
+                continue
+            if typ != "OK":
+                continue
+            if not data or not data[0]:
+                return []
+            # "n:*" always matches the highest UID, even when it is <= n.
+            return [uid for uid in data[0].split() if int(uid) > after_uid]
+        return []
+
+    def _uid_validity(self, client: imaplib.IMAP4_SSL) -> int:
+        # The shared session stays selected across scans (the IDLE daemon), so later
+        # scans use the value stored at SELECT time instead of an already consumed response.
+        if client is self._client:
+            return self._selected_uidvalidity
+        return self._read_uid_validity(client)
+
+    def _read_uid_validity(self, client: imaplib.IMAP4_SSL) -> int:
+        try:
+            _, data = client.response("UIDVALIDITY")
+        except (AttributeError, imaplib.IMAP4.error):
+            return 0
+        value = data[-1] if data else None
+        return int(value) if value and value.isdigit() else 0
+
+    def _search_criteria(self, since: Optional[datetime]) -> List[str]:
+        criteria: List[str] = []
+        if self.subject_prefix and self.subject_prefix.isascii():
+            criteria += ["SUBJECT", self._imap_quote(self.subject_prefix)]
+
+        senders = [sender for sender in self._server_sender_terms() if sender.isascii()]
+        if senders:
+            # OR is binary in IMAP: OR a (OR b c) ...
+            from_terms = [f"FROM {self._imap_quote(sender)}" for sender in senders]
+            expr = from_terms[-1]
+            for term in reversed(from_terms[:-1]):
+                expr = f"OR {term} {expr}"
+            criteria.append(f"({expr})" if len(senders) > 1 else expr)
+
+        if since is not None:
+            criteria += ["SINCE", since.strftime("%d-%b-%Y")]
+        return criteria or ["ALL"]
+
+    def _gmail_raw_query(self, since: Optional[datetime]) -> str:
+        terms: List[str] = []
+        if self.subject_prefix:
+            words = re.sub(r"[^\w\s]+", " ", self.subject_prefix).split()
+            if words:
+                terms.append(f"subject:({' '.join(words)})")
+        senders = self._server_sender_terms()
+        if senders:
+            terms.append(f"from:({' OR '.join(senders)})")
+        if since is not None:
+            terms.append(f"after:{since.strftime('%Y/%m/%d')}")
+        return " ".join(terms) or "in:anywhere"
+
+    def _server_sender_terms(self) -> List[str]:
+        """Server-side FROM terms that match every address ``_normalize_email`` accepts.
+
+        Searches match substrings only, so Gmail senders (whose dots and
+        ``+tags`` are ignored) are widened to their domain; the normalized
+        sender check after the header fetch stays the real filter.
+        """
+        terms: List[str] = []
+        for sender in self.allowed_senders:
+            sender = sender.strip().lower()
+            if not sender:
+                continue
+            domain = sender.split("@", 1)[1] if "@" in sender else ""
+            term = f"@{domain}" if domain in {"gmail.com", "googlemail.com"} else sender
+            if term not in terms:
+                terms.append(term)
+        return terms
 
-                    seen_keys.add(message_key)
-                    items.append(
-                        InboxItem(
-                            msg_id=msg_id,
-                            mailbox=mailbox,
-                            subject=subject,
-                            sender=sender,
-                            body=body,
-                            message_key=message_key,
-                        )
-                    )
+    def _is_gmail(self, client: imaplib.IMAP4_SSL) -> bool:
+        capabilities = getattr(client, "capabilities", ()) or ()
+        return "X-GM-EXT-1" in {str(item).upper() for item in capabilities}
 
-        return items
+    def _imap_quote(self, value: str) -> str:
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
 
     def mark_seen(self, marks: List[Tuple[str, bytes]]) -> None:
         if not marks:
@@ -106,16 +625,39 @@ class IMAPFeedbackClient:
         for mailbox, msg_id in marks:
             grouped.setdefault(mailbox, []).append(msg_id)
 
-        with imaplib.IMAP4_SSL(self.host, self.port) as client:
-            client.login(self.username, self.password)
+        with self._session() as client:
+            started = time.perf_counter()
             for mailbox, msg_ids in grouped.items():
                 if not self._select_mailbox(client, mailbox):
                     continue
-                for msg_id in msg_ids:
+                for batch in chunked(msg_ids, FETCH_BATCH_SIZE):
                     try:
-                        client.store(msg_id, "+FLAGS", "\\Seen")
+                        client.uid("STORE", message_set(batch), "+FLAGS", "(\\Seen)")
                     except imaplib.IMAP4.error:
                         continue
+            self._add_timing("store", started)
+
+    @contextmanager
+    def _session(self) -> Iterator[imaplib.IMAP4_SSL]:
+        # Reuse the open session when the caller manages one; otherwise open one for this call.
+        if self._client is not None:
+            yield self._client
+            return
+        client = self.open()
+        try:
+            yield client
+        finally:
+            self.close()
+
+    def _add_timing(self, phase: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+
+    def _add_mailbox_timing(self, mailbox: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.mailbox_timings[mailbox] = self.mailbox_timings.get(mailbox, 0.0) + elapsed
 
     def _resolve_mailboxes(self) -> List[str]:
         if self.mailboxes:
@@ -134,13 +676,43 @@ class IMAPFeedbackClient:
                 return ordered
         return ["INBOX"]
 
+    def _order_mailboxes(self, client: imaplib.IMAP4_SSL, mailboxes: List[str]) -> List[str]:
+        # Smallest mailbox first: its copies are fetched there and skipped in the larger ones.
+        # Mailboxes whose size is unknown keep their configured order at the end.
+        if len(mailboxes) < 2:
+            return mailboxes
+        sizes = {mailbox: self._message_count(client, mailbox) for mailbox in mailboxes}
+        return sorted(mailboxes, key=lambda mailbox: (sizes[mailbox] is None, sizes[mailbox] or 0))
+
+    def _message_count(self, client: imaplib.IMAP4_SSL, mailbox: str) -> Optional[int]:
+        for candidate in self._mailbox_select_candidates(mailbox):
+            try:
+                typ, data = client.status(candidate, "(MESSAGES)")
+            except imaplib.IMAP4.error:
+                continue
+            if typ != "OK" or not data or not isinstance(data[0], bytes):
+                continue
+            count = find_item(data[0], "MESSAGES")
+            if count is not None:
+                return int(count)
+        return None
+
     def _select_mailbox(self, client: imaplib.IMAP4_SSL, mailbox: str) -> bool:
+        if client is self._client and self._selected == mailbox:
+            return True
+        # A failed SELECT leaves no mailbox selected on the server.
+        if client is self._client:
+            self._selected = ""
+            self._selected_uidvalidity = 0
         for candidate in self._mailbox_select_candidates(mailbox):
             try:
                 typ, _ = client.select(candidate)
             except imaplib.IMAP4.error:
                 continue
             if typ == "OK":
+                if client is self._client:
+                    self._selected = mailbox
+                    self._selected_uidvalidity = self._read_uid_validity(client)
                 return True
         return False
 
@@ -166,30 +738,29 @@ class IMAPFeedbackClient:
         return out
 
     def _extract_text_body(self, msg: Message) -> str:
-        if msg.is_multipart():
-            # Prefer plain text; if absent use HTML fallback.
-            html_candidate = ""
-            for part in msg.walk():
-                disposition = str(part.get("Content-Disposition", "")).lower()
-                if "attachment" in disposition:
-                    continue
+        # Only inline text parts are decoded; the first text/plain part carrying the
+        # feedback marker wins, then the first text/plain part, then the first HTML part.
+        first_plain = ""
+        html_part: Optional[Message] = None
+        for part in msg.walk():
+            if part.get_content_maintype() != "text":
+                continue
+            if "attachment" in str(part.get("Content-Disposition", "")).lower():
+                continue
 
-                content_type = part.get_content_type()
+            subtype = part.get_content_subtype()
+            if subtype == "plain":
                 text = self._decode_part(part)
-                if not text:
-                    continue
-                if content_type == "text/plain":
+                if has_feedback_marker(text):
                     return text
-                if content_type == "text/html" and not html_candidate:
-                    html_candidate = text
-
-            return self._html_to_text(html_candidate) if html_candidate else ""
+                if text and not first_plain:
+                    first_plain = text
+            elif subtype == "html" and html_part is None:
+                html_part = part
 
-        content_type = msg.get_content_type()
-        text = self._decode_part(msg)
-        if content_type == "text/html":
-            return self._html_to_text(text)
-        return text
+        if first_plain:
+            return first_plain
+        return html_to_text(self._decode_part(html_part)) if html_part is not None else ""
 
     def _decode_part(self, part: Message) -> str:
         payload = part.get_payload(decode=True)
@@ -203,17 +774,6 @@ class IMAPFeedbackClient:
         except LookupError:
             return payload.decode("utf-8", errors="replace")
 
-    def _html_to_text(self, value: str) -> str:
-        if not value:
-            return ""
-        text = re.sub(r"(?is)<(script|style).*?>.*?</\\1>", " ", value)
-        text = re.sub(r"(?s)<[^>]+>", " ", text)
-        text = unescape(text)
-        text = text.replace("\r", "\n")
-        text = re.sub(r"[ \t]+", " ", text)
-        text = re.sub(r"\n\s*\n+", "\n", text)
-        return text.strip()
-
     def _decode_header_value(self, value: str) -> str:
         if not value:
             return ""
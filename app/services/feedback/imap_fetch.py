@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import quopri
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_RESPONSE_START = re.compile(rb"^\s*(\d+) \(")
+_LITERAL_SECTION = re.compile(rb"BODY\[([^\]]*)\](?:<\d+>)? \{\d+\}\s*$", re.IGNORECASE)
+_STRUCTURE_TOKEN = re.compile(r'\s*(\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+)')
+
+
+@dataclass
+class FetchedMessage:
+    """One message from a FETCH response: the non-literal text plus each literal by section."""
+
+    seq: bytes
+    meta: bytes = b""
+    sections: Dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class TextPart:
+    section: str
+    subtype: str
+    charset: str
+    encoding: str
+
+
+def group_fetch_response(data: Sequence[Any]) -> List[FetchedMessage]:
+    """Group imaplib FETCH data (tuples for literals, bytes for the rest) per message."""
+    messages: List[FetchedMessage] = []
+    current: Optional[FetchedMessage] = None
+
+    for item in data or []:
+        if item is None:
+            continue
+        if isinstance(item, tuple):
+            meta, literal = bytes(item[0]), bytes(item[1] or b"")
+        else:
+            meta, literal = bytes(item), None
+
+        start = _RESPONSE_START.match(meta)
+        if start:
+            current = FetchedMessage(seq=start.group(1))
+            messages.append(current)
+        if current is None:
+            continue
+
+        current.meta += meta
+        if literal is not None:
+            section = _LITERAL_SECTION.search(meta)
+            current.sections[section.group(1).decode("ascii", "replace").upper() if section else ""] = literal
+
+    return messages
+
+
+def find_item(meta: bytes, name: str) -> Optional[str]:
+    """Value of a simple (atom/number) FETCH item such as UID or X-GM-MSGID."""
+    match = re.search(rb"\b" + re.escape(name.encode("ascii")) + rb" (\d+)", meta, re.IGNORECASE)
+    return match.group(1).decode("ascii") if match else None
+
+
+def parse_bodystructure(meta: bytes) -> Optional[list]:
+    text = meta.decode("utf-8", errors="replace")
+    match = re.search(r"BODYSTRUCTURE \(", text, re.IGNORECASE)
+    if not match:
+        return None
+
+    tokens = _STRUCTURE_TOKEN.findall(text, match.end() - 1)
+    stack: List[list] = []
+    for token in tokens:
+        if token == "(":
+            stack.append([])
+        elif token == ")":
+            if not stack:
+                return None
+            done = stack.pop()
+            if not stack:
+                return done
+            stack[-1].append(done)
+        elif stack:
+            stack[-1].append(_atom(token))
+        else:
+            break
+    return None
+
+
+def select_text_parts(structure: list) -> List[TextPart]:
+    """Inline text/plain parts, or the first inline text/html part when there is no plain text."""
+    leaves: List[TextPart] = []
+    _collect_text_leaves(structure, "", leaves)
+    plain = [part for part in leaves if part.subtype == "plain"]
+    if plain:
+        return plain
+    html = [part for part in leaves if part.subtype == "html"]
+    return html[:1]
+
+
+def decode_part(payload: bytes, part: TextPart) -> str:
+    encoding = part.encoding.lower()
+    if encoding == "base64":
+        try:
+            payload = base64.b64decode(payload)
+        except (binascii.Error, ValueError):
+            return ""
+    elif encoding == "quoted-printable":
+        payload = quopri.decodestring(payload)
+
+    try:
+        return payload.decode(part.charset or "utf-8", errors="replace")
+    except LookupError:
+        return payload.decode("utf-8", errors="replace")
+
+
+def _collect_text_leaves(node: list, prefix: str, out: List[TextPart]) -> None:
+    if node and isinstance(node[0], list):
+        # multipart: children first, then the subtype string and extension data.
+        for idx, child in enumerate(_leading_lists(node)):
+            _collect_text_leaves(child, f"{prefix}{idx + 1}.", out)
+        return
+
+    if len(node) < 7 or not isinstance(node[0], str) or not isinstance(node[1], str):
+        return
+    if node[0].lower() != "text":
+        return
+
+    # text leaf: type subtype params id description encoding size lines md5 disposition ...
+    disposition = node[9] if len(node) > 9 else None
+    if isinstance(disposition, list) and disposition and str(disposition[0]).lower() == "attachment":
+        return
+
+    params = node[2] if isinstance(node[2], list) else []
+    charset = ""
+    for key, value in zip(params[::2], params[1::2]):
+        if str(key).lower() == "charset":
+            charset = str(value)
+
+    section = prefix.rstrip(".") or "1"
+    out.append(
+        TextPart(
+            section=section,
+            subtype=node[1].lower(),
+            charset=charset,
+            encoding=str(node[5] or "7bit"),
+        )
+    )
+
+
+def _leading_lists(node: list) -> List[list]:
+    children: List[list] = []
+    for item in node:
+        if not isinstance(item, list):
+            break
+        children.append(item)
+    return children
+
+
+def _atom(token: str) -> Optional[str]:
+    if token.upper() == "NIL":
+        return None
+    if len(token) >= 2 and token[0] == '"' and token[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", token[1:-1])
+    return token
+
+
+def message_set(ids: Sequence[bytes]) -> bytes:
+    return b",".join(ids)
+
+
+def chunked(ids: Sequence[bytes], size: int) -> List[Sequence[bytes]]:
+    return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+
+def header_fields_item(fields: Tuple[str, ...]) -> str:
+    return f"BODY.PEEK[HEADER.FIELDS ({' '.join(fields)})]"
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import hmac
+import re
+from dataclasses import dataclass, field
 from typing import Dict, List
-from urllib.parse import parse_qs, unquote_plus
+from urllib.parse import unquote_plus
 
 WORD_STATUSES = {"unknown", "fuzzy", "known"}
 GRAMMAR_STATUSES = {"mastered", "review"}
+_MARKER = re.compile(r"\b(?:lln_feedback\s*=|lldn_feedback\b)", re.IGNORECASE)
 
 
 @dataclass
@@ -17,14 +21,18 @@ class FeedbackCommand:
     word_status: str = ""
     topic: str = ""
     grammar_status: str = ""
+    learner_id: str = ""
 
 
 def parse_feedback_commands(body: str, token: str) -> List[FeedbackCommand]:
-    kv = _extract_kv(body)
-    if not kv:
+    fields = _tokenize(body)
+    kv = fields.kv
+    if not kv and not fields.words:
         return []
 
-    if token and kv.get("token", "") != token:
+    learner_id = kv.get("learner_id", "").strip()
+    expected = learner_token(token, learner_id)
+    if token and not hmac.compare_digest(kv.get("token", "").encode("utf-8"), expected.encode("utf-8")):
         return []
 
     commands: List[FeedbackCommand] = []
@@ -35,43 +43,67 @@ def parse_feedback_commands(body: str, token: str) -> List[FeedbackCommand]:
         commands.append(legacy)
 
     # Batch mode from form/template
-    commands.extend(_parse_batch(kv))
+    commands.extend(_parse_batch(fields))
+
+    if learner_id:
+        for command in commands:
+            command.learner_id = learner_id
 
     return commands
 
 
-def parse_feedback_body(body: str, token: str) -> FeedbackCommand | None:
-    # Backward-compatible helper used by older tests/calls.
-    commands = parse_feedback_commands(body, token)
-    return commands[0] if commands else None
+def learner_token(token: str, learner_id: str) -> str:
+    """Token expected from one learner's feedback.
 
+    The default learner uses ``FEEDBACK_TOKEN`` itself; registry learners get an
+    HMAC of it, so one learner's email cannot be used to write another's state.
+    """
+    if not token or not learner_id:
+        return token
+    return hmac.new(token.encode("utf-8"), learner_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
 
-def _extract_kv(body: str) -> Dict[str, str]:
-    normalized = body.replace("\r", "\n")
 
-    kv: Dict[str, str] = {}
+def has_feedback_marker(text: str) -> bool:
+    """True when the text carries the batch form flag or the legacy LLDN_FEEDBACK header."""
+    return _MARKER.search(text) is not None
 
-    lines = [line.strip() for line in normalized.split("\n") if line.strip()]
-    for line in lines:
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        k = key.strip().lower()
-        v = unquote_plus(value.strip())
-        if k and k not in kv:
-            kv[k] = v
 
-    # Some clients may send one-line query-style payload.
-    query_like = "&".join(lines)
-    if "=" in query_like and "&" in query_like:
-        parsed = parse_qs(query_like, keep_blank_values=True)
-        for key, values in parsed.items():
-            k = key.strip().lower()
-            if not k or k in kv or not values:
-                continue
-            kv[k] = unquote_plus(values[0].strip())
+def parse_feedback_body(body: str, token: str) -> FeedbackCommand | None:
+    # Backward-compatible helper used by older tests/calls.
+    commands = parse_feedback_commands(body, token)
+    return commands[0] if commands else None
+
 
-    return kv
+@dataclass
+class _Fields:
+    kv: Dict[str, str] = field(default_factory=dict)
+    # word index -> {"text": ..., "status": ...}
+    words: Dict[int, Dict[str, str]] = field(default_factory=dict)
+
+
+# One "key=value" field. Fields are separated by line breaks (mail bodies, text/plain
+# form posts) or by "&" when the next field follows (urlencoded / query-style bodies).
+# Indexed word fields are split out by the pattern itself: (idx, part, key, value).
+_FIELD = re.compile(
+    r"(?:^|(?<=[\r\n&]))[ \t]*"
+    r"(?:(?i:word)_(\d+)_((?i:text|status))|([A-Za-z][\w-]*))[ \t]*="
+    r"([^\r\n&]*(?:&(?![A-Za-z][\w-]*=)[^\r\n&]*)*)"
+)
+
+
+def _tokenize(body: str) -> _Fields:
+    """Single pass over the body; the first occurrence of a key wins."""
+    fields = _Fields()
+    kv, words = fields.kv, fields.words
+    for idx, part, key, value in _FIELD.findall(body):
+        value = value.strip()
+        if "%" in value or "+" in value:
+            value = unquote_plus(value)
+        if idx:
+            words.setdefault(int(idx), {}).setdefault(part.lower(), value)
+        else:
+            kv.setdefault(key.lower(), value)
+    return fields
 
 
 def _parse_legacy_single(kv: Dict[str, str]) -> FeedbackCommand | None:
@@ -116,10 +148,11 @@ def _parse_legacy_single(kv: Dict[str, str]) -> FeedbackCommand | None:
     return None
 
 
-def _parse_batch(kv: Dict[str, str]) -> List[FeedbackCommand]:
+def _parse_batch(fields: _Fields) -> List[FeedbackCommand]:
+    kv = fields.kv
     if kv.get("lln_feedback", "") not in {"1", "true", "yes", "on"} and kv.get("type", "") != "batch":
         # No explicit batch flag; still allow if indexed fields exist.
-        has_indexed_word = any(key.startswith("word_") and key.endswith("_status") for key in kv)
+        has_indexed_word = any("status" in slot for slot in fields.words.values())
         if not has_indexed_word and "grammar_status" not in kv:
             return []
 
@@ -130,9 +163,10 @@ def _parse_batch(kv: Dict[str, str]) -> List[FeedbackCommand]:
 
     out: List[FeedbackCommand] = []
 
-    for idx in range(1, 31):
-        word = kv.get(f"word_{idx}_text", "").strip()
-        status = kv.get(f"word_{idx}_status", "").strip().lower()
+    for idx in sorted(fields.words):
+        slot = fields.words[idx]
+        word = slot.get("text", "").strip()
+        status = slot.get("status", "").strip().lower()
         if not word or status not in WORD_STATUSES:
             continue
         out.append(
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Set
+from typing import Any, Callable, Dict, Optional, Set
 
 from app.language_packs.base import LanguagePack
 from app.models.schemas import DailyLesson, SourceArticle
+from app.services.learning.word_keys import normalize_word_key
 from app.services.llm.gemini_client import GeminiClient
 
 
@@ -14,6 +14,9 @@ from app.services.llm.gemini_client import GeminiClient
 class LessonBuilder:
     gemini: GeminiClient
     language_pack: LanguagePack
+    # Optional full-vocabulary lookup (e.g. StateRepository.word_status); the
+    # profile only carries the most recent known words.
+    word_status: Optional[Callable[[str], str]] = None
 
     def build(self, article: SourceArticle, cefr_level: str, study_profile: Dict[str, Any] | None = None) -> DailyLesson:
         study_profile = study_profile or {}
@@ -61,7 +64,7 @@ class LessonBuilder:
                 last_error = "Gemini response missing news text or Chinese translation"
                 continue
 
-            known_hits = [word.word for word in lesson.keywords if self._norm(word.word) in known_words]
+            known_hits = [word.word for word in lesson.keywords if self._is_known(word.word, known_words)]
             if known_hits and attempt < 3:
                 forbid_extra.update(self._norm(word) for word in known_hits)
                 last_error = f"Returned known words in keyword set: {known_hits}. Retrying."
@@ -71,6 +74,10 @@ class LessonBuilder:
 
         raise RuntimeError(last_error or "Gemini failed to build a valid lesson")
 
+    def _is_known(self, word: str, known_words: Set[str]) -> bool:
+        if self._norm(word) in known_words:
+            return True
+        return bool(self.word_status and self.word_status(word) == "known")
+
     def _norm(self, value: str) -> str:
-        text = value.strip().lower()
-        return re.sub(r"[^a-zA-ZäöüßÄÖÜ0-9]+", "", text)
+        return normalize_word_key(value)
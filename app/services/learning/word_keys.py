@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import re
+from typing import Mapping, Optional
+
+_UMLAUT_FOLDING = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_word_key(value: str, lemmas: Optional[Mapping[str, str]] = None) -> str:
+    """Fold a surface form to the key used for every vocabulary lookup.
+
+    ``casefold`` already maps ß to ss; umlauts are spelled out so that
+    "Küche" and "Kueche" meet, and punctuation/whitespace is dropped.
+    An optional lemma map (keyed by folded form) collapses inflections.
+    """
+    key = _NON_WORD.sub("", str(value).casefold().translate(_UMLAUT_FOLDING))
+    if lemmas:
+        return lemmas.get(key, key)
+    return key
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from app.services.state.rollups import RollupSummary
+
+EPOCH = datetime(1970, 1, 1)
+_RELATIVE_RANGE = re.compile(r"(\d+)d")
+
+
+def parse_timestamp(value: str) -> datetime:
+    if not value:
+        return EPOCH
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return EPOCH
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_report_range(value: str, now: datetime) -> Tuple[datetime, datetime]:
+    """Parse ``--report-range``: ``7d``, ``YYYY-MM-DD`` (until now) or ``YYYY-MM-DD:YYYY-MM-DD``."""
+    text = value.strip()
+    relative = _RELATIVE_RANGE.fullmatch(text)
+    if relative:
+        return now - timedelta(days=int(relative.group(1))), now
+
+    start_text, _, end_text = text.partition(":")
+    try:
+        start = datetime.combine(date.fromisoformat(start_text.strip()), datetime.min.time())
+        end = now
+        if end_text.strip():
+            end = datetime.combine(date.fromisoformat(end_text.strip()), datetime.max.time())
+    except ValueError as exc:
+        raise ValueError(f"Invalid report range: {value!r}") from exc
+
+    if end < start:
+        raise ValueError(f"Report range ends before it starts: {value!r}")
+    return start, end
+
+
+@dataclass
+class ReportAggregator:
+    """Single-pass report metrics over raw sent/feedback log entries.
+
+    Timestamps written by this app are naive UTC ISO strings, which sort
+    lexicographically, so the range check is a plain string comparison and
+    only unusual formats fall back to a full datetime parse.
+    """
+
+    start: datetime
+    end: datetime
+    normalize_grammar_status: Callable[[Any], str]
+    summary: RollupSummary = field(default_factory=RollupSummary)
+
+    def __post_init__(self) -> None:
+        self._start_key = self.start.isoformat()
+        self._end_key = self.end.isoformat()
+
+    def consume_lessons(self, lessons: Iterable[Dict[str, Any]]) -> "ReportAggregator":
+        for lesson in lessons:
+            created_at = str(lesson.get("created_at", ""))
+            if self._in_range(created_at):
+                self.summary.lessons.append(lesson)
+        return self
+
+    def consume_events(self, events: Iterable[Dict[str, Any]]) -> "ReportAggregator":
+        summary = self.summary
+        for event in events:
+            if not self._in_range(str(event.get("timestamp", ""))):
+                continue
+            summary.feedback_events += 1
+
+            event_type = event.get("type")
+            if event_type == "word":
+                status = str(event.get("status", ""))
+                summary.word_status[status] += 1
+                if status == "unknown":
+                    summary.unknown_words[str(event.get("word", "")).strip()] += 1
+                elif status == "fuzzy":
+                    summary.fuzzy_words[str(event.get("word", "")).strip()] += 1
+            elif event_type == "grammar":
+                summary.grammar_status[self.normalize_grammar_status(event.get("status", event.get("mastered", "")))] += 1
+        return self
+
+    def _in_range(self, value: str) -> bool:
+        # Fast path: naive "YYYY-MM-DDTHH:MM:SS[.ffffff]" as written by datetime.isoformat().
+        if len(value) in (19, 26) and value[10] == "T":
+            return self._start_key <= value <= self._end_key
+        return self.start <= parse_timestamp(value) <= self.end
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.services.reporting.aggregator import EPOCH, parse_timestamp
+
+STATUS_CATEGORIES: Tuple[str, ...] = ("unknown", "fuzzy", "known", "review", "mastered")
+KIND_WORD, KIND_GRAMMAR, KIND_OTHER = 0, 1, 2
+KNOWN = STATUS_CATEGORIES.index("known")
+UNKNOWN = STATUS_CATEGORIES.index("unknown")
+MASTERED = STATUS_CATEGORIES.index("mastered")
+REVIEW = STATUS_CATEGORIES.index("review")
+
+# Report granularity per period: numpy datetime64 unit and how far back to look.
+PERIODS: Dict[str, Tuple[str, int]] = {
+    "monthly": ("D", 30),
+    "all": ("M", 0),
+}
+
+
+def _to_datetime64(value: str) -> Optional[str]:
+    # Fixed-format naive timestamps go straight to numpy; anything else is normalized to UTC first.
+    if len(value) in (19, 26) and value[10] == "T":
+        return value[:19]
+    parsed = parse_timestamp(value)
+    # Missing or unparseable timestamps would land in 1970 and stretch the "all" range.
+    return None if parsed == EPOCH else parsed.isoformat()[:19]
+
+
+class _Categories:
+    def __init__(self) -> None:
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def encode(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+@dataclass
+class EventColumns:
+    """Feedback and sent-lesson logs as columnar arrays with categorical codes.
+
+    Words and grammar topics are encoded per (learner, value) pair so several
+    learner shards can be loaded into one table and analysed together.
+    """
+
+    ts: np.ndarray
+    kind: np.ndarray
+    status: np.ndarray
+    word: np.ndarray
+    topic: np.ndarray
+    learner: np.ndarray
+    word_values: List[Tuple[str, str]]
+    topic_values: List[Tuple[str, str]]
+    learner_values: List[str]
+    lesson_ts: np.ndarray
+    lesson_learner: np.ndarray
+
+    @classmethod
+    def from_logs(
+        cls,
+        events_by_learner: Mapping[str, Iterable[Dict[str, Any]]],
+        lessons_by_learner: Mapping[str, Iterable[Dict[str, Any]]],
+    ) -> "EventColumns":
+        learners, words, topics = _Categories(), _Categories(), _Categories()
+        status_codes = {status: code for code, status in enumerate(STATUS_CATEGORIES)}
+
+        ts: List[str] = []
+        kind: List[int] = []
+        status: List[int] = []
+        word: List[int] = []
+        topic: List[int] = []
+        learner: List[int] = []
+
+        for learner_id, events in events_by_learner.items():
+            learner_code = learners.encode(learner_id)
+            for event in events:
+                stamp = _to_datetime64(str(event.get("timestamp", "")))
+                if stamp is None:
+                    continue
+                event_type = event.get("type")
+                ts.append(stamp)
+                learner.append(learner_code)
+                status.append(status_codes.get(str(event.get("status", "")).strip().lower(), -1))
+                if event_type == "word":
+                    kind.append(KIND_WORD)
+                    word.append(words.encode((learner_id, str(event.get("word", "")).strip())))
+                    topic.append(-1)
+                elif event_type == "grammar":
+                    kind.append(KIND_GRAMMAR)
+                    word.append(-1)
+                    topic.append(topics.encode((learner_id, str(event.get("topic", "")).strip())))
+                else:
+                    kind.append(KIND_OTHER)
+                    word.append(-1)
+                    topic.append(-1)
+
+        lesson_ts: List[str] = []
+        lesson_learner: List[int] = []
+        for learner_id, lessons in lessons_by_learner.items():
+            learner_code = learners.encode(learner_id)
+            for lesson in lessons:
+                stamp = _to_datetime64(str(lesson.get("created_at", "")))
+                if stamp is None:
+                    continue
+                lesson_ts.append(stamp)
+                lesson_learner.append(learner_code)
+
+        return cls(
+            ts=np.array(ts, dtype="datetime64[s]"),
+            kind=np.array(kind, dtype=np.int8),
+            status=np.array(status, dtype=np.int8),
+            word=np.array(word, dtype=np.int32),
+            topic=np.array(topic, dtype=np.int32),
+            learner=np.array(learner, dtype=np.int32),
+            word_values=words.values,
+            topic_values=topics.values,
+            learner_values=learners.values,
+            lesson_ts=np.array(lesson_ts, dtype="datetime64[s]"),
+            lesson_learner=np.array(lesson_learner, dtype=np.int32),
+        )
+
+
+def known_vocabulary_series(columns: EventColumns, edges: np.ndarray) -> np.ndarray:
+    """Number of words whose latest status is ``known`` at each bucket edge."""
+    mask = columns.kind == KIND_WORD
+    ts, word, status = columns.ts[mask], columns.word[mask], columns.status[mask]
+    if ts.size == 0:
+        return np.zeros(edges.size, dtype=np.int64)
+
+    # Group by word in time order to find each event's previous status for that word.
+    order = np.lexsort((ts, word))
+    ts, word, status = ts[order], word[order], status[order]
+    is_known = (status == KNOWN).astype(np.int64)
+    was_known = np.zeros_like(is_known)
+    same_word = word[1:] == word[:-1]
+    was_known[1:] = np.where(same_word, is_known[:-1], 0)
+
+    # Each event moves the known total by +1 (became known), -1 (left known) or 0.
+    delta = is_known - was_known
+    by_time = np.argsort(ts, kind="stable")
+    running = np.cumsum(delta[by_time])
+    positions = np.searchsorted(ts[by_time], edges, side="right")
+    return np.where(positions > 0, running[np.maximum(positions - 1, 0)], 0)
+
+
+def conversion_days(columns: EventColumns, since: Optional[np.datetime64] = None) -> np.ndarray:
+    """Days from a word's first ``unknown`` mark to its first later ``known`` mark.
+
+    With ``since``, only words that became known at or after it are counted;
+    their first ``unknown`` mark may be older.
+    """
+    n_words = len(columns.word_values)
+    if n_words == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    seconds = columns.ts.astype("datetime64[s]").astype(np.int64)
+    words_mask = columns.kind == KIND_WORD
+    never = np.iinfo(np.int64).max
+
+    first_unknown = np.full(n_words, never, dtype=np.int64)
+    unknown_mask = words_mask & (columns.status == UNKNOWN)
+    np.minimum.at(first_unknown, columns.word[unknown_mask], seconds[unknown_mask])
+
+    first_known = np.full(n_words, never, dtype=np.int64)
+    known_mask = words_mask & (columns.status == KNOWN)
+    known_words = columns.word[known_mask]
+    after_unknown = seconds[known_mask] >= first_unknown[known_words]
+    np.minimum.at(first_known, known_words[after_unknown], seconds[known_mask][after_unknown])
+
+    converted = (first_unknown != never) & (first_known != never)
+    if since is not None:
+        converted &= first_known >= np.datetime64(since, "s").astype(np.int64)
+    return (first_known[converted] - first_unknown[converted]) / 86400.0
+
+
+def grammar_topic_history(columns: EventColumns, bucket_index: np.ndarray, n_buckets: int) -> Dict[str, np.ndarray]:
+    """Per-topic mastered/review mark counts for each bucket, plus each topic's latest status."""
+    n_topics = len(columns.topic_values)
+    mastered = np.zeros((n_topics, n_buckets), dtype=np.int64)
+    review = np.zeros((n_topics, n_buckets), dtype=np.int64)
+    latest = np.full(n_topics, -1, dtype=np.int8)
+    if n_topics == 0:
+        return {"mastered": mastered, "review": review, "latest": latest}
+
+    grammar_mask = columns.kind == KIND_GRAMMAR
+    in_range = grammar_mask & (bucket_index >= 0)
+    for target, code in ((mastered, MASTERED), (review, REVIEW)):
+        mask = in_range & (columns.status == code)
+        np.add.at(target, (columns.topic[mask], bucket_index[mask]), 1)
+
+    # Latest status per topic: the last grammar event in time order wins.
+    order = np.argsort(columns.ts[grammar_mask], kind="stable")
+    latest[columns.topic[grammar_mask][order]] = columns.status[grammar_mask][order]
+    return {"mastered": mastered, "review": review, "latest": latest}
+
+
+def build_progress_report(columns: EventColumns, *, period: str, now: datetime) -> Dict[str, Any]:
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported progress report period: {period}")
+    unit, lookback_days = PERIODS[period]
+
+    now64 = np.datetime64(now.replace(microsecond=0), "s")
+    last_bucket = now64.astype(f"datetime64[{unit}]")
+    if lookback_days:
+        first_bucket = (now64 - np.timedelta64(lookback_days, "D")).astype(f"datetime64[{unit}]")
+    else:
+        candidates = np.concatenate([columns.ts, columns.lesson_ts])
+        first_bucket = candidates.min().astype(f"datetime64[{unit}]") if candidates.size else last_bucket
+
+    buckets = np.arange(first_bucket, last_bucket + 1)
+    edges = (buckets + 1).astype("datetime64[s]") - np.timedelta64(1, "s")
+    n_buckets = buckets.size
+
+    event_bucket = columns.ts.astype(f"datetime64[{unit}]")
+    bucket_index = (event_bucket - first_bucket).astype(np.int64)
+    bucket_index[(bucket_index < 0) | (bucket_index >= n_buckets)] = -1
+
+    lesson_bucket = (columns.lesson_ts.astype(f"datetime64[{unit}]") - first_bucket).astype(np.int64)
+    lesson_bucket = lesson_bucket[(lesson_bucket >= 0) & (lesson_bucket < n_buckets)]
+    lessons_per_bucket = np.bincount(lesson_bucket, minlength=n_buckets)
+
+    word_bucket = bucket_index[(columns.kind == KIND_WORD) & (bucket_index >= 0)]
+    feedback_per_bucket = np.bincount(word_bucket, minlength=n_buckets)
+
+    known_series = known_vocabulary_series(columns, edges)
+    days = conversion_days(columns, since=buckets[0].astype("datetime64[s]"))
+    history = grammar_topic_history(columns, bucket_index, n_buckets)
+
+    peak = max(int(known_series.max()) if known_series.size else 0, 1)
+    series = [
+        {
+            "label": str(bucket),
+            "known": int(known_series[i]),
+            "known_pct": round(100.0 * int(known_series[i]) / peak, 1),
+            "lessons": int(lessons_per_bucket[i]),
+            "word_feedback": int(feedback_per_bucket[i]),
+        }
+        for i, bucket in enumerate(buckets)
+    ]
+
+    topics = []
+    for code, (_, topic) in enumerate(columns.topic_values):
+        latest = int(history["latest"][code])
+        topics.append(
+            {
+                "topic": topic,
+                "latest_status": STATUS_CATEGORIES[latest] if latest >= 0 else "unknown",
+                "mastered_marks": int(history["mastered"][code].sum()),
+                "review_marks": int(history["review"][code].sum()),
+                "active_periods": [str(buckets[i]) for i in np.flatnonzero(history["mastered"][code] + history["review"][code])],
+            }
+        )
+    topics.sort(key=lambda item: (-(item["mastered_marks"] + item["review_marks"]), item["topic"]))
+
+    return {
+        "period": period,
+        "range_label": f"{buckets[0]} ~ {buckets[-1]}",
+        "known_now": int(known_series[-1]) if known_series.size else 0,
+        "lessons_total": int(lessons_per_bucket.sum()),
+        "word_feedback_total": int(feedback_per_bucket.sum()),
+        "series": series,
+        "conversion": {
+            "count": int(days.size),
+            "median_days": round(float(np.median(days)), 1) if days.size else None,
+            "mean_days": round(float(days.mean()), 1) if days.size else None,
+            "p90_days": round(float(np.percentile(days, 90)), 1) if days.size else None,
+        },
+        "grammar_topics": topics,
+    }
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+
+@dataclass
+class ProcessedKeyIndex:
+    """Bounded set of processed feedback message keys.
+
+    Backed by an insertion-ordered dict, so membership checks and inserts are
+    O(1) and the oldest keys are evicted first once ``max_keys`` is exceeded.
+    """
+
+    path: Path
+    max_keys: int = 5000
+    _keys: Dict[str, None] = field(default_factory=dict, init=False, repr=False)
+    _loaded: bool = field(default=False, init=False, repr=False)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        payload = json.loads(self.path.read_text(encoding="utf-8"))
+        self._extend(payload.get("keys", []))
+
+    def seed(self, keys: Iterable[str]) -> None:
+        self._loaded = True
+        self._extend(keys)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"max_keys": self.max_keys, "keys": list(self._keys)}
+        self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def add(self, key: str) -> bool:
+        self.load()
+        key = key.strip()
+        if not key or key in self._keys:
+            return False
+        self._keys[key] = None
+        self._evict()
+        return True
+
+    def __contains__(self, key: object) -> bool:
+        self.load()
+        return isinstance(key, str) and key.strip() in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        self.load()
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._keys)
+
+    def _extend(self, keys: Iterable[str]) -> None:
+        for raw in keys:
+            key = str(raw).strip()
+            if key:
+                self._keys[key] = None
+        self._evict()
+
+    def _evict(self) -> None:
+        limit = max(self.max_keys, 1)
+        while len(self._keys) > limit:
+            del self._keys[next(iter(self._keys))]
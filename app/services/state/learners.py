@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+LEARNER_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+def learner_registry_path(data_dir: Path) -> Path:
+    return data_dir / "learners" / "registry.json"
+
+
+def validate_learner_id(learner_id: str) -> str:
+    value = learner_id.strip()
+    if not LEARNER_ID_PATTERN.match(value):
+        raise ValueError(f"Invalid learner id: {learner_id!r}")
+    return value
+
+
+@dataclass(frozen=True)
+class LearnerProfile:
+    learner_id: str
+    email: str
+    language: str
+    cefr_level: str
+    active: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "email": self.email,
+            "language": self.language,
+            "cefr_level": self.cefr_level,
+            "active": self.active,
+        }
+
+    @staticmethod
+    def from_dict(learner_id: str, payload: Dict[str, Any]) -> "LearnerProfile":
+        return LearnerProfile(
+            learner_id=validate_learner_id(learner_id),
+            email=str(payload.get("email", "")).strip(),
+            language=str(payload.get("language", "de")).strip().lower() or "de",
+            cefr_level=str(payload.get("cefr_level", "A1")).strip().upper() or "A1",
+            active=bool(payload.get("active", True)),
+        )
+
+
+@dataclass
+class LearnerRegistry:
+    """Learners served by one deployment, stored in ``data/learners/registry.json``.
+
+    Each learner's progress lives in its own ``data/learners/<id>/progress``
+    shard, so one learner's reads never touch another learner's files.
+    """
+
+    path: Path
+    learners: Dict[str, LearnerProfile] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "LearnerRegistry":
+        if not path.exists():
+            return cls(path=path)
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        learners = {
+            str(learner_id): LearnerProfile.from_dict(str(learner_id), item)
+            for learner_id, item in payload.get("learners", {}).items()
+        }
+        return cls(path=path, learners=learners)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"learners": {learner_id: item.to_dict() for learner_id, item in self.learners.items()}}
+        self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def get(self, learner_id: str) -> Optional[LearnerProfile]:
+        return self.learners.get(learner_id.strip())
+
+    def require(self, learner_id: str) -> LearnerProfile:
+        learner = self.get(learner_id)
+        if learner is None:
+            raise ValueError(f"Unknown learner: {learner_id}")
+        return learner
+
+    def upsert(self, learner: LearnerProfile) -> None:
+        self.learners[validate_learner_id(learner.learner_id)] = learner
+
+    def active_learners(self) -> List[LearnerProfile]:
+        return [item for item in self.learners.values() if item.active]
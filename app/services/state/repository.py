@@ -1,38 +1,143 @@
 from __future__ import annotations
 
+import fcntl
 import json
-from dataclasses import dataclass
-from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterator, Optional, Set
 
 from app.models.schemas import DailyLesson
+from app.services.learning.word_keys import normalize_word_key
+from app.services.state.dedup_index import ProcessedKeyIndex
+from app.services.state.learners import LearnerProfile, validate_learner_id
+from app.services.state.review_scheduler import ReviewScheduler
+from app.services.state.rollups import DailyRollups, RollupSummary
+from app.services.state.vocab_index import VocabularyIndex
 
 
 VALID_GRAMMAR_STATUSES = {"unknown", "review", "mastered"}
 
 
+def sent_log_entry(lesson: DailyLesson) -> Dict[str, Any]:
+    return {
+        "lesson_id": lesson.lesson_id,
+        "title": lesson.title,
+        "language": lesson.language,
+        "created_at": lesson.created_at,
+        "source_urls": lesson.source_urls,
+    }
+
+
 @dataclass
 class StateRepository:
     data_dir: Path
+    feedback_dedup_max_keys: int = 5000
+    learner_id: str = ""
+    _dedup_index: Optional[ProcessedKeyIndex] = field(default=None, init=False, repr=False)
+    _vocab_index: Optional[VocabularyIndex] = field(default=None, init=False, repr=False)
+    _review_scheduler: Optional[ReviewScheduler] = field(default=None, init=False, repr=False)
+    _rollups: Optional[DailyRollups] = field(default=None, init=False, repr=False)
+    # path -> JSON payload or index object, written once when batched_writes() exits.
+    _pending_writes: Optional[Dict[Path, Any]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.learner_id:
+            self.learner_id = validate_learner_id(self.learner_id)
+
+    @classmethod
+    def for_learner(cls, data_dir: Path, learner: Optional[LearnerProfile], **kwargs: Any) -> "StateRepository":
+        return cls(data_dir=data_dir, learner_id=learner.learner_id if learner else "", **kwargs)
+
+    @property
+    def progress_dir(self) -> Path:
+        # The default (single-learner) layout keeps its historical location.
+        if not self.learner_id:
+            return self.data_dir / "progress"
+        return self.data_dir / "learners" / self.learner_id / "progress"
 
     @property
     def vocab_path(self) -> Path:
-        return self.data_dir / "progress" / "vocabulary_status.json"
+        return self.progress_dir / "vocabulary_status.json"
+
+    @property
+    def vocab_index_path(self) -> Path:
+        return self.progress_dir / "vocabulary_index.json"
+
+    @property
+    def lemma_map_path(self) -> Path:
+        return self.progress_dir / "lemma_map.json"
+
+    @property
+    def review_schedule_path(self) -> Path:
+        return self.progress_dir / "review_schedule.json"
 
     @property
     def grammar_path(self) -> Path:
-        return self.data_dir / "progress" / "grammar_status.json"
+        return self.progress_dir / "grammar_status.json"
 
     @property
     def sent_log_path(self) -> Path:
-        return self.data_dir / "progress" / "sent_log.json"
+        return self.progress_dir / "sent_log.json"
 
     @property
     def feedback_log_path(self) -> Path:
-        return self.data_dir / "progress" / "feedback_log.json"
+        return self.progress_dir / "feedback_log.json"
+
+    @property
+    def rollups_path(self) -> Path:
+        return self.progress_dir / "daily_rollups.json"
+
+    @property
+    def processed_keys_path(self) -> Path:
+        return self.progress_dir / "processed_message_keys.json"
+
+    @property
+    def imap_checkpoints_path(self) -> Path:
+        return self.progress_dir / "imap_checkpoints.json"
+
+    @contextmanager
+    def batched_writes(self) -> Iterator["StateRepository"]:
+        """Coalesce state file writes inside the block into one write per file on exit.
+
+        The block holds an exclusive lock on the shard, so feedback applied by
+        another process (``--ingest-feedback`` next to ``--feedback-http``) waits
+        instead of overwriting these files with what it read earlier. State read
+        inside the block is therefore current.
+        """
+        if self._pending_writes is not None:
+            yield self
+            return
+        with self._shard_lock():
+            self._pending_writes = {}
+            try:
+                yield self
+            finally:
+                pending, self._pending_writes = self._pending_writes, None
+                # Source files first: derived files stamp them when they are saved.
+                for path, item in pending.items():
+                    if isinstance(item, dict):
+                        self.save_json(path, item)
+                for item in pending.values():
+                    if not isinstance(item, dict):
+                        item.save()
+
+    @contextmanager
+    def _shard_lock(self) -> Iterator[None]:
+        # Feedback batches lock the default shard before any learner shard, so two
+        # processes cannot end up waiting on each other.
+        self.progress_dir.mkdir(parents=True, exist_ok=True)
+        with (self.progress_dir / ".state.lock").open("a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
 
     def load_json(self, path: Path, default: Dict[str, Any]) -> Dict[str, Any]:
+        if self._pending_writes is not None and isinstance(self._pending_writes.get(path), dict):
+            return self._pending_writes[path]
         if not path.exists():
             path.parent.mkdir(parents=True, exist_ok=True)
             path.write_text(json.dumps(default, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -40,60 +145,86 @@ class StateRepository:
         return json.loads(path.read_text(encoding="utf-8"))
 
     def save_json(self, path: Path, payload: Dict[str, Any]) -> None:
+        if self._pending_writes is not None:
+            self._pending_writes[path] = payload
+            return
         path.parent.mkdir(parents=True, exist_ok=True)
         path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
     def apply_existing_progress(self, lesson: DailyLesson) -> None:
-        vocab = self.load_json(self.vocab_path, {"words": {}})
+        index = self._vocabulary_index()
         grammar = self.load_json(self.grammar_path, {"topics": {}})
 
-        word_map = vocab.get("words", {})
         for item in lesson.keywords:
-            status = str(word_map.get(item.word, "unknown"))
-            item.mastery_level = status
+            item.mastery_level = index.status_of(item.word)
 
         topic_map = grammar.get("topics", {})
         raw_status = topic_map.get(lesson.grammar_point.topic, "unknown")
         lesson.grammar_point.status = self._normalize_grammar_status(raw_status)
 
     def build_study_profile(self, base_level: str) -> Dict[str, Any]:
-        vocab = self.load_json(self.vocab_path, {"words": {}})
-        words_map = vocab.get("words", {})
+        index = self._vocabulary_index()
+        known_count = index.count("known")
+        unknown_words = index.words("unknown")
+        fuzzy_words = index.words("fuzzy")
 
-        known_words = sorted([word for word, status in words_map.items() if str(status) == "known"])
-        fuzzy_words = sorted([word for word, status in words_map.items() if str(status) == "fuzzy"])
-        unknown_words = sorted([word for word, status in words_map.items() if str(status) == "unknown"])
-
-        effective_level = self._compute_effective_level(base_level=base_level, known_count=len(known_words))
+        effective_level = self._compute_effective_level(base_level=base_level, known_count=known_count)
 
         return {
             "base_level": base_level,
             "effective_level": effective_level,
-            "known_count": len(known_words),
+            "known_count": known_count,
             "fuzzy_count": len(fuzzy_words),
             "unknown_count": len(unknown_words),
-            "known_words": known_words[-300:],
-            "priority_review_words": (unknown_words + fuzzy_words)[:160],
+            "known_words": index.words("known")[-300:],
+            "priority_review_words": self._review_schedule().next_reviews(160),
         }
 
     def record_sent_lesson(self, lesson: DailyLesson) -> None:
+        self.record_sent_entry(sent_log_entry(lesson))
+
+    def record_sent_entry(self, entry: Dict[str, Any]) -> None:
+        """Append a ``sent_log_entry`` to the sent log and the daily rollups."""
+        rollups = self._daily_rollups()
         sent_log = self.load_json(self.sent_log_path, {"lessons": []})
-        sent_log.setdefault("lessons", []).append(
-            {
-                "lesson_id": lesson.lesson_id,
-                "title": lesson.title,
-                "language": lesson.language,
-                "created_at": lesson.created_at,
-                "source_urls": lesson.source_urls,
-            }
-        )
+        sent_log.setdefault("lessons", []).append(entry)
         self.save_json(self.sent_log_path, sent_log)
 
+        rollups.add_lesson(entry)
+        self._persist(rollups)
+
+    def summarize_activity(self, start: date, end: date) -> RollupSummary:
+        return self._daily_rollups().summarize(start, end)
+
+    def vocabulary_status_counts(self) -> Dict[str, int]:
+        index = self._vocabulary_index()
+        counts = {status: index.count(status) for status in ("known", "fuzzy", "unknown")}
+        counts["total"] = len(index.entries)
+        return counts
+
+    def word_status(self, word: str, default: str = "unknown") -> str:
+        return self._vocabulary_index().status_of(word, default)
+
     def upsert_word_status(self, word: str, status: str) -> None:
+        index = self._vocabulary_index()
+        # Case/umlaut/inflection variants update the entry already stored for that key.
+        existing = index.lookup(word)
+        if existing and existing["word"]:
+            word = existing["word"]
+
         vocab = self.load_json(self.vocab_path, {"words": {}})
-        vocab.setdefault("words", {})[word] = status
+        words = vocab.setdefault("words", {})
+        previous = words.get(word)
+        words[word] = status
         self.save_json(self.vocab_path, vocab)
 
+        index.update(word, None if previous is None else str(previous), status)
+        self._persist(index)
+
+        scheduler = self._review_schedule()
+        scheduler.record(word, status)
+        self._persist(scheduler)
+
     def set_grammar_status(self, topic: str, status: str) -> None:
         grammar = self.load_json(self.grammar_path, {"topics": {}})
         grammar.setdefault("topics", {})[topic] = self._normalize_grammar_status(status)
@@ -103,25 +234,138 @@ class StateRepository:
         self.set_grammar_status(topic=topic, status="mastered" if mastered else "review")
 
     def record_feedback_event(self, event: Dict[str, Any]) -> None:
-        payload = self.load_json(self.feedback_log_path, {"events": [], "processed_message_keys": []})
+        rollups = self._daily_rollups()
+        # Loaded (and checked) against the log as it was; re-saved below so its stamp covers the new event.
+        scheduler = self._review_schedule()
+        payload = self.load_json(self.feedback_log_path, {"events": []})
         item = {"timestamp": datetime.utcnow().isoformat(), **event}
         payload.setdefault("events", []).append(item)
         self.save_json(self.feedback_log_path, payload)
 
+        rollups.add_event(item)
+        self._persist(rollups)
+        self._persist(scheduler)
+
     def get_processed_feedback_message_keys(self) -> Set[str]:
-        payload = self.load_json(self.feedback_log_path, {"events": [], "processed_message_keys": []})
-        raw_keys = payload.get("processed_message_keys", [])
-        return {str(item).strip() for item in raw_keys if str(item).strip()}
+        return set(self._processed_key_index())
+
+    def is_feedback_message_processed(self, message_key: str) -> bool:
+        return message_key in self._processed_key_index()
 
     def mark_feedback_message_processed(self, message_key: str) -> None:
         if not message_key.strip():
             return
-        payload = self.load_json(self.feedback_log_path, {"events": [], "processed_message_keys": []})
-        keys: List[str] = [str(item).strip() for item in payload.get("processed_message_keys", []) if str(item).strip()]
-        if message_key not in keys:
-            keys.append(message_key)
-        payload["processed_message_keys"] = keys[-5000:]
-        self.save_json(self.feedback_log_path, payload)
+        index = self._processed_key_index()
+        if index.add(message_key):
+            self._persist(index)
+
+    def get_imap_checkpoints(self) -> Dict[str, Dict[str, int]]:
+        payload = self.load_json(self.imap_checkpoints_path, {"mailboxes": {}})
+        return {
+            str(mailbox): {"uidvalidity": int(item.get("uidvalidity", 0)), "last_uid": int(item.get("last_uid", 0))}
+            for mailbox, item in payload.get("mailboxes", {}).items()
+        }
+
+    def save_imap_checkpoints(self, checkpoints: Dict[str, Dict[str, int]]) -> None:
+        self.save_json(self.imap_checkpoints_path, {"mailboxes": dict(sorted(checkpoints.items()))})
+
+    def _persist(self, index: Any) -> None:
+        if self._pending_writes is not None:
+            self._pending_writes[index.path] = index
+        else:
+            index.save()
+
+    def _vocabulary_index(self) -> VocabularyIndex:
+        if self._vocab_index is not None:
+            return self._vocab_index
+
+        lemmas = self._load_lemma_map()
+        sources = [self.vocab_path, self.lemma_map_path]
+        index: Optional[VocabularyIndex] = None
+        if self.vocab_index_path.exists():
+            index = VocabularyIndex.load(self.vocab_index_path, lemmas, sources)
+            if not index.is_current():
+                index = None
+        if index is None:
+            vocab = self.load_json(self.vocab_path, {"words": {}})
+            index = VocabularyIndex.build(self.vocab_index_path, vocab.get("words", {}), lemmas, sources)
+            index.save()
+
+        self._vocab_index = index
+        return index
+
+    def _load_lemma_map(self) -> Dict[str, str]:
+        # Optional {"lemmas": {"Kinder": "Kind", ...}}; editing it rebuilds the vocabulary index.
+        if not self.lemma_map_path.exists():
+            return {}
+        payload = json.loads(self.lemma_map_path.read_text(encoding="utf-8"))
+        return {
+            normalize_word_key(form): normalize_word_key(lemma)
+            for form, lemma in payload.get("lemmas", {}).items()
+            if normalize_word_key(form) and normalize_word_key(lemma)
+        }
+
+    def _review_schedule(self) -> ReviewScheduler:
+        if self._review_scheduler is not None:
+            return self._review_scheduler
+
+        # Replayed from the feedback log whenever it or the vocabulary changed outside
+        # this class (hand edit, merge, an older checkout writing feedback).
+        sources = [self.vocab_path, self.feedback_log_path]
+        scheduler: Optional[ReviewScheduler] = None
+        if self.review_schedule_path.exists():
+            scheduler = ReviewScheduler.load(self.review_schedule_path, sources)
+            if not scheduler.is_current():
+                scheduler = None
+        if scheduler is None:
+            index = self._vocabulary_index()
+            feedback_log = self.load_json(self.feedback_log_path, {"events": []})
+            scheduler = ReviewScheduler.build(
+                self.review_schedule_path,
+                events=feedback_log.get("events", []),
+                pending_words=index.words("unknown") + index.words("fuzzy"),
+                sources=sources,
+            )
+            scheduler.save()
+
+        self._review_scheduler = scheduler
+        return scheduler
+
+    def _daily_rollups(self) -> DailyRollups:
+        if self._rollups is None:
+            if self.rollups_path.exists():
+                self._rollups = DailyRollups.load(self.rollups_path, self._normalize_grammar_status)
+            else:
+                # Backfill once from the raw logs; afterwards every record_* call updates a bucket.
+                sent_log = self.load_json(self.sent_log_path, {"lessons": []})
+                feedback_log = self.load_json(self.feedback_log_path, {"events": []})
+                self._rollups = DailyRollups.build(
+                    self.rollups_path,
+                    self._normalize_grammar_status,
+                    lessons=sent_log.get("lessons", []),
+                    events=feedback_log.get("events", []),
+                )
+                self._rollups.save()
+        return self._rollups
+
+    def _processed_key_index(self) -> ProcessedKeyIndex:
+        if self._dedup_index is not None:
+            return self._dedup_index
+
+        index = ProcessedKeyIndex(path=self.processed_keys_path, max_keys=self.feedback_dedup_max_keys)
+        if index.exists():
+            index.load()
+        else:
+            # One-time migration: keys used to live inside the feedback event log.
+            payload = self.load_json(self.feedback_log_path, {"events": []})
+            legacy_keys = payload.pop("processed_message_keys", None)
+            index.seed(legacy_keys or [])
+            index.save()
+            if legacy_keys is not None:
+                self.save_json(self.feedback_log_path, payload)
+
+        self._dedup_index = index
+        return index
 
     def _normalize_grammar_status(self, value: Any) -> str:
         if isinstance(value, bool):
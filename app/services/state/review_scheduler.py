@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import heapq
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.state.source_stamp import Stamp, source_stamp, sources_unchanged
+
+# SM-2 answer quality for each word feedback status.
+STATUS_QUALITY: Dict[str, int] = {
+    "unknown": 1,
+    "fuzzy": 3,
+    "known": 5,
+}
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+NEVER_REVIEWED = "1970-01-01T00:00:00"
+
+
+@dataclass
+class ReviewCard:
+    word: str
+    due: str = NEVER_REVIEWED
+    interval_days: float = 0.0
+    ease: float = DEFAULT_EASE
+    repetitions: int = 0
+    last_status: str = "unknown"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "due": self.due,
+            "interval_days": self.interval_days,
+            "ease": round(self.ease, 4),
+            "repetitions": self.repetitions,
+            "last_status": self.last_status,
+        }
+
+    @staticmethod
+    def from_dict(word: str, payload: Dict[str, Any]) -> "ReviewCard":
+        return ReviewCard(
+            word=word,
+            due=str(payload.get("due", NEVER_REVIEWED)),
+            interval_days=float(payload.get("interval_days", 0.0)),
+            ease=float(payload.get("ease", DEFAULT_EASE)),
+            repetitions=int(payload.get("repetitions", 0)),
+            last_status=str(payload.get("last_status", "unknown")),
+        )
+
+
+@dataclass
+class ReviewScheduler:
+    """SM-2 style spaced-repetition schedule for words still under review.
+
+    Cards live in a dict and a min-heap ordered by due date. Updated cards are
+    pushed again and stale heap entries are skipped lazily, so taking the top N
+    due words costs O(N log V) instead of a full sort. Like the vocabulary
+    index, the schedule records the stamp of the files it was replayed from
+    (``sources``) and is rebuilt once one of them changed behind its back.
+    """
+
+    path: Path
+    cards: Dict[str, ReviewCard] = field(default_factory=dict)
+    sources: List[Path] = field(default_factory=list)
+    stamp: Stamp = field(default_factory=dict)
+    _heap: List[Tuple[str, float, str]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._heap = [self._heap_entry(card) for card in self.cards.values()]
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def load(cls, path: Path, sources: Sequence[Path] = ()) -> "ReviewScheduler":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        cards = {
+            str(word): ReviewCard.from_dict(str(word), item)
+            for word, item in payload.get("cards", {}).items()
+        }
+        return cls(path=path, cards=cards, sources=list(sources), stamp=dict(payload.get("sources", {})))
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        *,
+        events: Iterable[Dict[str, Any]],
+        pending_words: Iterable[str],
+        sources: Sequence[Path] = (),
+    ) -> "ReviewScheduler":
+        scheduler = cls(path=path, sources=list(sources))
+        for event in events:
+            if event.get("type") != "word":
+                continue
+            word = str(event.get("word", "")).strip()
+            status = str(event.get("status", "")).strip()
+            if not word or status not in STATUS_QUALITY:
+                continue
+            scheduler.record(word, status, reviewed_at=scheduler._parse_ts(str(event.get("timestamp", ""))))
+
+        # Words that are pending review but never came through feedback are due now.
+        for word in pending_words:
+            if word not in scheduler.cards:
+                scheduler._put(ReviewCard(word=word))
+        return scheduler
+
+    def is_current(self) -> bool:
+        return sources_unchanged(self.sources, self.stamp)
+
+    def save(self) -> None:
+        # Saved after the sources it mirrors, so the stamp matches what was just written.
+        self.stamp = source_stamp(self.sources)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "sources": self.stamp,
+            "cards": {word: card.to_dict() for word, card in self.cards.items()},
+        }
+        self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def record(self, word: str, status: str, *, reviewed_at: Optional[datetime] = None) -> None:
+        quality = STATUS_QUALITY.get(status)
+        if quality is None:
+            return
+
+        # Known words leave the review queue; they are excluded from keywords anyway.
+        if status == "known":
+            self.cards.pop(word, None)
+            return
+
+        reviewed_at = reviewed_at or datetime.utcnow()
+        card = self.cards.get(word) or ReviewCard(word=word)
+
+        if quality < 3:
+            card.repetitions = 0
+            card.interval_days = 1.0
+        else:
+            card.repetitions += 1
+            if card.repetitions == 1:
+                card.interval_days = 1.0
+            elif card.repetitions == 2:
+                card.interval_days = 6.0
+            else:
+                card.interval_days = round(card.interval_days * card.ease, 2)
+
+        card.ease = max(MIN_EASE, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        card.due = (reviewed_at + timedelta(days=card.interval_days)).isoformat()
+        card.last_status = status
+        self._put(card)
+
+    def next_reviews(self, limit: int) -> List[str]:
+        picked: List[Tuple[str, float, str]] = []
+        picked_words: set[str] = set()
+        while self._heap and len(picked) < limit:
+            entry = heapq.heappop(self._heap)
+            if entry[2] in picked_words or not self._is_current(entry):
+                continue
+            picked.append(entry)
+            picked_words.add(entry[2])
+
+        for entry in picked:
+            heapq.heappush(self._heap, entry)
+        return [entry[2] for entry in picked]
+
+    def _put(self, card: ReviewCard) -> None:
+        self.cards[card.word] = card
+        heapq.heappush(self._heap, self._heap_entry(card))
+        if len(self._heap) > 2 * len(self.cards) + 64:
+            self._heap = [entry for entry in self._heap if self._is_current(entry)]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry: Tuple[str, float, str]) -> bool:
+        card = self.cards.get(entry[2])
+        return card is not None and self._heap_entry(card) == entry
+
+    def _heap_entry(self, card: ReviewCard) -> Tuple[str, float, str]:
+        # Earliest due first; among equally due words the harder (lower ease) one wins.
+        return (card.due, card.ease, card.word)
+
+    def _parse_ts(self, value: str) -> datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return datetime.utcnow()
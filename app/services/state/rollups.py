@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {
+        "lessons_sent": 0,
+        "lessons": [],
+        "feedback_events": 0,
+        "word_status": {},
+        "grammar_status": {},
+        "unknown_words": {},
+        "fuzzy_words": {},
+    }
+
+
+def _bump(counter: Dict[str, int], key: str, amount: int = 1) -> None:
+    counter[key] = counter.get(key, 0) + amount
+
+
+@dataclass
+class RollupSummary:
+    lessons: List[Dict[str, Any]] = field(default_factory=list)
+    feedback_events: int = 0
+    word_status: Counter = field(default_factory=Counter)
+    grammar_status: Counter = field(default_factory=Counter)
+    unknown_words: Counter = field(default_factory=Counter)
+    fuzzy_words: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class DailyRollups:
+    """Per-day report counters, updated as lessons and feedback events are recorded.
+
+    A report for any date range merges one small bucket per day instead of
+    rescanning the raw sent/feedback logs.
+    """
+
+    path: Path
+    normalize_grammar_status: Callable[[Any], str]
+    days: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, normalize_grammar_status: Callable[[Any], str]) -> "DailyRollups":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        return cls(path=path, normalize_grammar_status=normalize_grammar_status, days=payload.get("days", {}))
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        normalize_grammar_status: Callable[[Any], str],
+        *,
+        lessons: Iterable[Dict[str, Any]],
+        events: Iterable[Dict[str, Any]],
+    ) -> "DailyRollups":
+        rollups = cls(path=path, normalize_grammar_status=normalize_grammar_status)
+        for lesson in lessons:
+            rollups.add_lesson(lesson)
+        for event in events:
+            rollups.add_event(event)
+        return rollups
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"days": dict(sorted(self.days.items()))}
+        self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def add_lesson(self, lesson: Dict[str, Any]) -> None:
+        created_at = str(lesson.get("created_at", ""))
+        bucket = self._bucket(created_at)
+        bucket["lessons_sent"] += 1
+        bucket["lessons"].append({"created_at": created_at, "title": str(lesson.get("title", ""))})
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        bucket = self._bucket(str(event.get("timestamp", "")))
+        bucket["feedback_events"] += 1
+
+        event_type = event.get("type")
+        if event_type == "word":
+            status = str(event.get("status", ""))
+            _bump(bucket["word_status"], status)
+            word = str(event.get("word", "")).strip()
+            if status == "unknown":
+                _bump(bucket["unknown_words"], word)
+            elif status == "fuzzy":
+                _bump(bucket["fuzzy_words"], word)
+        elif event_type == "grammar":
+            status = self.normalize_grammar_status(event.get("status", event.get("mastered", "")))
+            _bump(bucket["grammar_status"], status)
+
+    def summarize(self, start: date, end: date) -> RollupSummary:
+        summary = RollupSummary()
+        for offset in range((end - start).days + 1):
+            bucket = self.days.get((start + timedelta(days=offset)).isoformat())
+            if bucket is None:
+                continue
+            summary.lessons.extend(bucket.get("lessons", []))
+            summary.feedback_events += int(bucket.get("feedback_events", 0))
+            summary.word_status.update(bucket.get("word_status", {}))
+            summary.grammar_status.update(bucket.get("grammar_status", {}))
+            summary.unknown_words.update(bucket.get("unknown_words", {}))
+            summary.fuzzy_words.update(bucket.get("fuzzy_words", {}))
+        return summary
+
+    def _bucket(self, timestamp: str) -> Dict[str, Any]:
+        day = self._day_key(timestamp)
+        bucket = self.days.get(day)
+        if bucket is None:
+            bucket = _empty_bucket()
+            self.days[day] = bucket
+        return bucket
+
+    def _day_key(self, value: str) -> str:
+        if not value:
+            return "1970-01-01"
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return "1970-01-01"
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc)
+        return parsed.date().isoformat()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# file name -> [mtime_ns, size, sha256], or None for a file that did not exist.
+Stamp = Dict[str, Optional[List[object]]]
+
+
+def source_stamp(paths: Sequence[Path]) -> Stamp:
+    """Stamp of the files a derived state file (index, schedule) was built from."""
+    return {path.name: _file_stamp(path) for path in paths}
+
+
+def sources_unchanged(paths: Sequence[Path], stamp: Stamp) -> bool:
+    if set(stamp) != {path.name for path in paths}:
+        return False
+    return all(_source_unchanged(path, stamp[path.name]) for path in paths)
+
+
+def _file_stamp(path: Path) -> Optional[List[object]]:
+    try:
+        stat = path.stat()
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, digest]
+
+
+def _source_unchanged(path: Path, recorded: Optional[List[object]]) -> bool:
+    # mtime and size settle the common case without reading the file; a fresh
+    # checkout resets mtimes, so a mismatch falls back to the content hash.
+    try:
+        stat = path.stat()
+    except OSError:
+        return recorded is None
+    if not recorded or len(recorded) != 3:
+        return False
+    if recorded[0] == stat.st_mtime_ns and recorded[1] == stat.st_size:
+        return True
+    if recorded[1] != stat.st_size:
+        return False
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest() == recorded[2]
+    except OSError:
+        return False
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from app.services.learning.word_keys import normalize_word_key
+from app.services.state.source_stamp import Stamp, source_stamp, sources_unchanged
+
+INDEXED_WORD_STATUSES = ("unknown", "fuzzy", "known")
+INDEX_VERSION = 4
+
+
+@dataclass
+class VocabularyIndex:
+    """Per-status sorted word lists plus a normalized-key lookup table.
+
+    Both are maintained incrementally on every word update. Counts are list
+    lengths, profile slices come straight off the sorted lists, and word
+    lookups are a single dict hit on the normalized key. The index records the
+    stamp of the files it was derived from (``sources``) and is stale as soon as
+    the content of one of them changes outside the repository, e.g. a hand
+    edit or a pull; a checkout that only resets mtimes keeps it.
+    """
+
+    path: Path
+    by_status: Dict[str, List[str]] = field(default_factory=dict)
+    # normalized key -> {"word": stored surface form, "status": status}
+    entries: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    lemmas: Dict[str, str] = field(default_factory=dict)
+    version: int = INDEX_VERSION
+    sources: List[Path] = field(default_factory=list)
+    stamp: Stamp = field(default_factory=dict)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        lemmas: Optional[Mapping[str, str]] = None,
+        sources: Sequence[Path] = (),
+    ) -> "VocabularyIndex":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        by_status: Dict[str, List[str]] = {status: [] for status in INDEXED_WORD_STATUSES}
+        for status, items in payload.get("by_status", {}).items():
+            if status in by_status:
+                by_status[status] = [str(item) for item in items]
+        entries = {
+            str(key): {"word": str(item.get("word", "")), "status": str(item.get("status", ""))}
+            for key, item in payload.get("entries", {}).items()
+        }
+        return cls(
+            path=path,
+            by_status=by_status,
+            entries=entries,
+            lemmas=dict(lemmas or {}),
+            version=int(payload.get("version", 1)),
+            sources=list(sources),
+            stamp=dict(payload.get("sources", {})),
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        words: Mapping[str, object],
+        lemmas: Optional[Mapping[str, str]] = None,
+        sources: Sequence[Path] = (),
+    ) -> "VocabularyIndex":
+        index = cls(
+            path=path,
+            by_status={status: [] for status in INDEXED_WORD_STATUSES},
+            lemmas=dict(lemmas or {}),
+            sources=list(sources),
+        )
+        for word, status in words.items():
+            index.entries[index.key(word)] = {"word": word, "status": str(status)}
+        # From the deduplicated entries: spellings of one key count once, as the last one stored.
+        for entry in index.entries.values():
+            bucket = index.by_status.get(entry["status"])
+            if bucket is not None:
+                bucket.append(entry["word"])
+        for bucket in index.by_status.values():
+            bucket.sort()
+        return index
+
+    def is_current(self) -> bool:
+        return self.version == INDEX_VERSION and sources_unchanged(self.sources, self.stamp)
+
+    def save(self) -> None:
+        # Saved after the sources it mirrors, so the stamp matches what was just written.
+        self.stamp = source_stamp(self.sources)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.version,
+            "sources": self.stamp,
+            "by_status": self.by_status,
+            "entries": self.entries,
+        }
+        self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def key(self, word: str) -> str:
+        return normalize_word_key(word, self.lemmas)
+
+    def lookup(self, word: str) -> Optional[Dict[str, str]]:
+        return self.entries.get(self.key(word))
+
+    def status_of(self, word: str, default: str = "unknown") -> str:
+        entry = self.lookup(word)
+        return entry["status"] if entry else default
+
+    def count(self, status: str) -> int:
+        return len(self.by_status.get(status, []))
+
+    def words(self, status: str) -> List[str]:
+        return self.by_status.get(status, [])
+
+    def update(self, word: str, previous: Optional[str], status: str) -> None:
+        self.entries[self.key(word)] = {"word": word, "status": status}
+        if previous is not None and str(previous) != status:
+            self._discard(str(previous), word)
+        bucket = self.by_status.get(status)
+        if bucket is None:
+            return
+        pos = bisect_left(bucket, word)
+        if pos == len(bucket) or bucket[pos] != word:
+            insort(bucket, word, lo=pos)
+
+    def _discard(self, status: str, word: str) -> None:
+        bucket = self.by_status.get(status)
+        if not bucket:
+            return
+        pos = bisect_left(bucket, word)
+        if pos < len(bucket) and bucket[pos] == word:
+            del bucket[pos]
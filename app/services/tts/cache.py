@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from app.services.tts.base import TTSProvider
+
+
+@dataclass
+class AudioCache:
+    """Content-addressed MP3 store: ``<root>/<sha256(provider, voice, text)>.mp3``.
+
+    Least recently used files (by mtime, refreshed on every hit) are evicted
+    once the store grows past ``max_bytes``.
+    """
+
+    root: Path
+    max_bytes: int
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @staticmethod
+    def key(*, text: str, voice: str, provider: str) -> str:
+        payload = "\0".join([provider, voice, text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            if path.stat().st_size == 0:
+                return None
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, source: Path) -> Path:
+        """Copy ``source`` into the store atomically and evict down to the size bound."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self.path_for(key)
+        tmp = target.with_name(f".{target.name}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+        self.evict(keep=target)
+        return target
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        with self._lock:
+            files = []
+            total = 0
+            for path in self.root.glob("*.mp3"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """Place ``source`` at ``target``: a hard link when possible, else a copy; replaces atomically."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+@dataclass
+class CachedTTSProvider(TTSProvider):
+    """Skips synthesis when the same text was already spoken with the same voice and provider."""
+
+    inner: TTSProvider
+    cache: AudioCache
+    provider_name: str
+
+    def synthesize(self, *, text: str, voice: str, output_path: Path) -> None:
+        key = AudioCache.key(text=text, voice=voice, provider=self.provider_name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            link_or_copy(cached, output_path)
+            print(f"[TTS] Cache hit {key[:12]}, skipped synthesis")
+            return
+
+        # The dated file may be a hard link into the store; never let the provider write through it.
+        output_path.unlink(missing_ok=True)
+        self.inner.synthesize(text=text, voice=voice, output_path=output_path)
+        if output_path.exists() and output_path.stat().st_size > 0:
+            self.cache.put(key, output_path)
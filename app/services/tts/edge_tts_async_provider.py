@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.services.tts.base import TTSProvider
+
+
+@dataclass
+class EdgeTTSAsyncProvider(TTSProvider):
+    """edge-tts through its Python API in this process, instead of one CLI process per attempt.
+
+    Audio chunks are written to the output file as they arrive. Each attempt is
+    bounded by ``timeout`` seconds on top of edge-tts' own connect/receive
+    timeouts. ``metrics`` describes the last successful synthesis.
+    """
+
+    max_attempts: int = 3
+    connect_timeout: int = 10
+    receive_timeout: int = 60
+    timeout: float = 180.0
+    # Called after every audio chunk with (chunks so far, bytes so far).
+    on_chunk: Optional[Callable[[int, int], None]] = field(default=None, repr=False)
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+    metrics: Dict[str, float] = field(default_factory=dict, init=False)
+
+    def synthesize(self, *, text: str, voice: str, output_path: Path) -> None:
+        try:
+            import edge_tts
+        except ImportError as exc:
+            raise RuntimeError("edge_tts package not installed; install dependencies first") from exc
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        last_error = ""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                metrics = asyncio.run(
+                    asyncio.wait_for(self._stream(edge_tts, text, voice, output_path), timeout=self.timeout)
+                )
+            except asyncio.TimeoutError:
+                last_error = f"timed out after {self.timeout:.0f}s"
+            except Exception as exc:
+                last_error = str(exc) or type(exc).__name__
+            else:
+                if metrics["bytes"] > 0:
+                    metrics["attempt"] = attempt
+                    self.metrics = metrics
+                    print(
+                        f"[TTS] edge in-process: {metrics['chunks']:.0f} chunks, {metrics['bytes'] / 1024:.1f} KB, "
+                        f"first chunk {metrics['first_chunk_seconds']:.2f}s, max gap {metrics['max_gap_seconds']:.2f}s, "
+                        f"total {metrics['total_seconds']:.2f}s (attempt {attempt})"
+                    )
+                    return
+                last_error = "no audio received"
+
+            if attempt < self.max_attempts:
+                self.sleep(attempt)
+
+        raise RuntimeError(f"edge-tts failed after {self.max_attempts} attempts: {last_error}")
+
+    async def _stream(self, edge_tts: Any, text: str, voice: str, output_path: Path) -> Dict[str, float]:
+        communicate = edge_tts.Communicate(
+            text,
+            voice,
+            connect_timeout=self.connect_timeout,
+            receive_timeout=self.receive_timeout,
+        )
+        tmp = output_path.with_name(f".{output_path.name}.part")
+        started = time.perf_counter()
+        last = started
+        first_chunk = 0.0
+        max_gap = 0.0
+        chunks = 0
+        size = 0
+        try:
+            with tmp.open("wb") as fh:
+                async for chunk in communicate.stream():
+                    if chunk.get("type") != "audio":
+                        continue
+                    now = time.perf_counter()
+                    if chunks == 0:
+                        first_chunk = now - started
+                    else:
+                        max_gap = max(max_gap, now - last)
+                    last = now
+                    fh.write(chunk["data"])
+                    chunks += 1
+                    size += len(chunk["data"])
+                    if self.on_chunk is not None:
+                        self.on_chunk(chunks, size)
+            if size:
+                os.replace(tmp, output_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        return {
+            "chunks": float(chunks),
+            "bytes": float(size),
+            "first_chunk_seconds": first_chunk,
+            "max_gap_seconds": max_gap,
+            "total_seconds": time.perf_counter() - started,
+        }
@@ -1,14 +1,35 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from app.services.tts.base import TTSProvider
+from app.services.tts.cache import AudioCache, CachedTTSProvider
+from app.services.tts.edge_tts_async_provider import EdgeTTSAsyncProvider
 from app.services.tts.edge_tts_provider import EdgeTTSProvider
 from app.services.tts.null_tts_provider import NullTTSProvider
 
 
-def build_tts_provider(provider_name: str) -> TTSProvider:
+def build_tts_provider(
+    provider_name: str,
+    cache: Optional[AudioCache] = None,
+    *,
+    connect_timeout: int = 10,
+    receive_timeout: int = 60,
+    timeout: float = 180.0,
+) -> TTSProvider:
     provider_name = provider_name.strip().lower()
     if provider_name == "edge":
-        return EdgeTTSProvider()
-    if provider_name == "none":
+        provider: TTSProvider = EdgeTTSAsyncProvider(
+            connect_timeout=connect_timeout,
+            receive_timeout=receive_timeout,
+            timeout=timeout,
+        )
+    elif provider_name == "edge-cli":
+        provider = EdgeTTSProvider()
+    elif provider_name == "none":
         return NullTTSProvider()
-    raise ValueError(f"Unsupported TTS provider: {provider_name}")
+    else:
+        raise ValueError(f"Unsupported TTS provider: {provider_name}")
+    if cache is not None:
+        return CachedTTSProvider(inner=provider, cache=cache, provider_name=provider_name)
+    return provider
@@ -0,0 +1,64 @@
+"""Feedback parser throughput.
+
+    python -m benchmarks.bench_feedback_parser [--rounds 2000]
+
+The corpus mixes the body shapes that reach the parser in practice (the
+mailto fallback draft, a text/plain form post, a urlencoded HTTP post, a
+reply quoting earlier mail) with synthetic bodies carrying many words.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+from urllib.parse import quote_plus
+
+from app.services.feedback.parser import parse_feedback_commands
+
+TOKEN = "bench-token"
+WORDS = ["Schule", "Stadt", "Bahnhof", "Regierung", "Wahl", "Zeitung", "Wetter", "Arbeit", "Rock & Roll", "Straße"]
+
+
+def _fields(n_words: int) -> List[tuple]:
+    fields = [("lln_feedback", "1"), ("token", TOKEN), ("lesson_id", "de-20260213"), ("language", "de")]
+    for idx in range(1, n_words + 1):
+        fields.append((f"word_{idx}_text", WORDS[idx % len(WORDS)]))
+        fields.append((f"word_{idx}_status", ("unknown", "fuzzy", "known")[idx % 3]))
+    fields += [("grammar_topic", "Verbzweitstellung"), ("grammar_status", "review")]
+    return fields
+
+
+def build_corpus() -> List[str]:
+    form = _fields(5)
+    mailto_draft = "LLDN_FEEDBACK\n" + "\n".join(f"{key}={value}" for key, value in form)
+    text_plain_post = "\r\n".join(f"{key}={value}" for key, value in form) + "\r\n"
+    urlencoded_post = "&".join(f"{key}={quote_plus(value)}" for key, value in form)
+    quoted_history = "\n".join(f"> Zeile {idx} der alten Nachricht mit = Zeichen" for idx in range(200))
+    reply = text_plain_post + "\nVon meinem iPhone gesendet\n\n" + quoted_history
+    synthetic = ["\n".join(f"{key}={value}" for key, value in _fields(n)) for n in (30, 100, 300)]
+    return [mailto_draft, text_plain_post, urlencoded_post, reply, *synthetic]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    total_bytes = sum(len(body.encode("utf-8")) for body in corpus)
+    commands = sum(len(parse_feedback_commands(body, token=TOKEN)) for body in corpus)
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for body in corpus:
+            parse_feedback_commands(body, token=TOKEN)
+    elapsed = time.perf_counter() - started
+
+    bodies = args.rounds * len(corpus)
+    print(f"corpus: {len(corpus)} bodies, {total_bytes} bytes, {commands} commands per round")
+    print(f"{bodies / elapsed:,.0f} bodies/s, {args.rounds * total_bytes / elapsed / 1e6:.1f} MB/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
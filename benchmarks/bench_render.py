@@ -0,0 +1,69 @@
+"""Daily-lesson email render throughput.
+
+    python -m benchmarks.bench_render [--renders 200]
+
+Compares building a fresh Jinja environment per render (the old behaviour)
+with the shared, precompiled environment used by EmailRenderer, and a full
+render with filling a cached lesson skeleton per recipient.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.models.schemas import DailyLesson
+from app.services.email.renderer import _SKELETONS, EmailRenderer
+from tests.helpers import TEMPLATE_DIR, sample_lesson
+
+
+def _render_uncached(renderer: EmailRenderer, lesson: DailyLesson) -> str:
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        autoescape=select_autoescape(["html", "xml"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    renderer._environment = lambda: env  # type: ignore[method-assign]
+    return renderer.render_daily_lesson(lesson=lesson, audio_url=None, has_audio_attachment=True)
+
+
+def _render_full(renderer: EmailRenderer, lesson: DailyLesson) -> str:
+    _SKELETONS.clear()
+    return renderer.render_daily_lesson(lesson=lesson, audio_url=None, has_audio_attachment=True)
+
+
+def _rate(renders: int, fn) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        fn()
+    return renders / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=200)
+    args = parser.parse_args()
+
+    lesson = sample_lesson()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cached = EmailRenderer(template_dir=TEMPLATE_DIR, feedback_email="me@example.com", cache_dir=Path(cache_dir))
+        uncached = EmailRenderer(template_dir=TEMPLATE_DIR, feedback_email="me@example.com")
+
+        fresh = _rate(args.renders, lambda: _render_uncached(uncached, lesson))
+        shared = _rate(args.renders, lambda: _render_full(cached, lesson))
+        skeleton = cached.render_lesson_skeleton(lesson=lesson, audio_url=None, has_audio_attachment=True)
+        statuses = {item.word: "fuzzy" for item in lesson.keywords}
+        per_recipient = _rate(args.renders, lambda: cached.render_for_recipient(skeleton, word_statuses=statuses))
+
+    print(f"fresh environment per render: {fresh:,.0f} templates/s")
+    print(f"cached environment:           {shared:,.0f} templates/s ({shared / fresh:.1f}x)")
+    print(f"per recipient on a skeleton:  {per_recipient:,.0f} emails/s ({per_recipient / shared:.1f}x a full render)")
+
+
+if __name__ == "__main__":
+    main()
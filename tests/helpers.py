@@ -0,0 +1,47 @@
+"""Sample data shared by the tests and the benchmarks."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.models.schemas import DailyLesson, GrammarPoint, SentencePair, WordExplanation
+
+TEMPLATE_DIR = Path(__file__).resolve().parents[1] / "app" / "templates"
+
+
+def sample_lesson(n_words: int = 5) -> DailyLesson:
+    words = [
+        WordExplanation(
+            word=f"Wort{idx}",
+            part_of_speech="Nomen",
+            explanation="Erklärung " * 8,
+            etymology="Herkunft",
+            morphology="das Wort, die Wörter",
+            tense_or_inflection="Nominativ",
+            translation_en="word",
+            translation_zh="词",
+            example_sentence_de="Das ist ein Beispielsatz mit dem Wort.",
+        )
+        for idx in range(1, n_words + 1)
+    ]
+    return DailyLesson(
+        lesson_id="de-20260213",
+        language="de",
+        cefr_level="A2",
+        title="Die Stadt baut eine neue Schule",
+        news_text="Die Stadt baut eine neue Schule. " * 20,
+        chinese_translation="这座城市正在建一所新学校。" * 20,
+        sentence_pairs=[SentencePair(de_sentence="Die Stadt baut eine Schule.", zh_sentence="城市建学校。")] * 10,
+        keywords=words,
+        grammar_point=GrammarPoint(
+            topic="Verbzweitstellung",
+            source_sentence="Die Stadt baut eine neue Schule.",
+            explanation_zh="动词第二位。",
+            explanation_zh_detailed="详细说明。" * 10,
+            study_tips_zh="多读。",
+            reference_url="https://example.com/grammar",
+            example_de="Heute baut die Stadt eine Schule.",
+        ),
+        source_urls=["https://example.com/news"],
+        audio_text="Die Stadt baut eine neue Schule.",
+    )
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.services.reporting.analytics import (
+    EventColumns,
+    build_progress_report,
+    conversion_days,
+    known_vocabulary_series,
+)
+
+
+def _columns() -> EventColumns:
+    events = [
+        {"timestamp": "2026-03-01T08:00:00", "type": "word", "word": "Haus", "status": "unknown"},
+        {"timestamp": "2026-03-01T09:00:00", "type": "word", "word": "Zug", "status": "known"},
+        {"timestamp": "2026-03-04T08:00:00", "type": "word", "word": "Haus", "status": "known"},
+        {"timestamp": "2026-03-05T08:00:00", "type": "word", "word": "Zug", "status": "fuzzy"},
+        {"timestamp": "2026-03-05T09:00:00", "type": "grammar", "topic": "Perfekt", "status": "review"},
+        {"timestamp": "2026-03-06T09:00:00Z", "type": "grammar", "topic": "Perfekt", "status": "mastered"},
+        {"timestamp": "2026-03-06T10:00:00", "type": "skip"},
+    ]
+    lessons = [{"created_at": "2026-03-01T07:00:00"}, {"created_at": "2026-03-04T07:00:00"}]
+    return EventColumns.from_logs({"": events}, {"": lessons})
+
+
+def test_known_series_and_conversion_times() -> None:
+    columns = _columns()
+    edges = np.array(["2026-03-01T23:59:59", "2026-03-04T23:59:59", "2026-03-05T23:59:59"], dtype="datetime64[s]")
+    assert known_vocabulary_series(columns, edges).tolist() == [1, 2, 1]
+    assert conversion_days(columns).tolist() == [3.0]
+
+
+def test_progress_report_buckets_by_day() -> None:
+    report = build_progress_report(_columns(), period="monthly", now=datetime(2026, 3, 10, 12, 0))
+    assert report["known_now"] == 1
+    assert report["lessons_total"] == 2
+    assert report["word_feedback_total"] == 4
+    assert report["conversion"]["count"] == 1
+    assert report["grammar_topics"] == [
+        {
+            "topic": "Perfekt",
+            "latest_status": "mastered",
+            "mastered_marks": 1,
+            "review_marks": 1,
+            "active_periods": ["2026-03-05", "2026-03-06"],
+        }
+    ]
+
+
+def test_progress_report_scopes_conversions_and_ignores_untimestamped_events() -> None:
+    events = [
+        {"timestamp": "2026-01-02T08:00:00", "type": "word", "word": "Bahn", "status": "unknown"},
+        {"timestamp": "2026-01-05T08:00:00", "type": "word", "word": "Bahn", "status": "known"},
+        {"timestamp": "2026-02-20T08:00:00", "type": "word", "word": "Haus", "status": "unknown"},
+        {"timestamp": "2026-03-04T08:00:00", "type": "word", "word": "Haus", "status": "known"},
+        {"type": "word", "word": "Zug", "status": "known"},
+        {"timestamp": "garbage", "type": "word", "word": "Stadt", "status": "known"},
+    ]
+    columns = EventColumns.from_logs({"": events}, {"": [{"created_at": ""}]})
+    assert columns.ts.size == 4 and columns.lesson_ts.size == 0
+
+    monthly = build_progress_report(columns, period="monthly", now=datetime(2026, 3, 10, 12, 0))
+    # Haus became known inside the last 30 days (its unknown mark is older); Bahn did not.
+    assert monthly["conversion"]["count"] == 1
+    assert monthly["conversion"]["median_days"] == 12.0
+
+    everything = build_progress_report(columns, period="all", now=datetime(2026, 3, 10, 12, 0))
+    assert everything["range_label"] == "2026-01 ~ 2026-03"
+    assert everything["conversion"]["count"] == 2
@@ -0,0 +1,106 @@
+import json
+from types import SimpleNamespace
+
+from tests.helpers import TEMPLATE_DIR, sample_lesson
+
+from app.pipeline.daily_job import DailyJob
+from app.services.email import renderer
+from app.services.state.learners import LearnerProfile
+from app.services.state.repository import StateRepository
+
+
+def test_shared_lesson_is_built_once_and_personalized_per_learner(tmp_path, monkeypatch) -> None:
+    settings = SimpleNamespace(
+        data_dir=tmp_path,
+        template_dir=TEMPLATE_DIR,
+        jinja_cache_dir=None,
+        feedback_email="me@example.com",
+        feedback_subject_prefix="[LLDN]",
+        feedback_token="t",
+        feedback_http_url="",
+        email_inline_css=False,
+        email_minify_html=False,
+        audio_public_base_url="",
+        audio_attach_max_bytes=0,
+    )
+    builds = []
+    skeletons = []
+    render_skeleton = renderer.EmailRenderer.render_lesson_skeleton
+
+    def build_lesson(self, *args):
+        builds.append(args)
+        return sample_lesson(3)
+
+    def record_skeleton(self, **kwargs):
+        skeletons.append(render_skeleton(self, **kwargs))
+        return skeletons[-1]
+
+    monkeypatch.setattr(DailyJob, "_build_lesson", build_lesson)
+    monkeypatch.setattr(DailyJob, "_generate_audio", lambda self, *args: None)
+    monkeypatch.setattr(renderer.EmailRenderer, "render_lesson_skeleton", record_skeleton)
+
+    StateRepository(data_dir=tmp_path, learner_id="ben").upsert_word_status("Wort2", "known")
+    shared = {}
+    for learner_id in ("anna", "ben"):
+        learner = LearnerProfile(learner_id=learner_id, email=f"{learner_id}@example.com", language="de", cefr_level="A2")
+        DailyJob(settings=settings, shared_lessons=shared).run(dry_run=True, learner=learner)
+
+    assert len(builds) == 1 and list(shared) == [("de", "A2")]
+    assert skeletons[0] is skeletons[1]
+    anna = (tmp_path / "logs" / "latest_email_preview-anna.html").read_text(encoding="utf-8")
+    ben = (tmp_path / "logs" / "latest_email_preview-ben.html").read_text(encoding="utf-8")
+    assert 'name="word_2_status" value="unknown" checked' in anna
+    assert 'name="word_2_status" value="known" checked' in ben
+    assert shared[("de", "A2")].keywords[1].mastery_level == "unknown"
+
+
+def test_spooled_lesson_is_logged_as_sent_only_after_delivery(tmp_path, monkeypatch) -> None:
+    from app.pipeline.mail import record_delivery
+    from app.services.email.outbox import Outbox
+    from app.services.email.smtp_sender import SendResult
+
+    settings = SimpleNamespace(
+        data_dir=tmp_path,
+        template_dir=TEMPLATE_DIR,
+        jinja_cache_dir=None,
+        feedback_email="me@example.com",
+        feedback_subject_prefix="[LLDN]",
+        feedback_token="t",
+        feedback_http_url="",
+        email_inline_css=False,
+        email_minify_html=False,
+        audio_public_base_url="",
+        audio_attach_max_bytes=0,
+        smtp_host="smtp.example.com",
+        smtp_port=587,
+        smtp_user="me",
+        smtp_password="pw",
+        email_from="me@example.com",
+        smtp_connections=1,
+        smtp_max_messages_per_connection=100,
+    )
+    monkeypatch.setattr(DailyJob, "_build_lesson", lambda self, *args: sample_lesson(3))
+    monkeypatch.setattr(DailyJob, "_generate_audio", lambda self, *args: None)
+
+    outbox = Outbox(root=tmp_path / "outbox", on_delivered=record_delivery(tmp_path))
+    learner = LearnerProfile(learner_id="anna", email="anna@example.com", language="de", cefr_level="A1")
+    DailyJob(settings=settings, outbox=outbox).run(learner=learner)
+    sent_log = StateRepository(data_dir=tmp_path, learner_id="anna").sent_log_path
+    assert not sent_log.exists()
+
+    class _Sender:
+        def __init__(self, error: str) -> None:
+            self.error = error
+
+        def deliver(self, envelopes):
+            return [
+                SendResult(to_address=e.to_address, ok=not self.error, size=1, latency=0.0, attempts=1, error=self.error)
+                for e in envelopes
+            ]
+
+    # A queued lesson that SMTP has not accepted yet is not in the sent log.
+    assert outbox.deliver_due(_Sender("421 try later"), now=0.0) == 0
+    assert not sent_log.exists()
+    assert outbox.deliver_due(_Sender(""), now=10**9) == 1
+    lessons = json.loads(sent_log.read_text(encoding="utf-8"))["lessons"]
+    assert [lesson["lesson_id"] for lesson in lessons] == [sample_lesson(3).lesson_id]
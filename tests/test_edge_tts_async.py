@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import types
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.services.tts.edge_tts_async_provider import EdgeTTSAsyncProvider
+from app.services.tts.factory import build_tts_provider
+
+
+def _fake_edge_tts(script: List[str]) -> types.ModuleType:
+    """edge_tts stand-in; each Communicate consumes one scripted outcome: ok, fail or hang."""
+
+    class Communicate:
+        def __init__(self, text: str, voice: str, *, connect_timeout: int, receive_timeout: int) -> None:
+            self.text = text
+            self.outcome = script.pop(0)
+
+        async def stream(self):
+            yield {"type": "SentenceBoundary", "text": self.text}
+            for idx in range(3):
+                if self.outcome == "fail" and idx == 1:
+                    raise ConnectionError("socket closed")
+                if self.outcome == "hang" and idx == 1:
+                    await asyncio.sleep(10)
+                yield {"type": "audio", "data": f"chunk{idx};".encode()}
+
+    module = types.ModuleType("edge_tts")
+    module.Communicate = Communicate  # type: ignore[attr-defined]
+    return module
+
+
+def test_streams_chunks_to_file_and_records_metrics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "edge_tts", _fake_edge_tts(["ok"]))
+    progress = []
+    provider = EdgeTTSAsyncProvider(on_chunk=lambda chunks, size: progress.append((chunks, size)))
+
+    provider.synthesize(text="Hallo", voice="de-DE-KatjaNeural", output_path=tmp_path / "audio" / "a.mp3")
+
+    assert (tmp_path / "audio" / "a.mp3").read_bytes() == b"chunk0;chunk1;chunk2;"
+    assert progress == [(1, 7), (2, 14), (3, 21)]
+    assert provider.metrics["chunks"] == 3 and provider.metrics["bytes"] == 21 and provider.metrics["attempt"] == 1
+    assert not list((tmp_path / "audio").glob(".*"))
+
+
+def test_retries_failed_and_timed_out_attempts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "edge_tts", _fake_edge_tts(["fail", "hang", "ok", "fail", "fail"]))
+    provider = EdgeTTSAsyncProvider(timeout=0.2, sleep=lambda _: None)
+
+    provider.synthesize(text="Hallo", voice="v", output_path=tmp_path / "a.mp3")
+    assert provider.metrics["attempt"] == 3
+
+    provider.max_attempts = 2
+    with pytest.raises(RuntimeError, match="socket closed"):
+        provider.synthesize(text="Hallo", voice="v", output_path=tmp_path / "b.mp3")
+    assert not (tmp_path / "b.mp3").exists()
+
+
+def test_factory_registers_in_process_and_cli_providers() -> None:
+    assert isinstance(build_tts_provider("edge", timeout=30), EdgeTTSAsyncProvider)
+    assert build_tts_provider("edge-cli").__class__.__name__ == "EdgeTTSProvider"
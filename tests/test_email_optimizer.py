@@ -0,0 +1,40 @@
+from tests.helpers import TEMPLATE_DIR, sample_lesson
+
+from app.services.email.optimizer import EmailOptimizer, inline_css, minify_html
+from app.services.email.renderer import EmailRenderer
+
+
+def test_inline_css_applies_cascade_and_keeps_uninlinable_rules() -> None:
+    html = """<html><head><style>
+      /* palette */
+      p { color: red; margin: 0; }
+      .box p { color: blue; }
+      a:hover { color: green; }
+      @media (max-width: 600px) { .box { padding: 0; } }
+    </style></head>
+    <body><div class="box"><p style="margin: 4px">hi</p><br/></div><p>out</p></body></html>"""
+
+    out = inline_css(html)
+
+    assert '<p style="color:blue;margin:4px">hi</p>' in out
+    assert '<p style="color:red;margin:0">out</p>' in out
+    assert "<style>a:hover{color:green}@media (max-width:600px){.box{padding:0}}</style>" in out
+    assert "palette" not in out
+
+
+def test_minify_keeps_line_breaks_and_preformatted_text() -> None:
+    html = "<div>\n    <!-- note -->\n    <p>a    b</p>\n\n  <pre>  x\n    y</pre>\n</div>"
+    assert minify_html(html) == "<div>\n<p>a b</p>\n<pre>  x\n    y</pre>\n</div>"
+
+
+def test_optimized_lesson_email_is_smaller_and_keeps_content() -> None:
+    renderer = EmailRenderer(template_dir=TEMPLATE_DIR, feedback_email="me@example.com", feedback_token="t")
+    html = renderer.render_daily_lesson(lesson=sample_lesson(), audio_url=None, has_audio_attachment=True)
+
+    minified = EmailOptimizer(inline_css=False).optimize(html)
+    inlined = EmailOptimizer(inline_css=True).optimize(html)
+
+    assert len(minified) < len(html) * 0.95
+    assert "<style>" not in inlined
+    assert 'class="submit-btn" type="submit" value="提交本次反馈（一次发送）" style="' in inlined
+    assert minified.count('name="word_1_status"') == inlined.count('name="word_1_status"') == 3
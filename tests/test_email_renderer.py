@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from tests.helpers import TEMPLATE_DIR, sample_lesson
+
+from app.services.email.renderer import EmailRenderer
+from app.services.feedback.parser import learner_token
+
+
+def test_renderers_share_one_environment_and_bytecode_cache(tmp_path: Path) -> None:
+    first = EmailRenderer(template_dir=TEMPLATE_DIR, cache_dir=tmp_path / "jinja")
+    second = EmailRenderer(template_dir=TEMPLATE_DIR, cache_dir=tmp_path / "jinja", learner_id="anna")
+    assert first._environment() is second._environment()
+
+    html = second.render_daily_lesson(lesson=sample_lesson(), audio_url=None, has_audio_attachment=False)
+    assert 'name="learner_id" value="anna"' in html
+    assert list((tmp_path / "jinja").glob("__jinja2_*.cache"))
+
+
+def test_recipients_fill_one_shared_skeleton(tmp_path: Path) -> None:
+    lesson = sample_lesson(n_words=3)
+    anna = EmailRenderer(template_dir=TEMPLATE_DIR, feedback_email="me@example.com", feedback_token="t", learner_id="anna")
+    ben = EmailRenderer(template_dir=TEMPLATE_DIR, feedback_email="me@example.com", feedback_token="t", learner_id="ben")
+
+    skeleton = anna.render_lesson_skeleton(lesson=lesson, audio_url=None, has_audio_attachment=True)
+    assert ben.render_lesson_skeleton(lesson=lesson, audio_url=None, has_audio_attachment=True) is skeleton
+    assert anna.render_for_recipient(skeleton) == anna.render_daily_lesson(
+        lesson=lesson, audio_url=None, has_audio_attachment=True
+    )
+
+    html = ben.render_for_recipient(skeleton, word_statuses={"Wort2": "known"}, grammar_status="mastered")
+    assert 'name="learner_id" value="ben"' in html and "anna" not in html
+    assert f'name="token" value="{learner_token("t", "ben")}"' in html
+    assert 'name="word_2_status" value="known" checked' in html
+    assert 'name="word_1_status" value="unknown" checked' in html
+    assert 'name="grammar_status" value="mastered" checked' in html
+    assert "已掌握" in html
+    assert "word_2_status%3Dknown" in html
+    assert "<!--lldn-slot" not in html
@@ -0,0 +1,130 @@
+import imaplib
+from types import SimpleNamespace
+
+from app.pipeline.feedback_daemon import FeedbackDaemon
+from app.services.feedback.applier import FeedbackApplier
+
+
+def test_applier_applies_once_per_message_key(tmp_path) -> None:
+    body = """lln_feedback=1
+ token=abc
+ lesson_id=de-20260213
+ language=de
+ word_1_text=Schule
+ word_1_status=known
+"""
+    applier = FeedbackApplier(data_dir=tmp_path, feedback_token="abc")
+    assert applier.apply(body=body, message_key="<m1@x>", sender="a@example.com", mailbox="INBOX") == 1
+    assert applier.apply(body=body, message_key="<m1@x>", sender="a@example.com", mailbox="INBOX") is None
+    assert applier.state_repo.word_status("Schule") == "known"
+    assert applier.apply(body="hello", message_key="<m2@x>", sender="a@example.com", mailbox="INBOX") == 0
+
+
+class _FlakyClient:
+    def __init__(self, fail: bool, wakeups) -> None:
+        self.fail = fail
+        self.wakeups = wakeups
+
+    def __enter__(self):
+        if self.fail:
+            raise OSError("connection refused")
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def idle(self, _mailbox, *, timeout):
+        if not self.wakeups:
+            raise imaplib.IMAP4.abort("socket closed")
+        return self.wakeups.pop(0)
+
+
+class _Job:
+    def __init__(self, clients) -> None:
+        self.clients = clients
+        self.ingests = 0
+
+    def is_configured(self) -> bool:
+        return True
+
+    def build_client(self):
+        return self.clients.pop(0)
+
+    def ingest(self, _client) -> int:
+        self.ingests += 1
+        return 0
+
+
+def test_daemon_ingests_on_new_mail_and_reconnects_with_backoff() -> None:
+    job = _Job([_FlakyClient(True, []), _FlakyClient(True, []), _FlakyClient(False, [False, True])])
+    sleeps = []
+    daemon = FeedbackDaemon(
+        settings=SimpleNamespace(imap_idle_mailbox="INBOX"),
+        sleep=sleeps.append,
+        job=job,
+    )
+
+    daemon.run(max_cycles=4)
+
+    assert sleeps == [1.0, 2.0]
+    # catch-up after connecting + one wake-up with new mail
+    assert job.ingests == 2
+
+
+class _SelectedOnceServer:
+    """Keeps UIDVALIDITY only until it is read once, like imaplib's untagged responses."""
+
+    capabilities = ()
+
+    def __init__(self) -> None:
+        self.untagged = {}
+        self.searches = []
+
+    def login(self, *_args):
+        return ("OK", [b""])
+
+    def logout(self):
+        return ("BYE", [b""])
+
+    def select(self, _mailbox):
+        self.untagged["UIDVALIDITY"] = [b"7"]
+        return ("OK", [b"2"])
+
+    def response(self, code):
+        return (code, self.untagged.pop(code, [None]))
+
+    def uid(self, command, *args):
+        if command == "SEARCH":
+            self.searches.append(args)
+            return ("OK", [b"40 41"])
+        return ("OK", [None])
+
+
+def test_daemon_keeps_scanning_incrementally_on_one_session(tmp_path, monkeypatch) -> None:
+    from app.services.feedback.imap_client import IMAPFeedbackClient
+
+    server = _SelectedOnceServer()
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda *_args: server)
+    monkeypatch.setattr(IMAPFeedbackClient, "idle", lambda self, mailbox, *, timeout: self._select_mailbox(self.open(), mailbox))
+    settings = SimpleNamespace(
+        data_dir=tmp_path,
+        feedback_token="abc",
+        feedback_dedup_max_keys=100,
+        imap_host="imap.example.com",
+        imap_port=993,
+        imap_user="u",
+        imap_password="p",
+        imap_idle_mailbox="INBOX",
+        imap_feedback_mailboxes=["INBOX"],
+        imap_feedback_since_days=0,
+        imap_parallel_mailboxes=1,
+        feedback_subject_prefix="[LLDN]",
+        feedback_strict_sender=False,
+        feedback_allowed_senders=[],
+    )
+
+    FeedbackDaemon(settings=settings, sleep=lambda _seconds: None).run(max_cycles=1)
+
+    assert server.searches == [("SUBJECT", '"[LLDN]"'), ("UID", "42:*", "SUBJECT", '"[LLDN]"')]
+    checkpoints = FeedbackApplier(data_dir=tmp_path, feedback_token="abc").state_repo.get_imap_checkpoints()
+    assert checkpoints == {"INBOX": {"uidvalidity": 7, "last_uid": 41}}
@@ -0,0 +1,52 @@
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.feedback.http_receiver import FeedbackHTTPReceiver
+from app.services.state.repository import StateRepository
+
+FORM = "lln_feedback=1\r\ntoken=abc\r\nlesson_id=de-20260213\r\nlanguage=de\r\nword_1_text={word}\r\nword_1_status=known\r\n"
+
+
+def _post(url: str, body: str, content_type: str = "text/plain") -> int:
+    request = urllib.request.Request(url, data=body.encode("utf-8"), headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def test_receiver_applies_concurrent_submissions_and_rejects_bad_token(tmp_path) -> None:
+    receiver = FeedbackHTTPReceiver(data_dir=tmp_path, feedback_token="abc", port=0)
+    server = receiver.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/feedback"
+    try:
+        words = [f"Wort{idx}" for idx in range(12)]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            statuses = list(pool.map(lambda word: _post(url, FORM.format(word=word)), words))
+        assert statuses == [200] * len(words)
+
+        assert _post(url, FORM.format(word="Wort0")) == 200  # same form again: deduplicated
+        assert _post(url, FORM.format(word="Schule").replace("token=abc", "token=bad")) == 403
+        assert _post(url, "lln_feedback=1&token=abc&lesson_id=de-20260213&word_1_text=Stadt&word_1_status=fuzzy", "application/x-www-form-urlencoded") == 200
+    finally:
+        receiver.shutdown()
+
+    repo = StateRepository(data_dir=tmp_path)
+    assert all(repo.word_status(word) == "known" for word in words)
+    assert repo.word_status("Stadt") == "fuzzy"
+    assert repo.word_status("Schule", default="missing") == "missing"
+    events = repo.load_json(repo.feedback_log_path, {"events": []})["events"]
+    assert len(events) == len(words) + 1
+
+
+def test_receiver_refuses_to_start_without_token(tmp_path) -> None:
+    import pytest
+
+    receiver = FeedbackHTTPReceiver(data_dir=tmp_path, feedback_token="", port=0)
+    with pytest.raises(ValueError):
+        receiver.start()
+    assert receiver.submit(FORM.format(word="Schule").replace("token=abc\r\n", ""), sender="127.0.0.1") is None
@@ -62,3 +62,43 @@ def test_parse_batch_feedback_ignores_token_mismatch() -> None:
 """
     cmds = parse_feedback_commands(body, token="wrong")
     assert cmds == []
+
+
+def test_parse_batch_feedback_carries_learner_id() -> None:
+    from app.services.feedback.parser import learner_token
+
+    body = """lln_feedback=1
+ token={token}
+ lesson_id=de-20260213
+ language=de
+ learner_id={learner}
+ word_1_text=Schule
+ word_1_status=fuzzy
+"""
+    anna_token = learner_token("abc", "anna")
+    cmds = parse_feedback_commands(body.format(token=anna_token, learner="anna"), token="abc")
+    assert [c.learner_id for c in cmds] == ["anna"]
+
+    # Neither the shared token nor another learner's token can write to anna's state.
+    assert parse_feedback_commands(body.format(token="abc", learner="anna"), token="abc") == []
+    assert parse_feedback_commands(body.format(token=anna_token, learner="ben"), token="abc") == []
+
+
+def test_parse_batch_feedback_supports_any_number_of_words() -> None:
+    lines = ["lln_feedback=1", "token=abc", "lesson_id=de-20260213", "language=de"]
+    for idx in range(1, 41):
+        lines += [f"word_{idx}_text=Wort{idx}", f"word_{idx}_status=known"]
+    cmds = parse_feedback_commands("\r\n".join(lines), token="abc")
+    assert [c.word for c in cmds] == [f"Wort{idx}" for idx in range(1, 41)]
+
+
+def test_parse_query_style_body_with_token_anywhere() -> None:
+    body = "lesson_id=de-20260213&word_2_text=Rock+%26+Roll&token=abc&word_2_status=fuzzy&lln_feedback=1"
+    cmds = parse_feedback_commands(body, token="abc")
+    assert [(c.word, c.word_status) for c in cmds] == [("Rock & Roll", "fuzzy")]
+
+
+def test_parse_keeps_ampersand_inside_line_values() -> None:
+    body = "lln_feedback=1\ntoken=abc\nlesson_id=x\ngrammar_topic=Dativ & Akkusativ\ngrammar_status=review\n"
+    cmds = parse_feedback_commands(body, token="abc")
+    assert [c.topic for c in cmds] == ["Dativ & Akkusativ"]
@@ -33,3 +33,378 @@ def test_select_mailbox_returns_false_on_bad_command() -> None:
 def test_select_mailbox_tries_quoted_candidate() -> None:
     client = _build_client()
     assert client._select_mailbox(_QuotedOnlyClient(), "[Gmail]/All Mail") is True
+
+
+class _SearchRecorder:
+    def __init__(self, capabilities=(), fail_first: bool = False) -> None:
+        self.capabilities = capabilities
+        self.fail_first = fail_first
+        self.calls = []
+
+    def uid(self, command, *criteria):
+        assert command == "SEARCH"
+        self.calls.append(criteria)
+        if self.fail_first and len(self.calls) == 1:
+            raise imaplib.IMAP4.error("BAD")
+        return ("OK", [b"3 7"])
+
+
+def test_search_uses_server_side_criteria() -> None:
+    from datetime import datetime
+
+    client = IMAPFeedbackClient(
+        host="imap.example.com",
+        port=993,
+        username="u",
+        password="p",
+        subject_prefix="[LLDN]",
+        allowed_senders=["a@example.com", "b@example.com"],
+        mailboxes=["INBOX"],
+    )
+    recorder = _SearchRecorder()
+    assert client._search_candidates(recorder, since=datetime(2026, 3, 1)) == [b"3", b"7"]
+    assert recorder.calls == [
+        ("SUBJECT", '"[LLDN]"', '(OR FROM "a@example.com" FROM "b@example.com")', "SINCE", "01-Mar-2026")
+    ]
+
+
+def test_search_keeps_dotted_and_tagged_gmail_senders() -> None:
+    from datetime import datetime
+
+    client = IMAPFeedbackClient(
+        host="imap.gmail.com",
+        port=993,
+        username="u",
+        password="p",
+        subject_prefix="[LLDN]",
+        allowed_senders=["John.Doe@gmail.com", "jane@example.com"],
+        mailboxes=["INBOX"],
+    )
+    recorder = _SearchRecorder(capabilities=("X-GM-EXT-1",), fail_first=True)
+    client._search_candidates(recorder, since=datetime(2026, 3, 1))
+    assert recorder.calls[0] == ("X-GM-RAW", '"subject:(LLDN) from:(@gmail.com OR jane@example.com) after:2026/03/01"')
+    assert recorder.calls[1] == (
+        "SUBJECT", '"[LLDN]"', '(OR FROM "@gmail.com" FROM "jane@example.com")', "SINCE", "01-Mar-2026"
+    )
+
+    # The server term is a substring of the reply's address; the normalized check accepts it.
+    reply_from = "johndoe+lldn@gmail.com"
+    assert "@gmail.com" in reply_from
+    assert client._normalize_email(reply_from) == client._normalize_email("John.Doe@gmail.com")
+
+
+def test_search_prefers_gmail_raw_and_falls_back() -> None:
+    from datetime import datetime
+
+    client = _build_client()
+    recorder = _SearchRecorder(capabilities=("IMAP4REV1", "X-GM-EXT-1"), fail_first=True)
+    assert client._search_candidates(recorder, since=datetime(2026, 3, 1)) == [b"3", b"7"]
+    assert recorder.calls[0] == ("X-GM-RAW", '"subject:(LLDN) after:2026/03/01"')
+    assert recorder.calls[1] == ("SUBJECT", '"[LLDN]"', "SINCE", "01-Mar-2026")
+
+
+class _FetchRecorder:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def uid(self, command, message_set, items):
+        assert command == "FETCH"
+        self.calls.append((message_set, items))
+        if "BODYSTRUCTURE" in items:
+            return (
+                "OK",
+                [
+                    (
+                        b"4 (UID 104 BODY[HEADER.FIELDS (SUBJECT FROM MESSAGE-ID)] {68}",
+                        b"Subject: [LLDN] feedback\r\nFrom: a@example.com\r\nMessage-ID: <m4@x>\r\n\r\n",
+                    ),
+                    b' BODYSTRUCTURE (("text" "plain" ("charset" "utf-8") NIL NIL "base64" 12 1 NIL NIL NIL)'
+                    b' ("text" "html" ("charset" "utf-8") NIL NIL "7bit" 20 1 NIL NIL NIL) "alternative"))',
+                    (
+                        b"5 (UID 105 BODY[HEADER.FIELDS (SUBJECT FROM MESSAGE-ID)] {44}",
+                        b"Subject: newsletter\r\nFrom: b@example.com\r\n\r\n",
+                    ),
+                    b' BODYSTRUCTURE ("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 5 1 NIL NIL NIL))',
+                ],
+            )
+        return ("OK", [(b"4 (UID 104 BODY[1] {12}", b"d29yZD1rbm93"), b")"])
+
+
+def test_fetch_downloads_headers_then_only_matching_text_parts() -> None:
+    from app.services.feedback.imap_fetch import parse_bodystructure, select_text_parts
+
+    client = _build_client()
+    recorder = _FetchRecorder()
+    candidates = client._fetch_candidate_headers(recorder, [b"104", b"105"], set())
+    assert [item.msg_id for item in candidates] == [b"104"]
+    assert candidates[0].message_id_header == "<m4@x>"
+    assert [part.section for part in candidates[0].text_parts] == ["1"]
+
+    bodies = client._fetch_text_bodies(recorder, candidates)
+    assert bodies == {b"104": "word=know"}
+    assert recorder.calls[0][0] == b"104,105"
+    assert recorder.calls[1] == (b"104", "(BODY.PEEK[1])")
+
+    nested = parse_bodystructure(
+        b'1 (BODYSTRUCTURE ((("text" "plain" NIL NIL NIL "7bit" 3 1 NIL NIL NIL)'
+        b' ("text" "html" NIL NIL NIL "7bit" 3 1 NIL NIL NIL) "alternative")'
+        b' ("audio" "mpeg" NIL NIL NIL "base64" 9 NIL ("attachment" ("filename" "a.mp3")) NIL) "mixed"))'
+    )
+    assert [part.section for part in select_text_parts(nested)] == ["1.1"]
+
+
+class _IncrementalServer:
+    def __init__(self, uidvalidity: bytes) -> None:
+        self.uidvalidity = uidvalidity
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def login(self, *_args):
+        self.commands.append(("LOGIN",))
+        return ("OK", [b""])
+
+    def logout(self):
+        self.commands.append(("LOGOUT",))
+        return ("BYE", [b""])
+
+    def select(self, mailbox):
+        self.commands.append(("SELECT", mailbox))
+        return ("OK", [b"12"])
+
+    def response(self, code):
+        return (code, [self.uidvalidity])
+
+    def uid(self, command, *args):
+        self.commands.append((command,) + args)
+        # "41:*" still matches the newest message (UID 40) when nothing is new.
+        return ("OK", [b"40"])
+
+
+def test_fetch_only_requests_uids_after_checkpoint(monkeypatch) -> None:
+    client = _build_client()
+    client.since_days = 0
+    client.checkpoints = {"INBOX": {"uidvalidity": 7, "last_uid": 40}}
+    server = _IncrementalServer(b"7")
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda *_args: server)
+
+    assert client.fetch_recent_items() == []
+    assert server.commands[2:4] == [("SEARCH", "UID", "41:*", "SUBJECT", '"[LLDN]"'), ("LOGOUT",)]
+    assert client.checkpoints["INBOX"] == {"uidvalidity": 7, "last_uid": 40}
+
+
+def test_fetch_rescans_when_uidvalidity_changes(monkeypatch) -> None:
+    client = _build_client()
+    client.since_days = 0
+    client.checkpoints = {"INBOX": {"uidvalidity": 7, "last_uid": 40}}
+    server = _IncrementalServer(b"9")
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda *_args: server)
+
+    client.fetch_recent_items()
+    assert server.commands[2] == ("SEARCH", "SUBJECT", '"[LLDN]"')
+    assert client.checkpoints["INBOX"] == {"uidvalidity": 9, "last_uid": 40}
+
+
+class _BacklogServer(_IncrementalServer):
+    def __init__(self) -> None:
+        super().__init__(b"7")
+        self.fail_fetch = True
+
+    def uid(self, command, *args):
+        self.commands.append((command,) + args)
+        if command == "SEARCH":
+            return ("OK", [b"41 42 43 44"])
+        if self.fail_fetch:
+            raise imaplib.IMAP4.abort("connection reset")
+        return ("OK", [None])
+
+
+def test_checkpoint_only_covers_fetched_uids(monkeypatch) -> None:
+    client = _build_client()
+    client.since_days = 0
+    client.checkpoints = {"INBOX": {"uidvalidity": 7, "last_uid": 40}}
+    server = _BacklogServer()
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda *_args: server)
+
+    client.fetch_recent_items(limit=2)
+    assert ("FETCH", b"41,42") == server.commands[-2][:2]
+    assert client.checkpoints["INBOX"] == {"uidvalidity": 7, "last_uid": 40}
+
+    server.fail_fetch = False
+    client.fetch_recent_items(limit=2)
+    # The oldest UIDs go first; 43 and 44 are left for the next run.
+    assert client.checkpoints["INBOX"] == {"uidvalidity": 7, "last_uid": 42}
+
+
+def test_fetch_and_mark_seen_share_one_session(monkeypatch) -> None:
+    client = _build_client()
+    client.since_days = 0
+    server = _IncrementalServer(b"7")
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda *_args: server)
+
+    with client:
+        client.fetch_recent_items()
+        client.mark_seen([("INBOX", b"38"), ("INBOX", b"40")])
+
+    names = [command[0] for command in server.commands]
+    assert names.count("LOGIN") == 1 and names.count("SELECT") == 1
+    assert ("STORE", b"38,40", "+FLAGS", "(\\Seen)") in server.commands
+    assert names[-1] == "LOGOUT"
+    assert {"connect", "search", "store"} <= set(client.timings)
+
+
+class _GmailLabelsServer(_IncrementalServer):
+    capabilities = ("IMAP4REV1", "X-GM-EXT-1")
+    sizes = {"INBOX": 3, "[Gmail]/All Mail": 900}
+
+    def __init__(self) -> None:
+        super().__init__(b"7")
+        self.current = ""
+
+    def status(self, mailbox, _items):
+        return ("OK", [f'"{mailbox}" (MESSAGES {self.sizes[mailbox]})'.encode()])
+
+    def select(self, mailbox):
+        self.current = mailbox
+        return super().select(mailbox)
+
+    def uid(self, command, *args):
+        self.commands.append((command, self.current) + args)
+        uid = b"11" if self.current == "INBOX" else b"512"
+        if command == "SEARCH":
+            return ("OK", [uid])
+        if "BODYSTRUCTURE" in args[1]:
+            return (
+                "OK",
+                [
+                    (
+                        uid + b" (UID " + uid + b" X-GM-MSGID 1777 BODY[HEADER.FIELDS (SUBJECT FROM MESSAGE-ID)] {26}",
+                        b"Subject: [LLDN] feedback\r\n",
+                    ),
+                    b' BODYSTRUCTURE ("text" "plain" NIL NIL NIL "7bit" 9 1 NIL NIL NIL))',
+                ],
+            )
+        return ("OK", [(uid + b" (UID " + uid + b" BODY[1] {9}", b"word=know"), b")"])
+
+
+def test_gmail_duplicates_are_skipped_before_body_fetch(monkeypatch) -> None:
+    client = _build_client()
+    client.since_days = 0
+    client.mailboxes = ["[Gmail]/All Mail", "INBOX"]
+    server = _GmailLabelsServer()
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda *_args: server)
+
+    items = client.fetch_recent_items()
+    assert [(item.mailbox, item.msg_id, item.body) for item in items] == [("INBOX", b"11", "word=know")]
+    body_fetches = [command for command in server.commands if command[0] == "FETCH" and "BODYSTRUCTURE" not in command[3]]
+    assert [command[1] for command in body_fetches] == ["INBOX"]
+
+
+def test_parallel_scan_merges_in_mailbox_order(monkeypatch) -> None:
+    client = _build_client()
+    client.since_days = 0
+    client.parallel_mailboxes = 2
+    client.mailboxes = ["[Gmail]/All Mail", "INBOX"]
+    servers = []
+
+    def _connect(*_args):
+        servers.append(_GmailLabelsServer())
+        return servers[-1]
+
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", _connect)
+
+    items = client.fetch_recent_items()
+    assert [(item.mailbox, item.msg_id) for item in items] == [("INBOX", b"11")]
+    assert 1 <= len(servers) <= 2
+    body_fetches = [
+        command for server in servers for command in server.commands if command[0] == "FETCH" and "BODYSTRUCTURE" not in command[3]
+    ]
+    assert [command[1] for command in body_fetches] == ["INBOX"]
+    assert set(client.mailbox_timings) == {"INBOX", "[Gmail]/All Mail"}
+    assert all(server.commands[-1] == ("LOGOUT",) for server in servers)
+
+
+class _IdleServer:
+    def __init__(self, lines) -> None:
+        import socket
+
+        self.sock, self.peer = socket.socketpair()
+        # Buffered like imaplib's own reader, so read-ahead behaves the same.
+        self.file = self.sock.makefile("rb")
+        self.sent = []
+        self.lines = list(lines)
+
+    def select(self, _mailbox):
+        return ("OK", [b"1"])
+
+    def socket(self):
+        return self.sock
+
+    def readline(self):
+        return self.file.readline()
+
+    def send(self, data):
+        self.sent.append(data)
+        # Replay the server side: the continuation after IDLE, the completion after DONE.
+        if data.endswith(b" IDLE\r\n"):
+            self.peer.sendall(self.lines.pop(0))
+        elif data == b"DONE\r\n":
+            self.peer.sendall(self.lines.pop(0))
+
+
+def test_idle_returns_on_new_mail_and_times_out_quietly() -> None:
+    client = _build_client()
+    server = _IdleServer([b"+ idling\r\n", b"LLDN1 OK IDLE done\r\n"])
+    client._client = server
+
+    import threading
+
+    threading.Timer(0.05, lambda: server.peer.sendall(b"* 12 EXISTS\r\n")).start()
+    assert client.idle("INBOX", timeout=5) is True
+    assert server.sent == [b"LLDN1 IDLE\r\n", b"DONE\r\n"]
+
+    server.lines = [b"+ idling\r\n", b"LLDN2 OK IDLE done\r\n"]
+    assert client.idle("INBOX", timeout=0.05) is False
+
+
+def test_extract_text_body_prefers_marked_plain_part_and_skips_attachments() -> None:
+    from email.message import EmailMessage
+
+    from app.services.feedback.html_text import html_to_text
+
+    msg = EmailMessage()
+    msg.set_content("Thanks for the lesson!")
+    msg.add_alternative("<p>lln_feedback=1</p>", subtype="html")
+    msg.add_attachment(b"\x00" * 1024, maintype="audio", subtype="mpeg", filename="a.mp3")
+    msg.add_attachment("lln_feedback=1\ntoken=old", subtype="plain", filename="old.txt")
+    msg.attach(EmailMessage())
+    msg.get_payload()[-1].set_content("lln_feedback=1\ntoken=abc\n")
+
+    assert _build_client()._extract_text_body(msg).startswith("lln_feedback=1\ntoken=abc")
+
+    html = (
+        "<html><head><style>p{color:red}</style></head><body>"
+        "<div>lln_feedback=1<br>token=a&amp;b</div><p>word_1_text=Schule</p>"
+        "<blockquote>" + "<p>old reply</p>" * 5000 + "</blockquote></body></html>"
+    )
+    text = html_to_text(html)
+    assert text.splitlines()[:3] == ["lln_feedback=1", "token=a&b", "word_1_text=Schule"]
+    assert "old reply" not in text
+
+
+def test_idle_sees_new_mail_read_ahead_with_the_continuation() -> None:
+    import time
+
+    client = _build_client()
+    # One TLS record carrying both lines: readline() buffers the EXISTS line.
+    server = _IdleServer([b"+ idling\r\n* 12 EXISTS\r\n", b"LLDN1 OK IDLE done\r\n"])
+    client._client = server
+
+    started = time.monotonic()
+    assert client.idle("INBOX", timeout=3) is True
+    assert time.monotonic() - started < 1
+    assert server.sock.gettimeout() is None
@@ -0,0 +1,98 @@
+from pathlib import Path
+from typing import Dict, List
+
+from app.services.email.outbox import Outbox
+from app.services.email.smtp_sender import Envelope, SendResult
+
+
+class _ScriptedSender:
+    """deliver() stand-in: each recipient fails with the scripted errors first, then succeeds."""
+
+    def __init__(self, failures: Dict[str, List[str]]) -> None:
+        self.failures = failures
+        self.batches: List[List[str]] = []
+
+    def deliver(self, envelopes: List[Envelope]) -> List[SendResult]:
+        self.batches.append([envelope.to_address for envelope in envelopes])
+        results = []
+        for envelope in envelopes:
+            queued = self.failures.get(envelope.to_address, [])
+            error = queued.pop(0) if queued else ""
+            results.append(
+                SendResult(
+                    to_address=envelope.to_address,
+                    ok=not error,
+                    size=len(envelope.payload),
+                    latency=0.01,
+                    attempts=1,
+                    error=error,
+                    permanent=error.startswith("550"),
+                )
+            )
+        return results
+
+
+def _envelope(to: str) -> Envelope:
+    return Envelope(to_address=to, payload=f"To: {to}\r\n\r\nhi".encode())
+
+
+def test_enqueue_is_atomic_and_idempotent(tmp_path: Path) -> None:
+    outbox = Outbox(root=tmp_path)
+
+    assert outbox.enqueue("daily:anna:de:2026-02-13", _envelope("anna@example.com"))
+    assert not outbox.enqueue("daily:anna:de:2026-02-13", _envelope("anna@example.com"))
+
+    assert [entry.to_address for entry in outbox.pending()] == ["anna@example.com"]
+    assert not list(tmp_path.rglob(".*.tmp"))
+    assert outbox.contains("daily:anna:de:2026-02-13")
+
+
+def test_delivery_retries_with_backoff_and_parks_permanent_failures(tmp_path: Path) -> None:
+    outbox = Outbox(root=tmp_path, base_backoff=10.0)
+    for name in ("ok", "flaky", "gone"):
+        outbox.enqueue(f"daily:{name}", _envelope(f"{name}@example.com"))
+    sender = _ScriptedSender({"flaky@example.com": ["421 try later"], "gone@example.com": ["550 no such user"]})
+
+    assert outbox.deliver_due(sender, now=1000.0) == 1  # type: ignore[arg-type]
+    [flaky] = outbox.pending()
+    assert flaky.to_address == "flaky@example.com" and flaky.attempts == 1
+    assert flaky.next_attempt_at == 1010.0 and flaky.last_error == "421 try later"
+    assert len(list(outbox.failed_dir.glob("*.eml"))) == 1
+
+    # Not due yet, then due.
+    assert outbox.deliver_due(sender, now=1005.0) == 0  # type: ignore[arg-type]
+    assert outbox.deliver_due(sender, now=1010.0) == 1  # type: ignore[arg-type]
+    assert outbox.pending() == []
+    assert len(list(outbox.sent_dir.glob("*.json"))) == 2
+    assert not list(outbox.pending_dir.iterdir())
+    # Delivered keys still reject a second enqueue (e.g. a retried workflow run).
+    assert not outbox.enqueue("daily:ok", _envelope("ok@example.com"))
+
+
+def test_drain_waits_for_backoff_until_timeout(tmp_path: Path) -> None:
+    outbox = Outbox(root=tmp_path, base_backoff=30.0)
+    outbox.enqueue("weekly:anna", _envelope("anna@example.com"))
+    sender = _ScriptedSender({"anna@example.com": ["421 busy", "421 busy"]})
+    clock = [0.0]
+
+    def sleep(seconds: float) -> None:
+        clock[0] += seconds
+
+    remaining = outbox.drain(sender, timeout=60.0, sleep=sleep, clock=lambda: clock[0])  # type: ignore[arg-type]
+    assert remaining == 1 and len(sender.batches) == 2
+
+    assert outbox.drain(sender, timeout=200.0, sleep=sleep, clock=lambda: clock[0]) == 0  # type: ignore[arg-type]
+
+
+def test_failed_keys_can_be_enqueued_again(tmp_path: Path) -> None:
+    outbox = Outbox(root=tmp_path)
+    outbox.enqueue("daily:anna:de:2026-02-13", _envelope("anna@example.com"))
+    sender = _ScriptedSender({"anna@example.com": ["550 mailbox full"]})
+    assert outbox.deliver_due(sender, now=0.0) == 0  # type: ignore[arg-type]
+    assert not outbox.contains("daily:anna:de:2026-02-13")
+
+    # A rerun after the mailbox was fixed spools and sends the email again.
+    assert outbox.enqueue("daily:anna:de:2026-02-13", _envelope("anna@example.com"))
+    assert not list(outbox.failed_dir.iterdir())
+    assert outbox.deliver_due(sender, now=0.0) == 1  # type: ignore[arg-type]
+    assert outbox.contains("daily:anna:de:2026-02-13")
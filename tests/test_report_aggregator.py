@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.reporting.aggregator import ReportAggregator, parse_report_range
+
+
+def _grammar(value: object) -> str:
+    return "mastered" if str(value) == "mastered" else "review"
+
+
+def test_parse_report_range_forms() -> None:
+    now = datetime(2026, 3, 10, 12, 0)
+    assert parse_report_range("7d", now) == (datetime(2026, 3, 3, 12, 0), now)
+    assert parse_report_range("2026-03-01", now) == (datetime(2026, 3, 1), now)
+    start, end = parse_report_range("2026-02-01:2026-02-28", now)
+    assert (start, end.date().isoformat()) == (datetime(2026, 2, 1), "2026-02-28")
+    with pytest.raises(ValueError):
+        parse_report_range("2026-03-05:2026-03-01", now)
+
+
+def test_aggregator_fills_all_metrics_in_one_pass() -> None:
+    aggregator = ReportAggregator(
+        start=datetime(2026, 3, 1),
+        end=datetime(2026, 3, 7, 23, 59, 59),
+        normalize_grammar_status=_grammar,
+    )
+    aggregator.consume_lessons(
+        [
+            {"created_at": "2026-03-02T08:00:00.123456", "title": "in"},
+            {"created_at": "2026-02-27T08:00:00", "title": "out"},
+        ]
+    )
+    aggregator.consume_events(
+        [
+            {"timestamp": "2026-03-01T00:00:00", "type": "word", "word": "Haus", "status": "unknown"},
+            {"timestamp": "2026-03-03T09:00:00+02:00", "type": "word", "word": "Haus", "status": "unknown"},
+            {"timestamp": "2026-03-04T09:00:00Z", "type": "word", "word": "Zug", "status": "fuzzy"},
+            {"timestamp": "2026-03-05T09:00:00", "type": "grammar", "topic": "Perfekt", "status": "mastered"},
+            {"timestamp": "2026-03-05T10:00:00", "type": "skip"},
+            {"timestamp": "2026-03-08T00:00:00", "type": "word", "word": "spaet", "status": "known"},
+        ]
+    )
+
+    summary = aggregator.summary
+    assert [item["title"] for item in summary.lessons] == ["in"]
+    assert summary.feedback_events == 5
+    assert summary.word_status == {"unknown": 2, "fuzzy": 1}
+    assert summary.unknown_words.most_common() == [("Haus", 2)]
+    assert summary.fuzzy_words.most_common() == [("Zug", 1)]
+    assert summary.grammar_status["mastered"] == 1
+
+
+def test_default_weekly_report_covers_seven_days(tmp_path) -> None:
+    import json
+    from datetime import timedelta
+    from types import SimpleNamespace
+
+    from app.pipeline.weekly_report_job import WeeklyReportJob
+    from app.services.state.repository import StateRepository
+
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    events = [
+        {"timestamp": (today - timedelta(days=days)).isoformat(), "type": "word", "word": f"w{days}", "status": "unknown"}
+        for days in (0, 6, 7)
+    ]
+    (progress / "feedback_log.json").write_text(json.dumps({"events": events}), encoding="utf-8")
+
+    report = WeeklyReportJob(settings=SimpleNamespace())._build_report(StateRepository(data_dir=tmp_path))
+    assert report["feedback_count"] == 2
+    assert report["range_label"] == f"{(today - timedelta(days=6)).date()} ~ {today.date()}"
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from app.services.state.review_scheduler import ReviewScheduler
+
+
+def test_next_reviews_orders_by_due_date(tmp_path) -> None:
+    scheduler = ReviewScheduler(path=tmp_path / "review_schedule.json")
+    day = datetime(2026, 3, 1)
+    scheduler.record("Apfel", "fuzzy", reviewed_at=day)
+    scheduler.record("Apfel", "fuzzy", reviewed_at=day)  # second success -> 6 day interval
+    scheduler.record("Zeitung", "unknown", reviewed_at=day)  # lapse -> 1 day interval
+    scheduler.record("Haus", "unknown", reviewed_at=datetime(2026, 2, 1))
+
+    assert scheduler.next_reviews(2) == ["Haus", "Zeitung"]
+    assert scheduler.next_reviews(10) == ["Haus", "Zeitung", "Apfel"]
+
+
+def test_known_word_leaves_queue_and_schedule_round_trips(tmp_path) -> None:
+    path = tmp_path / "review_schedule.json"
+    scheduler = ReviewScheduler.build(
+        path,
+        events=[
+            {"type": "word", "word": "Haus", "status": "unknown", "timestamp": "2026-03-01T08:00:00"},
+            {"type": "word", "word": "Haus", "status": "known", "timestamp": "2026-03-02T08:00:00"},
+            {"type": "grammar", "topic": "Perfekt", "status": "review"},
+        ],
+        pending_words=["Stadt"],
+    )
+    scheduler.record("Zug", "fuzzy", reviewed_at=datetime(2026, 3, 3))
+    scheduler.save()
+
+    reloaded = ReviewScheduler.load(path)
+    assert reloaded.next_reviews(5) == ["Stadt", "Zug"]
@@ -0,0 +1,114 @@
+import smtplib
+import threading
+from typing import List
+
+import pytest
+
+from app.services.email import smtp_sender
+from app.services.email.smtp_sender import OutgoingEmail, SMTPSender
+
+
+class _FakeSMTP:
+    """Stand-in for smtplib.SMTP recording sessions; failures are scripted per recipient."""
+
+    instances: List["_FakeSMTP"] = []
+    disconnect_once: set = set()
+    refused: set = set()
+    bad_password = False
+    lock = threading.Lock()
+
+    def __init__(self, host: str, port: int, timeout: float = 30) -> None:
+        self.logged_in = False
+        self.sent: List[str] = []
+        self.closed = False
+        with self.lock:
+            self.instances.append(self)
+
+    def starttls(self) -> None:
+        pass
+
+    def login(self, user: str, password: str) -> None:
+        if self.bad_password:
+            raise smtplib.SMTPAuthenticationError(535, b"5.7.8 Username and Password not accepted")
+        self.logged_in = True
+
+    def sendmail(self, from_addr: str, to_addrs: List[str], msg: bytes) -> dict:
+        assert self.logged_in and not self.closed
+        to = to_addrs[0]
+        if to in self.refused:
+            raise smtplib.SMTPRecipientsRefused({to: (550, b"no such user")})
+        with self.lock:
+            if to in self.disconnect_once:
+                self.disconnect_once.discard(to)
+                raise smtplib.SMTPServerDisconnected("connection dropped")
+        assert b"Subject: Lesson" in msg
+        self.sent.append(to)
+        return {}
+
+    def quit(self) -> None:
+        self.closed = True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch: pytest.MonkeyPatch) -> type:
+    _FakeSMTP.instances = []
+    _FakeSMTP.disconnect_once = set()
+    _FakeSMTP.refused = set()
+    _FakeSMTP.bad_password = False
+    monkeypatch.setattr(smtp_sender.smtplib, "SMTP", _FakeSMTP)
+    return _FakeSMTP
+
+
+def _sender(**kwargs: object) -> SMTPSender:
+    return SMTPSender(host="localhost", port=2525, username="u", password="p", sender="me@example.com", **kwargs)
+
+
+def _emails(count: int) -> List[OutgoingEmail]:
+    return [OutgoingEmail(to_address=f"l{n}@example.com", subject="Lesson", html_body="<p>hi</p>") for n in range(count)]
+
+
+def test_batch_reuses_sessions_up_to_the_per_connection_limit(fake_smtp: type) -> None:
+    results = _sender(max_messages_per_connection=2).send_batch(_emails(5))
+
+    assert [r.to_address for r in results] == [f"l{n}@example.com" for n in range(5)]
+    assert all(r.ok and r.attempts == 1 and r.latency >= 0 and r.size > 0 for r in results)
+    assert [len(s.sent) for s in fake_smtp.instances] == [2, 2, 1]
+    assert all(s.closed for s in fake_smtp.instances)
+
+
+def test_batch_reconnects_on_disconnect_and_does_not_retry_refusals(fake_smtp: type) -> None:
+    fake_smtp.disconnect_once = {"l1@example.com"}
+    fake_smtp.refused = {"l2@example.com"}
+
+    results = _sender().send_batch(_emails(4))
+
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert results[1].attempts == 2
+    assert results[2].attempts == 1 and "no such user" in results[2].error
+    # One reconnect for the dropped session; the refusal keeps the session.
+    assert len(fake_smtp.instances) == 2
+    assert sorted(to for s in fake_smtp.instances for to in s.sent) == ["l0@example.com", "l1@example.com", "l3@example.com"]
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        _sender().send_html(to_address="l2@example.com", subject="Lesson", html_body="<p>hi</p>")
+
+
+def test_batch_spreads_messages_over_parallel_connections(fake_smtp: type) -> None:
+    results = _sender(connections=3).send_batch(_emails(12))
+
+    assert all(r.ok for r in results)
+    assert 1 <= len(fake_smtp.instances) <= 3
+    assert sum(len(s.sent) for s in fake_smtp.instances) == 12
+
+
+def test_rejected_login_fails_the_batch_without_retrying(fake_smtp: type) -> None:
+    fake_smtp.bad_password = True
+    results = _sender().send_batch(_emails(4))
+
+    assert len(fake_smtp.instances) == 1
+    assert all(not r.ok and not r.permanent for r in results)
+    assert all(isinstance(r.exception, smtplib.SMTPAuthenticationError) for r in results)
+    assert [r.attempts for r in results] == [1, 0, 0, 0]
@@ -0,0 +1,240 @@
+import json
+
+from app.services.state.repository import StateRepository
+
+
+def test_processed_keys_migrate_out_of_feedback_log(tmp_path) -> None:
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    (progress / "feedback_log.json").write_text(
+        json.dumps({"events": [], "processed_message_keys": ["<a@x>", " ", "<b@x>"]}),
+        encoding="utf-8",
+    )
+
+    repo = StateRepository(data_dir=tmp_path)
+    assert repo.is_feedback_message_processed("<a@x>")
+    assert repo.get_processed_feedback_message_keys() == {"<a@x>", "<b@x>"}
+
+    feedback_log = json.loads((progress / "feedback_log.json").read_text(encoding="utf-8"))
+    assert "processed_message_keys" not in feedback_log
+    assert (progress / "processed_message_keys.json").exists()
+
+
+def test_processed_keys_evict_oldest_beyond_cap(tmp_path) -> None:
+    repo = StateRepository(data_dir=tmp_path, feedback_dedup_max_keys=3)
+    for key in ["k1", "k2", "k3", "k2", "k4"]:
+        repo.mark_feedback_message_processed(key)
+
+    reloaded = StateRepository(data_dir=tmp_path, feedback_dedup_max_keys=3)
+    assert reloaded.get_processed_feedback_message_keys() == {"k2", "k3", "k4"}
+    assert not reloaded.is_feedback_message_processed("k1")
+
+
+def test_study_profile_follows_incremental_word_updates(tmp_path) -> None:
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    (progress / "vocabulary_status.json").write_text(
+        json.dumps({"words": {"Schule": "known", "Stadt": "unknown", "Arbeit": "fuzzy"}}),
+        encoding="utf-8",
+    )
+
+    repo = StateRepository(data_dir=tmp_path)
+    repo.upsert_word_status("Stadt", "known")
+    repo.upsert_word_status("Zug", "unknown")
+
+    profile = StateRepository(data_dir=tmp_path).build_study_profile(base_level="A1")
+    assert profile["known_count"] == 2
+    assert profile["unknown_count"] == 1
+    assert profile["fuzzy_count"] == 1
+    assert profile["known_words"] == ["Schule", "Stadt"]
+    # Arbeit was never reviewed, so it is due before the freshly marked Zug.
+    assert profile["priority_review_words"] == ["Arbeit", "Zug"]
+
+
+def test_vocabulary_index_rebuilds_after_external_edits(tmp_path) -> None:
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    vocab_path = progress / "vocabulary_status.json"
+    vocab_path.write_text(json.dumps({"words": {"Schule": "known"}}), encoding="utf-8")
+
+    repo = StateRepository(data_dir=tmp_path)
+    repo.upsert_word_status("Kinder", "fuzzy")
+    assert StateRepository(data_dir=tmp_path).vocabulary_status_counts()["total"] == 2
+
+    # e.g. a hand edit or a pull of the progress files; the index is left as it was.
+    vocab_path.write_text(json.dumps({"words": {"Schule": "unknown", "Stadt": "known"}}), encoding="utf-8")
+    (progress / "lemma_map.json").write_text(json.dumps({"lemmas": {"Städte": "Stadt"}}), encoding="utf-8")
+
+    reloaded = StateRepository(data_dir=tmp_path)
+    assert reloaded.word_status("Schule") == "unknown"
+    assert reloaded.word_status("Städte") == "known"
+    assert reloaded.word_status("Kinder", default="-") == "-"
+
+
+def test_learner_shards_are_isolated(tmp_path) -> None:
+    from app.services.state.learners import LearnerProfile, LearnerRegistry, learner_registry_path
+
+    registry = LearnerRegistry(path=learner_registry_path(tmp_path))
+    registry.upsert(LearnerProfile(learner_id="anna", email="anna@example.com", language="de", cefr_level="A1"))
+    registry.save()
+
+    anna = LearnerRegistry.load(learner_registry_path(tmp_path)).require("anna")
+    anna_repo = StateRepository.for_learner(tmp_path, anna)
+    anna_repo.upsert_word_status("Schule", "known")
+
+    assert anna_repo.vocab_path == tmp_path / "learners" / "anna" / "progress" / "vocabulary_status.json"
+    assert anna_repo.build_study_profile(base_level="A1")["known_count"] == 1
+    assert StateRepository(data_dir=tmp_path).build_study_profile(base_level="A1")["known_count"] == 0
+
+
+def test_learner_id_must_be_path_safe(tmp_path) -> None:
+    import pytest
+
+    with pytest.raises(ValueError):
+        StateRepository(data_dir=tmp_path, learner_id="../other")
+
+
+def test_word_lookups_use_normalized_keys(tmp_path) -> None:
+    from app.models.schemas import DailyLesson
+
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    (progress / "vocabulary_status.json").write_text(
+        json.dumps({"words": {"Kinderbetreuung": "known", "Küche": "fuzzy"}}),
+        encoding="utf-8",
+    )
+    (progress / "lemma_map.json").write_text(json.dumps({"lemmas": {"Kinder": "Kind"}}), encoding="utf-8")
+
+    repo = StateRepository(data_dir=tmp_path)
+    assert repo.word_status("kinderbetreuung") == "known"
+    assert repo.word_status("KUECHE") == "fuzzy"
+
+    repo.upsert_word_status("Kind", "unknown")
+    repo.upsert_word_status("kinder", "fuzzy")
+    repo.upsert_word_status("küche", "known")
+
+    vocab = json.loads((progress / "vocabulary_status.json").read_text(encoding="utf-8"))
+    assert vocab["words"] == {"Kinderbetreuung": "known", "Küche": "known", "Kind": "fuzzy"}
+
+    lesson = DailyLesson.from_llm_payload(
+        {"keywords": [{"word": "KINDERBETREUUNG"}, {"word": "Kinder"}, {"word": "neu"}]},
+        lesson_id="de-1",
+        language="de",
+        cefr_level="A1",
+        source_urls=[],
+    )
+    repo.apply_existing_progress(lesson)
+    assert [item.mastery_level for item in lesson.keywords] == ["known", "fuzzy", "unknown"]
+
+
+def test_daily_rollups_backfill_and_update_incrementally(tmp_path) -> None:
+    from datetime import date, datetime
+
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    (progress / "feedback_log.json").write_text(
+        json.dumps(
+            {
+                "events": [
+                    {"timestamp": "2026-03-01T08:00:00", "type": "word", "word": "Haus", "status": "unknown"},
+                    {"timestamp": "2026-03-02T08:00:00", "type": "grammar", "topic": "Perfekt", "status": "mastered"},
+                    {"timestamp": "2026-02-01T08:00:00", "type": "word", "word": "alt", "status": "fuzzy"},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    repo = StateRepository(data_dir=tmp_path)
+    summary = repo.summarize_activity(date(2026, 2, 25), date(2026, 3, 3))
+    assert summary.feedback_events == 2
+    assert summary.unknown_words.most_common(1) == [("Haus", 1)]
+    assert summary.grammar_status["mastered"] == 1
+
+    repo.record_feedback_event({"type": "word", "word": "Haus", "status": "unknown"})
+    today = datetime.utcnow().date()
+    assert StateRepository(data_dir=tmp_path).summarize_activity(today, today).word_status["unknown"] == 1
+
+
+def test_batched_writes_from_two_writers_do_not_overwrite_each_other(tmp_path) -> None:
+    import threading
+
+    first = StateRepository(data_dir=tmp_path)
+    second = StateRepository(data_dir=tmp_path)
+    entered = threading.Event()
+
+    def other_writer() -> None:
+        with second.batched_writes():
+            entered.set()
+            second.upsert_word_status("Zug", "known")
+
+    with first.batched_writes():
+        first.upsert_word_status("Schule", "known")
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        assert not entered.wait(0.2)
+    thread.join(5)
+
+    reloaded = StateRepository(data_dir=tmp_path)
+    assert reloaded.word_status("Schule") == "known"
+    assert reloaded.word_status("Zug") == "known"
+
+
+def test_vocabulary_index_survives_a_checkout_that_resets_mtimes(tmp_path, monkeypatch) -> None:
+    import os
+
+    from app.services.state.vocab_index import VocabularyIndex
+
+    repo = StateRepository(data_dir=tmp_path)
+    repo.upsert_word_status("Schule", "known")
+    builds = []
+    build = VocabularyIndex.build.__func__
+
+    def counting_build(cls, *args, **kwargs):
+        builds.append(args)
+        return build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(VocabularyIndex, "build", classmethod(counting_build))
+
+    # A fresh checkout writes the same bytes with new mtimes.
+    os.utime(repo.vocab_path, ns=(1, 1))
+    assert StateRepository(data_dir=tmp_path).word_status("Schule") == "known"
+    assert builds == []
+
+
+def test_vocabulary_counts_spellings_of_one_word_once(tmp_path) -> None:
+    progress = tmp_path / "progress"
+    progress.mkdir()
+    (progress / "vocabulary_status.json").write_text(
+        json.dumps({"words": {"Straße": "unknown", "strasse": "unknown", "Haus": "known"}}),
+        encoding="utf-8",
+    )
+
+    repo = StateRepository(data_dir=tmp_path)
+    assert repo.vocabulary_status_counts() == {"known": 1, "fuzzy": 0, "unknown": 1, "total": 2}
+    assert repo.build_study_profile(base_level="A1")["unknown_count"] == 1
+
+
+def test_review_schedule_replays_feedback_written_behind_its_back(tmp_path) -> None:
+    repo = StateRepository(data_dir=tmp_path)
+    repo.upsert_word_status("Zug", "unknown")
+    repo.record_feedback_event({"type": "word", "word": "Zug", "status": "unknown"})
+    schedule_path = repo.review_schedule_path
+    assert StateRepository(data_dir=tmp_path).build_study_profile(base_level="A1")["priority_review_words"] == ["Zug"]
+    unchanged = schedule_path.read_text(encoding="utf-8")
+
+    # e.g. an event merged in by git: the scheduler never saw it.
+    feedback_log = json.loads(repo.feedback_log_path.read_text(encoding="utf-8"))
+    feedback_log["events"].append(
+        {"timestamp": "2026-03-01T08:00:00", "type": "word", "word": "Stadt", "status": "fuzzy"}
+    )
+    repo.feedback_log_path.write_text(json.dumps(feedback_log), encoding="utf-8")
+    vocab = json.loads(repo.vocab_path.read_text(encoding="utf-8"))
+    vocab["words"]["Stadt"] = "fuzzy"
+    repo.vocab_path.write_text(json.dumps(vocab), encoding="utf-8")
+
+    profile = StateRepository(data_dir=tmp_path).build_study_profile(base_level="A1")
+    assert profile["priority_review_words"] == ["Stadt", "Zug"]
+    cards = json.loads(schedule_path.read_text(encoding="utf-8"))["cards"]
+    assert cards["Stadt"]["last_status"] == "fuzzy"
+    assert schedule_path.read_text(encoding="utf-8") != unchanged
@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+from typing import List
+
+from app.services.tts.base import TTSProvider
+from app.services.tts.cache import AudioCache, CachedTTSProvider
+
+
+class _CountingProvider(TTSProvider):
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def synthesize(self, *, text: str, voice: str, output_path: Path) -> None:
+        self.calls.append(text)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(f"{voice}:{text}".encode() * 10)
+
+
+def test_same_text_and_voice_skip_synthesis(tmp_path: Path) -> None:
+    inner = _CountingProvider()
+    provider = CachedTTSProvider(inner=inner, cache=AudioCache(root=tmp_path / "cache", max_bytes=10_000), provider_name="edge")
+
+    provider.synthesize(text="Hallo", voice="de-A", output_path=tmp_path / "20260213-de.mp3")
+    provider.synthesize(text="Hallo", voice="de-A", output_path=tmp_path / "20260214-de.mp3")
+    provider.synthesize(text="Hallo", voice="de-B", output_path=tmp_path / "20260214-de-b.mp3")
+
+    assert inner.calls == ["Hallo", "Hallo"]
+    assert (tmp_path / "20260214-de.mp3").read_bytes() == (tmp_path / "20260213-de.mp3").read_bytes()
+
+    # Re-synthesizing onto a dated file that links into the store leaves the stored copy intact.
+    provider.synthesize(text="Tschüss", voice="de-A", output_path=tmp_path / "20260214-de.mp3")
+    cached = provider.cache.get(AudioCache.key(text="Hallo", voice="de-A", provider="edge"))
+    assert cached is not None and cached.read_bytes() == b"de-A:Hallo" * 10
+
+
+def test_eviction_keeps_store_under_bound_dropping_least_recent(tmp_path: Path) -> None:
+    cache = AudioCache(root=tmp_path / "cache", max_bytes=200)
+    provider = CachedTTSProvider(inner=_CountingProvider(), cache=cache, provider_name="edge")
+    for idx, text in enumerate(["eins", "zwei", "drei"]):
+        provider.synthesize(text=text, voice="v", output_path=tmp_path / f"{text}.mp3")
+        os.utime(cache.path_for(AudioCache.key(text=text, voice="v", provider="edge")), (idx, idx))
+
+    assert cache.get(AudioCache.key(text="eins", voice="v", provider="edge")) is not None
+    provider.synthesize(text="vier", voice="v", output_path=tmp_path / "vier.mp3")
+
+    remaining = sorted(path.stat().st_size for path in cache.root.glob("*.mp3"))
+    assert sum(remaining) <= 200
+    assert cache.get(AudioCache.key(text="zwei", voice="v", provider="edge")) is None
+    assert cache.get(AudioCache.key(text="eins", voice="v", provider="edge")) is not None